@@ -1,6 +1,7 @@
 """Metadata extractors for Tableau workbooks."""
 
 from .xml_extractor import XMLMetadataExtractor
-from .metadata_api import TableauMetadataAPIClient
+from .metadata_api import TableauMetadataAPIClient, AsyncTableauMetadataAPIClient
+from .rate_limiter import RateLimiter
 
-__all__ = ["XMLMetadataExtractor", "TableauMetadataAPIClient"]
+__all__ = ["XMLMetadataExtractor", "TableauMetadataAPIClient", "AsyncTableauMetadataAPIClient", "RateLimiter"]
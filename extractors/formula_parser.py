@@ -0,0 +1,707 @@
+"""
+Lexer, parser and analyzer for the Tableau calculation language.
+
+Formulas are tokenized in a single linear scan and parsed by a Pratt parser
+into an AST of calls, LOD expressions, IF/CASE blocks, operators and field or
+parameter references. Analysis is derived from the AST. Parses and analyses
+are cached by formula text, since the same calculations repeat across the
+sheets and workbooks of a site.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+from models.metadata_models import CalculationType
+
+
+# Aggregation functions for formula analysis
+AGGREGATE_FUNCTIONS = frozenset({
+    "SUM", "AVG", "MIN", "MAX", "COUNT", "COUNTD", "MEDIAN",
+    "STDEV", "STDEVP", "VAR", "VARP", "CORR", "COVAR", "COVARP",
+    "ATTR", "COLLECT", "PERCENTILE"
+})
+
+# Table calculation functions
+TABLE_CALC_FUNCTIONS = frozenset({
+    "RUNNING_SUM", "RUNNING_AVG", "RUNNING_COUNT", "RUNNING_MIN", "RUNNING_MAX",
+    "WINDOW_SUM", "WINDOW_AVG", "WINDOW_COUNT", "WINDOW_MIN", "WINDOW_MAX",
+    "WINDOW_MEDIAN", "WINDOW_STDEV", "WINDOW_STDEVP", "WINDOW_VAR", "WINDOW_VARP",
+    "INDEX", "FIRST", "LAST", "SIZE", "LOOKUP", "PREVIOUS_VALUE",
+    "RANK", "RANK_DENSE", "RANK_MODIFIED", "RANK_PERCENTILE", "RANK_UNIQUE",
+    "TOTAL", "SCRIPT_BOOL", "SCRIPT_INT", "SCRIPT_REAL", "SCRIPT_STR"
+})
+
+# LOD keywords and the calculation type each one produces
+LOD_TYPES = {
+    "FIXED": CalculationType.LOD_FIXED,
+    "INCLUDE": CalculationType.LOD_INCLUDE,
+    "EXCLUDE": CalculationType.LOD_EXCLUDE,
+}
+
+# Reserved words, never treated as function names even when followed by '('
+KEYWORDS = frozenset({
+    "IF", "THEN", "ELSEIF", "ELSE", "END", "CASE", "WHEN",
+    "AND", "OR", "NOT", "IN", "FIXED", "INCLUDE", "EXCLUDE",
+})
+
+# Binary operators and their binding power (higher binds tighter)
+BINARY_PRECEDENCE = {
+    "OR": 1,
+    "AND": 2,
+    "=": 4, "==": 4, "!=": 4, "<>": 4, "<": 4, ">": 4, "<=": 4, ">=": 4, "IN": 4,
+    "+": 5, "-": 5,
+    "*": 6, "/": 6, "%": 6,
+    "^": 7,
+}
+NOT_PRECEDENCE = 3
+UNARY_PRECEDENCE = 8
+
+# Number of distinct formulas whose parse and analysis are kept in memory
+ANALYSIS_CACHE_SIZE = 8192
+
+# Token kinds
+FIELD = "FIELD"
+STRING = "STRING"
+NUMBER = "NUMBER"
+DATE = "DATE"
+IDENT = "IDENT"
+LPAREN = "LPAREN"
+RPAREN = "RPAREN"
+LBRACE = "LBRACE"
+RBRACE = "RBRACE"
+COLON = "COLON"
+COMMA = "COMMA"
+DOT = "DOT"
+OP = "OP"
+COMMENT = "COMMENT"
+
+# AST node kinds
+NODE_FIELD = "field"
+NODE_PARAMETER = "parameter"
+NODE_LITERAL = "literal"
+NODE_IDENTIFIER = "identifier"
+NODE_CALL = "call"
+NODE_LOD = "lod"
+NODE_BRACES = "braces"  # {expr} without a keyword (table-scoped)
+NODE_IF = "if"
+NODE_CASE = "case"
+NODE_IN = "in"
+NODE_BINARY = "binary"
+NODE_UNARY = "unary"
+NODE_GROUP = "group"
+
+# Node kinds that open a new nesting level
+NESTING_KINDS = frozenset({NODE_CALL, NODE_LOD, NODE_BRACES, NODE_IF, NODE_CASE})
+
+# One alternative per token kind, tried in order at each position. Unterminated
+# brackets, strings and comments run to the end of the formula.
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<WS>\s+)
+  | (?P<COMMENT>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<FIELD>\[(?:[^\]]|\]\])*(?:\]|\Z))
+  | (?P<STRING>'(?:[^']|'')*(?:'|\Z)|"(?:[^"]|"")*(?:"|\Z))
+  | (?P<DATE>\#[^#]*(?:\#|\Z))
+  | (?P<NUMBER>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<IDENT>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<LPAREN>\()
+  | (?P<RPAREN>\))
+  | (?P<LBRACE>\{)
+  | (?P<RBRACE>\})
+  | (?P<COLON>:)
+  | (?P<COMMA>,)
+  | (?P<DOT>\.)
+  | (?P<OP><>|!=|==|<=|>=|[-+*/%^=<>!&|]|.)
+""", re.VERBOSE | re.DOTALL)
+
+
+class FormulaSyntaxError(ValueError):
+    """Raised when a formula cannot be parsed."""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} at offset {position}")
+        self.position = position
+
+
+@dataclass(frozen=True)
+class Token:
+    """A single lexical token of a formula."""
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class Node:
+    """A node of the formula AST. start/end are offsets into the formula text."""
+    kind: str
+    value: Optional[str] = None  # Field/parameter/function name, operator, LOD type or literal text
+    children: Tuple["Node", ...] = ()  # Operands, arguments, branches or LOD body
+    dimensions: Tuple["Node", ...] = ()  # LOD dimension expressions
+    start: int = 0
+    end: int = 0
+
+
+@dataclass(frozen=True)
+class ParsedFormula:
+    """Tokens and AST of a formula. ast is None when the formula does not parse."""
+    formula: str
+    tokens: Tuple[Token, ...]
+    ast: Optional[Node] = None
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class LODExpression:
+    """One LOD expression found in a formula."""
+    lod_type: str
+    dimensions: Tuple[str, ...]  # Raw field names, without brackets
+    expression: str
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class FormulaAnalysis:
+    """Result of analyzing a formula. Shared between callers, so it is immutable."""
+    calculation_type: CalculationType = CalculationType.SIMPLE
+    aggregations: Tuple[str, ...] = ()
+    functions: Tuple[str, ...] = ()
+    referenced_fields: Tuple[str, ...] = ()
+    referenced_parameters: Tuple[str, ...] = ()
+    lod_type: Optional[str] = None
+    lod_dimensions: Tuple[str, ...] = ()  # Raw field names, without brackets
+    lod_expression: Optional[str] = None
+    lod_expressions: Tuple[LODExpression, ...] = ()
+    table_calc_type: Optional[str] = None
+    table_calc_positions: Tuple[Tuple[str, int], ...] = ()  # (function, offset)
+    nesting_depth: int = 0
+    complexity_score: int = 0
+    has_nested: bool = False
+
+
+def tokenize(formula: str, include_comments: bool = False) -> List[Token]:
+    """Split a formula into tokens in one pass. Whitespace is dropped."""
+    tokens = []
+
+    for match in _TOKEN_PATTERN.finditer(formula):
+        kind = match.lastgroup
+        if kind == "WS" or (kind == COMMENT and not include_comments):
+            continue
+        tokens.append(Token(kind, match.group(), match.start(), match.end()))
+
+    return tokens
+
+
+def field_name(token: Token) -> str:
+    """The name inside a [bracketed] field token, with ']]' escapes undone."""
+    value = token.value[1:]
+    if value.endswith("]"):
+        value = value[:-1]
+    return value.replace("]]", "]")
+
+
+class _Parser:
+    """Pratt parser over a token list."""
+
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise FormulaSyntaxError("Empty formula", 0)
+
+        node = self.expression(0)
+        if self.pos < len(self.tokens):
+            token = self.tokens[self.pos]
+            raise FormulaSyntaxError(f"Unexpected {token.value!r}", token.start)
+        return node
+
+    def peek(self, offset: int = 0) -> Optional[Token]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def advance(self) -> Token:
+        token = self.peek()
+        if token is None:
+            raise FormulaSyntaxError("Unexpected end of formula", self.tokens[-1].end)
+        self.pos += 1
+        return token
+
+    def expect(self, kind: str, keyword: Optional[str] = None) -> Token:
+        token = self.advance()
+        if token.kind != kind or (keyword is not None and token.value.upper() != keyword):
+            raise FormulaSyntaxError(f"Expected {keyword or kind}, found {token.value!r}", token.start)
+        return token
+
+    def at(self, kind: str) -> bool:
+        token = self.peek()
+        return token is not None and token.kind == kind
+
+    def at_keyword(self, *keywords: str) -> bool:
+        token = self.peek()
+        return token is not None and token.kind == IDENT and token.value.upper() in keywords
+
+    def binary_operator(self) -> Optional[str]:
+        token = self.peek()
+        if token is None:
+            return None
+        if token.kind == OP and token.value in BINARY_PRECEDENCE:
+            return token.value
+        if token.kind == IDENT and token.value.upper() in ("AND", "OR", "IN"):
+            return token.value.upper()
+        return None
+
+    def expression(self, min_precedence: int) -> Node:
+        left = self.prefix()
+
+        while True:
+            operator = self.binary_operator()
+            if operator is None or BINARY_PRECEDENCE[operator] < min_precedence:
+                return left
+            self.advance()
+            precedence = BINARY_PRECEDENCE[operator]
+
+            if operator == "IN":
+                self.expect(LPAREN)
+                members = self.arguments()
+                close = self.expect(RPAREN)
+                left = Node(NODE_IN, "IN", (left,) + members, start=left.start, end=close.end)
+                continue
+
+            # '^' is right-associative, everything else left-associative
+            right = self.expression(precedence if operator == "^" else precedence + 1)
+            left = Node(NODE_BINARY, operator, (left, right), start=left.start, end=right.end)
+
+    def arguments(self) -> Tuple[Node, ...]:
+        if self.at(RPAREN):
+            return ()
+
+        args = [self.expression(0)]
+        while self.at(COMMA):
+            self.advance()
+            args.append(self.expression(0))
+        return tuple(args)
+
+    def prefix(self) -> Node:
+        token = self.advance()
+        kind = token.kind
+
+        if kind == FIELD:
+            member = self.peek(1)
+            if self.at(DOT) and member is not None and member.kind == FIELD:
+                self.pos += 2
+                node_kind = NODE_PARAMETER if field_name(token) == "Parameters" else NODE_FIELD
+                return Node(node_kind, field_name(member), start=token.start, end=member.end)
+            return Node(NODE_FIELD, field_name(token), start=token.start, end=token.end)
+
+        if kind in (STRING, NUMBER, DATE):
+            return Node(NODE_LITERAL, token.value, start=token.start, end=token.end)
+
+        if kind == LPAREN:
+            inner = self.expression(0)
+            close = self.expect(RPAREN)
+            return Node(NODE_GROUP, None, (inner,), start=token.start, end=close.end)
+
+        if kind == LBRACE:
+            return self.braces(token)
+
+        if kind == OP and token.value in ("-", "+"):
+            operand = self.expression(UNARY_PRECEDENCE)
+            return Node(NODE_UNARY, token.value, (operand,), start=token.start, end=operand.end)
+
+        if kind == IDENT:
+            word = token.value.upper()
+            if word == "NOT":
+                operand = self.expression(NOT_PRECEDENCE)
+                return Node(NODE_UNARY, "NOT", (operand,), start=token.start, end=operand.end)
+            if word == "IF":
+                return self.if_block(token)
+            if word == "CASE":
+                return self.case_block(token)
+            if word not in KEYWORDS:
+                if self.at(LPAREN):
+                    self.advance()
+                    args = self.arguments()
+                    close = self.expect(RPAREN)
+                    return Node(NODE_CALL, word, args, start=token.start, end=close.end)
+                return Node(NODE_IDENTIFIER, word, start=token.start, end=token.end)
+
+        raise FormulaSyntaxError(f"Unexpected {token.value!r}", token.start)
+
+    def braces(self, open_token: Token) -> Node:
+        if self.at_keyword(*LOD_TYPES):
+            lod_type = self.advance().value.upper()
+            dimensions = () if self.at(COLON) else self.arguments()
+            self.expect(COLON)
+            body = self.expression(0)
+            close = self.expect(RBRACE)
+            return Node(NODE_LOD, lod_type, (body,), dimensions, start=open_token.start, end=close.end)
+
+        body = self.expression(0)
+        close = self.expect(RBRACE)
+        return Node(NODE_BRACES, None, (body,), start=open_token.start, end=close.end)
+
+    def if_block(self, if_token: Token) -> Node:
+        # children: condition, result, [condition, result, ...], [else result]
+        children = [self.expression(0)]
+        self.expect(IDENT, "THEN")
+        children.append(self.expression(0))
+
+        while self.at_keyword("ELSEIF"):
+            self.advance()
+            children.append(self.expression(0))
+            self.expect(IDENT, "THEN")
+            children.append(self.expression(0))
+
+        if self.at_keyword("ELSE"):
+            self.advance()
+            children.append(self.expression(0))
+
+        end = self.expect(IDENT, "END")
+        return Node(NODE_IF, None, tuple(children), start=if_token.start, end=end.end)
+
+    def case_block(self, case_token: Token) -> Node:
+        # children: subject, [when value, result, ...], [else result]
+        children = [self.expression(0)]
+
+        while self.at_keyword("WHEN"):
+            self.advance()
+            children.append(self.expression(0))
+            self.expect(IDENT, "THEN")
+            children.append(self.expression(0))
+
+        if self.at_keyword("ELSE"):
+            self.advance()
+            children.append(self.expression(0))
+
+        end = self.expect(IDENT, "END")
+        return Node(NODE_CASE, None, tuple(children), start=case_token.start, end=end.end)
+
+
+def iter_nodes(node: Node, depth: int = 0) -> Iterator[Tuple[Node, int]]:
+    """
+    Walk the AST in source order, yielding (node, nesting depth).
+
+    Depth counts the enclosing calls, LOD/brace expressions and IF/CASE blocks,
+    including the node itself.
+    """
+    if node.kind in NESTING_KINDS:
+        depth += 1
+    yield node, depth
+
+    for child in node.dimensions:
+        yield from iter_nodes(child, depth)
+    for child in node.children:
+        yield from iter_nodes(child, depth)
+
+
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def parse_formula(formula: str) -> ParsedFormula:
+    """Tokenize and parse a formula. Syntax errors are recorded, not raised."""
+    tokens = tokenize(formula)
+
+    try:
+        ast = _Parser(tokens).parse()
+    except FormulaSyntaxError as e:
+        return ParsedFormula(formula=formula, tokens=tuple(tokens), error=str(e))
+    except RecursionError:
+        return ParsedFormula(formula=formula, tokens=tuple(tokens), error="Formula nested too deeply")
+
+    return ParsedFormula(formula=formula, tokens=tuple(tokens), ast=ast)
+
+
+def is_federated_qualifier(tokens: Tuple[Token, ...], i: int) -> bool:
+    """Whether tokens[i] is a [federated.xxx] datasource qualifier followed by '.'."""
+    token = tokens[i]
+    return (
+        token.kind == FIELD
+        and token.value.startswith("[federated.")
+        and i + 1 < len(tokens)
+        and tokens[i + 1].kind == DOT
+    )
+
+
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def normalize_formula(formula: str) -> str:
+    """
+    Canonical form of a formula for comparison.
+
+    Tokens are joined by single spaces, so whitespace and comments do not
+    matter, federated datasource qualifiers are dropped and the result is
+    lower-cased.
+    """
+    if not formula:
+        return ""
+
+    tokens = parse_formula(formula).tokens
+    parts = []
+    skip_dot = False
+
+    for i, token in enumerate(tokens):
+        if skip_dot:
+            skip_dot = False
+            continue
+        if is_federated_qualifier(tokens, i):
+            skip_dot = True
+            continue
+        parts.append(token.value)
+
+    return " ".join(parts).lower()
+
+
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def analyze_formula(formula: str) -> FormulaAnalysis:
+    """
+    Analyze a Tableau formula.
+
+    Functions are calls in the AST, so "SUM" never matches inside
+    "RUNNING_SUM", strings or field names. [Parameters].[Name] references are
+    reported as parameters only and datasource qualifiers are dropped from field
+    references. Formulas that do not parse fall back to a token-level scan.
+    """
+    parsed = parse_formula(formula)
+    if parsed.ast is None:
+        return _analyze_tokens(formula, parsed.tokens)
+
+    functions: List[str] = []
+    aggregations: List[str] = []
+    referenced_fields: List[str] = []
+    referenced_parameters: List[str] = []
+    lod_expressions: List[LODExpression] = []
+    table_calc_positions: List[Tuple[str, int]] = []
+    nesting_depth = 0
+    condition_count = elseif_count = when_count = 0
+    has_if = has_case = False
+
+    for node, depth in iter_nodes(parsed.ast):
+        nesting_depth = max(nesting_depth, depth)
+        kind = node.kind
+
+        if kind == NODE_FIELD:
+            if node.value not in referenced_fields:
+                referenced_fields.append(node.value)
+
+        elif kind == NODE_PARAMETER:
+            if node.value not in referenced_parameters:
+                referenced_parameters.append(node.value)
+
+        elif kind == NODE_CALL:
+            name = node.value
+            if name not in functions:
+                functions.append(name)
+            if name in AGGREGATE_FUNCTIONS and name not in aggregations:
+                aggregations.append(name)
+            if name in TABLE_CALC_FUNCTIONS:
+                table_calc_positions.append((name, node.start))
+            if name == "IIF":
+                has_if = True
+
+        elif kind == NODE_LOD:
+            dimensions: List[str] = []
+            for dimension in node.dimensions:
+                for child, _ in iter_nodes(dimension):
+                    if child.kind == NODE_FIELD and child.value not in dimensions:
+                        dimensions.append(child.value)
+            body = node.children[0]
+            lod_expressions.append(LODExpression(
+                lod_type=node.value,
+                dimensions=tuple(dimensions),
+                expression=formula[body.start:body.end],
+                start=node.start,
+                end=node.end,
+            ))
+
+        elif kind == NODE_IF:
+            has_if = True
+            conditions = len(node.children) // 2
+            condition_count += conditions
+            elseif_count += conditions - 1
+
+        elif kind == NODE_CASE:
+            has_case = True
+            when_count += (len(node.children) - 1) // 2
+
+    first_lod = lod_expressions[0] if lod_expressions else None
+    table_calc_type = table_calc_positions[0][0] if table_calc_positions else None
+    has_nested = nesting_depth > 2 or len(lod_expressions) > 1
+
+    complexity_score = 0
+    if lod_expressions:
+        complexity_score += 30 + 10 * (len(lod_expressions) - 1)
+    if table_calc_type:
+        complexity_score += 40
+    if has_if:
+        complexity_score += 5
+        if condition_count > 2 or elseif_count > 1:
+            complexity_score += 10
+    if has_case:
+        complexity_score += 5
+        if when_count > 3:
+            complexity_score += 10
+    if has_nested:
+        complexity_score += 15 + 5 * max(nesting_depth - 3, 0)
+
+    lod_type = first_lod.lod_type if first_lod else None
+
+    return FormulaAnalysis(
+        calculation_type=_calculation_type(lod_type, table_calc_type, aggregations),
+        aggregations=tuple(aggregations),
+        functions=tuple(functions),
+        referenced_fields=tuple(referenced_fields),
+        referenced_parameters=tuple(referenced_parameters),
+        lod_type=lod_type,
+        lod_dimensions=first_lod.dimensions if first_lod else (),
+        lod_expression=first_lod.expression if first_lod else None,
+        lod_expressions=tuple(lod_expressions),
+        table_calc_type=table_calc_type,
+        table_calc_positions=tuple(table_calc_positions),
+        nesting_depth=nesting_depth,
+        complexity_score=min(complexity_score, 100),
+        has_nested=has_nested,
+    )
+
+
+def _calculation_type(
+    lod_type: Optional[str],
+    table_calc_type: Optional[str],
+    aggregations: List[str]
+) -> CalculationType:
+    """Table calcs take precedence over LODs, LODs over plain aggregates."""
+    if table_calc_type:
+        return CalculationType.TABLE_CALC
+    if lod_type:
+        return LOD_TYPES[lod_type]
+    if aggregations:
+        return CalculationType.AGGREGATE
+    return CalculationType.SIMPLE
+
+
+def _analyze_tokens(formula: str, tokens: Tuple[Token, ...]) -> FormulaAnalysis:
+    """Token-level analysis for formulas the parser rejects."""
+    functions: List[str] = []
+    aggregations: List[str] = []
+    referenced_fields: List[str] = []
+    referenced_parameters: List[str] = []
+    table_calc_positions: List[Tuple[str, int]] = []
+    nesting_depth = depth = 0
+    has_if = has_case = False
+    lod_type = None
+    lod_dimensions: List[str] = []
+    lod_expression = None
+    lod_end = len(formula)
+
+    # Open braces as [LOD keyword or None, index of the ':' token or None, offset]
+    braces: List[list] = []
+    first_lod: Optional[list] = None
+
+    for i, token in enumerate(tokens):
+        kind = token.kind
+
+        if kind == FIELD:
+            if i + 2 < len(tokens) and tokens[i + 1].kind == DOT and tokens[i + 2].kind == FIELD:
+                continue  # [Parameters] or [datasource] qualifier
+
+            name = field_name(token)
+            if i >= 2 and tokens[i - 1].kind == DOT and field_name(tokens[i - 2]) == "Parameters":
+                if name not in referenced_parameters:
+                    referenced_parameters.append(name)
+            elif name not in referenced_fields:
+                referenced_fields.append(name)
+
+            # Dimensions of the first LOD are the fields before its ':'
+            if braces and braces[-1] is first_lod and first_lod[1] is None:
+                lod_dimensions.append(name)
+
+        elif kind == IDENT:
+            word = token.value.upper()
+
+            if word not in KEYWORDS and i + 1 < len(tokens) and tokens[i + 1].kind == LPAREN:
+                if word not in functions:
+                    functions.append(word)
+                if word in AGGREGATE_FUNCTIONS and word not in aggregations:
+                    aggregations.append(word)
+                if word in TABLE_CALC_FUNCTIONS:
+                    table_calc_positions.append((word, token.start))
+                if word == "IIF":
+                    has_if = True
+            elif word == "IF":
+                has_if = True
+            elif word == "CASE":
+                has_case = True
+            elif word in LOD_TYPES and braces and braces[-1][0] is None and tokens[i - 1].kind == LBRACE:
+                braces[-1][0] = word
+                if first_lod is None:
+                    first_lod = braces[-1]
+                    lod_type = word
+
+        elif kind in (LPAREN, LBRACE):
+            depth += 1
+            nesting_depth = max(nesting_depth, depth)
+            if kind == LBRACE:
+                braces.append([None, None, token.start])
+
+        elif kind == RPAREN:
+            depth = max(depth - 1, 0)
+
+        elif kind == COLON:
+            if braces and braces[-1][0] and braces[-1][1] is None:
+                braces[-1][1] = i
+
+        elif kind == RBRACE:
+            depth = max(depth - 1, 0)
+            if not braces:
+                continue
+            closed = braces.pop()
+            if closed is first_lod and closed[1] is not None:
+                lod_expression = formula[tokens[closed[1]].end:token.start].strip()
+                lod_end = token.end
+
+    # An unclosed LOD still reports the rest of the formula as its expression
+    if first_lod is not None and lod_expression is None and first_lod[1] is not None:
+        lod_expression = formula[tokens[first_lod[1]].end:].strip()
+
+    lod_expressions: Tuple[LODExpression, ...] = ()
+    if lod_type and lod_expression is not None:
+        lod_expressions = (LODExpression(
+            lod_type=lod_type,
+            dimensions=tuple(lod_dimensions),
+            expression=lod_expression,
+            start=first_lod[2],
+            end=lod_end,
+        ),)
+
+    table_calc_type = table_calc_positions[0][0] if table_calc_positions else None
+    has_nested = nesting_depth > 2
+
+    complexity_score = 0
+    if lod_type:
+        complexity_score += 30
+    if table_calc_type:
+        complexity_score += 40
+    if has_if:
+        complexity_score += 5
+    if has_case:
+        complexity_score += 5
+    if has_nested:
+        complexity_score += 15
+
+    return FormulaAnalysis(
+        calculation_type=_calculation_type(lod_type, table_calc_type, aggregations),
+        aggregations=tuple(aggregations),
+        functions=tuple(functions),
+        referenced_fields=tuple(referenced_fields),
+        referenced_parameters=tuple(referenced_parameters),
+        lod_type=lod_type,
+        lod_dimensions=tuple(lod_dimensions),
+        lod_expression=lod_expression,
+        lod_expressions=lod_expressions,
+        table_calc_type=table_calc_type,
+        table_calc_positions=tuple(table_calc_positions),
+        nesting_depth=nesting_depth,
+        complexity_score=min(complexity_score, 100),
+        has_nested=has_nested,
+    )
@@ -4,18 +4,34 @@ Option C: Tableau Metadata API client for Tableau Server/Online.
 This module connects to published workbooks on Tableau Server/Online
 using the Metadata API (GraphQL) to extract metadata.
 
+TableauMetadataAPIClient is the blocking client. AsyncTableauMetadataAPIClient
+does the same over httpx; TableauMetadataAPIClient.get_workbook_metadata() runs
+it under the hood. A workbook is fetched with one consolidated GraphQL query,
+or with smaller ones sent concurrently. Workbook listings and datasource
+fields are paged through the Metadata API's Connection types.
+
+All GraphQL requests from a client go through one RateLimiter
+(extractors.rate_limiter), which paces them, honors Retry-After and adapts the
+number of requests in flight to what the server tolerates. Throttled requests
+are retried; a query over the server's node limit raises NodeLimitExceededError.
+
 Note: This requires a published workbook and authentication credentials.
 For local .twbx files, use the XMLMetadataExtractor (Option A).
 """
 
+import asyncio
 import json
-from typing import Optional, List, Dict, Any
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable, Iterator, Tuple, TypeVar
 from datetime import datetime
 
+import httpx
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from extractors.rate_limiter import RateLimiter, parse_retry_after
 from models.metadata_models import (
     DataType,
     AggregationType,
@@ -34,12 +50,13 @@ from models.metadata_models import (
 )
 
 
-class TableauMetadataAPIClient:
+T = TypeVar("T")
+
+
+class _MetadataAPIClientBase:
     """
-    Client for Tableau Metadata API (GraphQL).
-    
-    Extracts metadata from published workbooks on Tableau Server/Online.
-    Requires personal access token or session authentication.
+    Settings, GraphQL queries and model building shared by the sync and async
+    clients. Subclasses only differ in how requests are sent.
     """
     
     # GraphQL endpoint path
@@ -48,6 +65,225 @@ class TableauMetadataAPIClient:
     # REST API paths for auth
     SIGNIN_PATH = "/api/3.21/auth/signin"
     
+    # Selections per GraphQL type, shared by the separate and consolidated queries
+    WORKBOOK_FIELDS = """
+    fragment WorkbookFields on Workbook {
+        luid
+        name
+        projectName
+        createdAt
+        updatedAt
+        owner {
+            name
+        }
+    }
+    """
+    
+    SHEET_FIELDS = """
+    fragment SheetFields on Sheet {
+        name
+        sheetType
+        containedInDashboards {
+            name
+        }
+        sheetFieldInstances {
+            name
+            datasourceField {
+                name
+                dataType
+                role
+                isCalculated
+                formula
+                aggregation
+            }
+        }
+    }
+    """
+    
+    DATASOURCE_FIELDS = """
+    fragment DatasourceFields on EmbeddedDatasource {
+        id
+        name
+        hasExtracts
+        extractLastUpdateTime
+        upstreamTables {
+            name
+            fullName
+            connectionType
+            database {
+                name
+                connectionType
+            }
+        }
+    }
+    """
+    
+    FIELD_FIELDS = """
+    fragment FieldFields on Field {
+        name
+        dataType
+        role
+        isCalculated
+        formula
+        aggregation
+        description
+        isHidden
+        referencedByCalculations {
+            name
+        }
+        upstreamColumns {
+            name
+            table {
+                name
+            }
+        }
+    }
+    """
+    
+    DASHBOARD_FIELDS = """
+    fragment DashboardFields on Dashboard {
+        name
+        containsSheets {
+            name
+        }
+    }
+    """
+    
+    # Everything about a workbook in one document: a single round trip, and
+    # the server authenticates, parses and plans one query instead of four
+    WORKBOOK_METADATA_QUERY = """
+    query GetWorkbookMetadata($name: String!) {
+        workbooks(filter: {name: $name}) {
+            ...WorkbookFields
+            sheets {
+                ...SheetFields
+            }
+            embeddedDatasources {
+                ...DatasourceFields
+                fields {
+                    ...FieldFields
+                }
+            }
+            dashboards {
+                ...DashboardFields
+            }
+        }
+    }
+    """ + WORKBOOK_FIELDS + SHEET_FIELDS + DATASOURCE_FIELDS + FIELD_FIELDS + DASHBOARD_FIELDS
+    
+    # The same by LUID, which unlike the name is unique across projects
+    WORKBOOK_METADATA_BY_LUID_QUERY = """
+    query GetWorkbookMetadataByLuid($luid: String!) {
+        workbooks(filter: {luid: $luid}) {
+            ...WorkbookFields
+            sheets {
+                ...SheetFields
+            }
+            embeddedDatasources {
+                ...DatasourceFields
+                fields {
+                    ...FieldFields
+                }
+            }
+            dashboards {
+                ...DashboardFields
+            }
+        }
+    }
+    """ + WORKBOOK_FIELDS + SHEET_FIELDS + DATASOURCE_FIELDS + FIELD_FIELDS + DASHBOARD_FIELDS
+    
+    # Separate queries; all but the workbook lookup take only the workbook LUID
+    WORKBOOK_QUERY = """
+    query GetWorkbook($name: String!) {
+        workbooks(filter: {name: $name}) {
+            ...WorkbookFields
+        }
+    }
+    """ + WORKBOOK_FIELDS
+    
+    WORKBOOK_BY_LUID_QUERY = """
+    query GetWorkbookByLuid($luid: String!) {
+        workbooks(filter: {luid: $luid}) {
+            ...WorkbookFields
+        }
+    }
+    """ + WORKBOOK_FIELDS
+    
+    SHEETS_QUERY = """
+    query GetSheets($workbookLuid: String!) {
+        sheets(filter: {workbook: {luid: $workbookLuid}}) {
+            ...SheetFields
+        }
+    }
+    """ + SHEET_FIELDS
+    
+    DATASOURCES_QUERY = """
+    query GetDatasources($workbookLuid: String!) {
+        embeddedDatasources(filter: {workbook: {luid: $workbookLuid}}) {
+            ...DatasourceFields
+        }
+    }
+    """ + DATASOURCE_FIELDS
+    
+    DASHBOARDS_QUERY = """
+    query GetDashboards($workbookLuid: String!) {
+        dashboards(filter: {workbook: {luid: $workbookLuid}}) {
+            ...DashboardFields
+        }
+    }
+    """ + DASHBOARD_FIELDS
+    
+    # Throttled requests (HTTP 429/503, or a throttling or timeout error in the
+    # GraphQL response) are retried this many times, paced by the rate limiter
+    MAX_THROTTLE_RETRIES = 5
+    THROTTLE_STATUS_CODES = frozenset({429, 503})
+    THROTTLE_ERROR_PATTERN = re.compile(r"rate limit|too many requests|throttl|timed? ?out", re.IGNORECASE)
+    
+    # A result over the server's node limit; retrying the same query cannot
+    # help, it has to be split or paged
+    NODE_LIMIT_ERROR_PATTERN = re.compile(r"node limit", re.IGNORECASE)
+    
+    # Paged queries over the Connection types. Each response holds one page,
+    # so listing a site with thousands of workbooks, or a datasource with
+    # thousands of fields, never waits for (or holds) one huge document
+    PAGE_SIZE = 100
+    
+    WORKBOOKS_PAGE_QUERY = """
+    query ListWorkbooks($first: Int!, $after: String, $filter: WorkbookFilter) {
+        workbooksConnection(first: $first, after: $after, filter: $filter) {
+            nodes {
+                luid
+                name
+                projectName
+                createdAt
+                owner {
+                    name
+                }
+            }
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+        }
+    }
+    """
+    
+    FIELDS_PAGE_QUERY = """
+    query GetDatasourceFields($datasourceId: ID!, $first: Int!, $after: String) {
+        embeddedDatasources(filter: {id: $datasourceId}) {
+            fieldsConnection(first: $first, after: $after) {
+                nodes {
+                    ...FieldFields
+                }
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+            }
+        }
+    }
+    """ + FIELD_FIELDS
+    
     def __init__(
         self,
         server_url: str,
@@ -56,7 +292,8 @@ class TableauMetadataAPIClient:
         token_secret: Optional[str] = None,
         username: Optional[str] = None,
         password: Optional[str] = None,
-        api_version: str = "3.21"
+        api_version: str = "3.21",
+        rate_limiter: Optional[RateLimiter] = None
     ):
         """
         Initialize the Metadata API client.
@@ -69,6 +306,7 @@ class TableauMetadataAPIClient:
             username: Username for basic auth (alternative)
             password: Password for basic auth (alternative)
             api_version: REST API version
+            rate_limiter: Limiter shared by all GraphQL requests (default: a new RateLimiter())
         """
         self.server_url = server_url.rstrip("/")
         self.site_id = site_id
@@ -81,32 +319,10 @@ class TableauMetadataAPIClient:
         self.auth_token: Optional[str] = None
         self.site_luid: Optional[str] = None
         
-        # Session with retry
-        self.session = self._create_session()
-    
-    def _create_session(self) -> requests.Session:
-        """Create a requests session with retry logic."""
-        session = requests.Session()
-        
-        retries = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
-        )
-        
-        adapter = HTTPAdapter(max_retries=retries)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        
-        return session
+        self.rate_limiter = rate_limiter or RateLimiter()
     
-    def authenticate(self) -> bool:
-        """
-        Authenticate with Tableau Server.
-        
-        Returns:
-            bool: True if authentication successful
-        """
+    def _signin_request(self) -> Tuple[str, Dict, Dict]:
+        """URL, JSON payload and headers of the sign-in request."""
         signin_url = f"{self.server_url}/api/{self.api_version}/auth/signin"
         
         if self.token_name and self.token_secret:
@@ -135,8 +351,10 @@ class TableauMetadataAPIClient:
             "Accept": "application/json"
         }
         
-        response = self.session.post(signin_url, json=payload, headers=headers)
-        
+        return signin_url, payload, headers
+    
+    def _handle_signin_response(self, response: Any) -> bool:
+        """Store the token and site LUID from a sign-in response (requests or httpx)."""
         if response.status_code != 200:
             raise Exception(f"Authentication failed: {response.status_code} - {response.text}")
         
@@ -146,20 +364,8 @@ class TableauMetadataAPIClient:
         
         return True
     
-    def _graphql_query(self, query: str, variables: Optional[Dict] = None) -> Dict:
-        """
-        Execute a GraphQL query against the Metadata API.
-        
-        Args:
-            query: GraphQL query string
-            variables: Optional query variables
-            
-        Returns:
-            Dict: Query response data
-        """
-        if not self.auth_token:
-            self.authenticate()
-        
+    def _graphql_request(self, query: str, variables: Optional[Dict] = None) -> Tuple[str, Dict, Dict]:
+        """URL, JSON payload and headers of a GraphQL request."""
         url = f"{self.server_url}{self.METADATA_API_PATH}"
         
         headers = {
@@ -172,46 +378,79 @@ class TableauMetadataAPIClient:
         if variables:
             payload["variables"] = variables
         
-        response = self.session.post(url, json=payload, headers=headers)
+        return url, payload, headers
+    
+    def _handle_graphql_response(self, response: Any) -> Dict:
+        """Data of a GraphQL response (requests or httpx), raising on HTTP or GraphQL errors."""
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
         
+        if response.status_code in self.THROTTLE_STATUS_CODES:
+            raise MetadataAPIThrottledError(
+                f"GraphQL query throttled: {response.status_code} - {response.text}", retry_after
+            )
         if response.status_code != 200:
             raise Exception(f"GraphQL query failed: {response.status_code} - {response.text}")
         
         result = response.json()
         
         if "errors" in result:
+            messages = " ".join(str(error.get("message", "")) for error in result["errors"] if isinstance(error, dict))
+            if self.NODE_LIMIT_ERROR_PATTERN.search(messages):
+                raise NodeLimitExceededError(f"GraphQL errors: {result['errors']}")
+            if self.THROTTLE_ERROR_PATTERN.search(messages):
+                raise MetadataAPIThrottledError(f"GraphQL errors: {result['errors']}", retry_after)
             raise Exception(f"GraphQL errors: {result['errors']}")
         
         return result.get("data", {})
     
-    def get_workbook_metadata(
-        self,
-        workbook_name: str,
-        project_name: Optional[str] = None
-    ) -> WorkbookMetadata:
+    def _workbook_filter(self, project_name: Optional[str]) -> Dict:
+        """Variables of WORKBOOKS_PAGE_QUERY that restrict it to a project, if one is given."""
+        return {"filter": {"projectName": project_name}} if project_name else {}
+    
+    def _filter_workbooks(self, workbooks: List[Dict], project_name: Optional[str]) -> List[Dict]:
         """
-        Get complete metadata for a workbook.
+        Workbooks in the given project, or all of them if no project is given.
         
-        Args:
-            workbook_name: Name of the workbook
-            project_name: Optional project name to filter
-            
-        Returns:
-            WorkbookMetadata: Complete metadata object
+        The server already filters paged listings by project; this is a
+        safeguard against servers that ignore the filter.
         """
-        # Get basic workbook info
-        workbook_data = self._query_workbook(workbook_name, project_name)
-        
-        if not workbook_data:
-            raise ValueError(f"Workbook '{workbook_name}' not found")
-        
-        workbook_luid = workbook_data.get("luid")
-        
-        # Get detailed metadata
-        sheets_data = self._query_sheets(workbook_luid)
-        datasources_data = self._query_datasources(workbook_luid)
-        dashboards_data = self._query_dashboards(workbook_luid)
-        
+        if project_name:
+            workbooks = [w for w in workbooks if w.get("projectName") == project_name]
+        return workbooks
+    
+    def _page_variables(self, page_size: Optional[int], after: Optional[str], **variables: Any) -> Dict:
+        """Variables of a paged query: page size, cursor and the query's own."""
+        return dict(variables, first=page_size or self.PAGE_SIZE, after=after)
+    
+    def _next_cursor(self, connection: Dict) -> Optional[str]:
+        """Cursor of the page after this one, or None on the last page."""
+        page_info = connection.get("pageInfo") or {}
+        return page_info.get("endCursor") if page_info.get("hasNextPage") else None
+    
+    def _fields_connection(self, data: Dict) -> Dict:
+        """The fieldsConnection of a FIELDS_PAGE_QUERY response."""
+        datasources = data.get("embeddedDatasources") or []
+        return (datasources[0].get("fieldsConnection") or {}) if datasources else {}
+    
+    def _build_consolidated_metadata(self, workbook_name: str, workbook_data: Dict) -> WorkbookMetadata:
+        """Build the metadata object from a workbook with nested sheets, datasources and dashboards."""
+        return self._build_workbook_metadata(
+            workbook_name,
+            workbook_data,
+            workbook_data.get("sheets") or [],
+            workbook_data.get("embeddedDatasources") or [],
+            workbook_data.get("dashboards") or [],
+        )
+    
+    def _build_workbook_metadata(
+        self,
+        workbook_name: str,
+        workbook_data: Dict,
+        sheets_data: List[Dict],
+        datasources_data: List[Dict],
+        dashboards_data: List[Dict]
+    ) -> WorkbookMetadata:
+        """Build the complete metadata object from the query results."""
         # Build metadata objects
         datasources = self._build_datasources(datasources_data)
         sheets = self._build_sheets(sheets_data)
@@ -240,118 +479,6 @@ class TableauMetadataAPIClient:
         
         return metadata
     
-    def _query_workbook(self, name: str, project_name: Optional[str] = None) -> Optional[Dict]:
-        """Query workbook by name."""
-        query = """
-        query GetWorkbook($name: String!) {
-            workbooks(filter: {name: $name}) {
-                luid
-                name
-                projectName
-                createdAt
-                updatedAt
-                owner {
-                    name
-                }
-            }
-        }
-        """
-        
-        data = self._graphql_query(query, {"name": name})
-        workbooks = data.get("workbooks", [])
-        
-        if project_name:
-            workbooks = [w for w in workbooks if w.get("projectName") == project_name]
-        
-        return workbooks[0] if workbooks else None
-    
-    def _query_sheets(self, workbook_luid: str) -> List[Dict]:
-        """Query all sheets in a workbook."""
-        query = """
-        query GetSheets($workbookLuid: String!) {
-            sheets(filter: {workbook: {luid: $workbookLuid}}) {
-                name
-                sheetType
-                containedInDashboards {
-                    name
-                }
-                sheetFieldInstances {
-                    name
-                    datasourceField {
-                        name
-                        dataType
-                        role
-                        isCalculated
-                        formula
-                        aggregation
-                    }
-                }
-            }
-        }
-        """
-        
-        data = self._graphql_query(query, {"workbookLuid": workbook_luid})
-        return data.get("sheets", [])
-    
-    def _query_datasources(self, workbook_luid: str) -> List[Dict]:
-        """Query all data sources in a workbook."""
-        query = """
-        query GetDatasources($workbookLuid: String!) {
-            embeddedDatasources(filter: {workbook: {luid: $workbookLuid}}) {
-                name
-                hasExtracts
-                extractLastUpdateTime
-                fields {
-                    name
-                    dataType
-                    role
-                    isCalculated
-                    formula
-                    aggregation
-                    description
-                    isHidden
-                    referencedByCalculations {
-                        name
-                    }
-                    upstreamColumns {
-                        name
-                        table {
-                            name
-                        }
-                    }
-                }
-                upstreamTables {
-                    name
-                    fullName
-                    connectionType
-                    database {
-                        name
-                        connectionType
-                    }
-                }
-            }
-        }
-        """
-        
-        data = self._graphql_query(query, {"workbookLuid": workbook_luid})
-        return data.get("embeddedDatasources", [])
-    
-    def _query_dashboards(self, workbook_luid: str) -> List[Dict]:
-        """Query all dashboards in a workbook."""
-        query = """
-        query GetDashboards($workbookLuid: String!) {
-            dashboards(filter: {workbook: {luid: $workbookLuid}}) {
-                name
-                containsSheets {
-                    name
-                }
-            }
-        }
-        """
-        
-        data = self._graphql_query(query, {"workbookLuid": workbook_luid})
-        return data.get("dashboards", [])
-    
     def _map_data_type(self, api_type: str) -> DataType:
         """Map API data type to our enum."""
         type_map = {
@@ -525,6 +652,157 @@ class TableauMetadataAPIClient:
                         ))
         
         return relationships
+
+
+class TableauMetadataAPIClient(_MetadataAPIClientBase):
+    """
+    Client for Tableau Metadata API (GraphQL).
+    
+    Extracts metadata from published workbooks on Tableau Server/Online.
+    Requires personal access token or session authentication.
+    
+    get_workbook_metadata() sends its queries through
+    AsyncTableauMetadataAPIClient; the call itself stays blocking.
+    """
+    
+    def __init__(
+        self,
+        server_url: str,
+        site_id: str = "",
+        token_name: Optional[str] = None,
+        token_secret: Optional[str] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        api_version: str = "3.21",
+        rate_limiter: Optional[RateLimiter] = None
+    ):
+        """
+        Initialize the Metadata API client.
+        
+        Args:
+            server_url: Tableau Server URL (e.g., https://tableau.company.com)
+            site_id: Site content URL (empty string for default site)
+            token_name: Personal access token name (preferred)
+            token_secret: Personal access token secret
+            username: Username for basic auth (alternative)
+            password: Password for basic auth (alternative)
+            api_version: REST API version
+            rate_limiter: Limiter shared by all GraphQL requests (default: a new RateLimiter())
+        """
+        super().__init__(
+            server_url, site_id, token_name, token_secret, username, password, api_version, rate_limiter
+        )
+        
+        # Session with retry
+        self.session = self._create_session()
+    
+    def _create_session(self) -> requests.Session:
+        """Create a requests session with retry logic."""
+        session = requests.Session()
+        
+        # 429 and 503 are left to the rate limiter, which honors Retry-After
+        # and slows down every request rather than only the retried one
+        retries = Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=[500, 502, 504]
+        )
+        
+        adapter = HTTPAdapter(max_retries=retries)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        
+        return session
+    
+    def authenticate(self) -> bool:
+        """
+        Authenticate with Tableau Server.
+        
+        Returns:
+            bool: True if authentication successful
+        """
+        signin_url, payload, headers = self._signin_request()
+        response = self.session.post(signin_url, json=payload, headers=headers)
+        return self._handle_signin_response(response)
+    
+    def _graphql_query(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """
+        Execute a GraphQL query against the Metadata API.
+        
+        Args:
+            query: GraphQL query string
+            variables: Optional query variables
+            
+        Returns:
+            Dict: Query response data
+        """
+        if not self.auth_token:
+            self.authenticate()
+        
+        for attempt in range(self.MAX_THROTTLE_RETRIES + 1):
+            throttled: Optional[MetadataAPIThrottledError] = None
+            failed = False
+            self.rate_limiter.acquire_sync()
+            try:
+                url, payload, headers = self._graphql_request(query, variables)
+                response = self.session.post(url, json=payload, headers=headers)
+                return self._handle_graphql_response(response)
+            except MetadataAPIThrottledError as e:
+                throttled = e
+                if attempt == self.MAX_THROTTLE_RETRIES:
+                    raise
+            except BaseException:
+                # Errors, timeouts and cancellation say nothing about the load
+                failed = True
+                raise
+            finally:
+                self.rate_limiter.release(
+                    throttled=throttled is not None,
+                    retry_after=throttled.retry_after if throttled else None,
+                    failed=failed,
+                )
+    
+    def get_workbook_metadata(
+        self,
+        workbook_name: str,
+        project_name: Optional[str] = None,
+        consolidated: bool = True
+    ) -> WorkbookMetadata:
+        """
+        Get complete metadata for a workbook.
+        
+        By default everything is fetched with one GraphQL query. With
+        consolidated=False the workbook is looked up first and the sheet,
+        datasource and dashboard queries are then sent concurrently, with
+        datasource fields paged.
+        
+        Args:
+            workbook_name: Name of the workbook
+            project_name: Optional project name to filter
+            consolidated: Fetch with one query (one round trip) rather than
+                several smaller ones; see AsyncTableauMetadataAPIClient
+        
+        Returns:
+            WorkbookMetadata: Complete metadata object
+        """
+        return _run_sync(self._get_workbook_metadata_async(workbook_name, project_name, consolidated))
+    
+    async def _get_workbook_metadata_async(
+        self,
+        workbook_name: str,
+        project_name: Optional[str],
+        consolidated: bool
+    ) -> WorkbookMetadata:
+        """Fetch with an async client that shares this client's sign-in."""
+        async with AsyncTableauMetadataAPIClient(
+            self.server_url, self.site_id, self.token_name, self.token_secret,
+            self.username, self.password, self.api_version, self.rate_limiter
+        ) as client:
+            client.auth_token, client.site_luid = self.auth_token, self.site_luid
+            try:
+                return await client.get_workbook_metadata(workbook_name, project_name, consolidated)
+            finally:
+                self.auth_token, self.site_luid = client.auth_token, client.site_luid
     
     def list_workbooks(self, project_name: Optional[str] = None) -> List[Dict]:
         """
@@ -536,27 +814,75 @@ class TableauMetadataAPIClient:
         Returns:
             List of workbook info dicts
         """
-        query = """
-        query ListWorkbooks {
-            workbooks {
-                luid
-                name
-                projectName
-                createdAt
-                owner {
-                    name
-                }
-            }
-        }
+        return list(self.iter_workbooks(project_name))
+    
+    def iter_workbooks(
+        self,
+        project_name: Optional[str] = None,
+        page_size: Optional[int] = None
+    ) -> Iterator[Dict]:
         """
+        Yield accessible workbooks page by page.
         
-        data = self._graphql_query(query)
-        workbooks = data.get("workbooks", [])
+        The first workbooks are available after one small request, and only
+        one page is held at a time.
         
-        if project_name:
-            workbooks = [w for w in workbooks if w.get("projectName") == project_name]
+        Args:
+            project_name: Optional project filter
+            page_size: Workbooks per request (default PAGE_SIZE)
         
-        return workbooks
+        Yields:
+            Workbook info dicts, as returned by list_workbooks()
+        """
+        after = None
+        while True:
+            data = self._graphql_query(
+                self.WORKBOOKS_PAGE_QUERY,
+                self._page_variables(page_size, after, **self._workbook_filter(project_name))
+            )
+            connection = data.get("workbooksConnection") or {}
+            yield from self._filter_workbooks(connection.get("nodes") or [], project_name)
+            
+            after = self._next_cursor(connection)
+            if after is None:
+                return
+    
+    def list_datasources(self, workbook_luid: str) -> List[Dict]:
+        """
+        List the embedded datasources of a workbook, without their fields.
+        
+        Args:
+            workbook_luid: LUID of the workbook
+        
+        Returns:
+            List of datasource dicts; pass their "id" to iter_fields()
+        """
+        data = self._graphql_query(self.DATASOURCES_QUERY, {"workbookLuid": workbook_luid})
+        return data.get("embeddedDatasources", [])
+    
+    def iter_fields(self, datasource_id: str, page_size: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Yield the fields of an embedded datasource page by page.
+        
+        Args:
+            datasource_id: "id" of a datasource from list_datasources()
+            page_size: Fields per request (default PAGE_SIZE)
+        
+        Yields:
+            Field dicts
+        """
+        after = None
+        while True:
+            data = self._graphql_query(
+                self.FIELDS_PAGE_QUERY,
+                self._page_variables(page_size, after, datasourceId=datasource_id)
+            )
+            connection = self._fields_connection(data)
+            yield from connection.get("nodes") or []
+            
+            after = self._next_cursor(connection)
+            if after is None:
+                return
     
     def close(self):
         """Close the session."""
@@ -564,6 +890,384 @@ class TableauMetadataAPIClient:
             self.session.close()
 
 
+class AsyncTableauMetadataAPIClient(_MetadataAPIClientBase):
+    """
+    Asynchronous client for Tableau Metadata API (GraphQL), built on httpx.
+    
+    get_workbook_metadata() fetches a workbook with one consolidated GraphQL
+    query by default. Very large workbooks can exceed the server's limit on
+    nodes per query; consolidated=False splits the work into a workbook lookup
+    followed by the sheet, datasource and dashboard queries, sent concurrently
+    since they only need the workbook LUID. Datasource fields, the bulk of a
+    large workbook, are then fetched in pages of PAGE_SIZE with fieldsConnection,
+    every datasource at once. On high-latency links (e.g. to Tableau Cloud)
+    that is three round trips, plus one per extra page of the largest datasource.
+    
+    iter_workbooks() and iter_fields() page through workbooksConnection and
+    fieldsConnection, yielding results as each page arrives.
+        
+        async with AsyncTableauMetadataAPIClient(url, token_name=..., token_secret=...) as client:
+            metadata = await client.get_workbook_metadata("Sales")
+    """
+    
+    def __init__(
+        self,
+        server_url: str,
+        site_id: str = "",
+        token_name: Optional[str] = None,
+        token_secret: Optional[str] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        api_version: str = "3.21",
+        rate_limiter: Optional[RateLimiter] = None
+    ):
+        """
+        Initialize the async Metadata API client.
+        
+        Args:
+            server_url: Tableau Server URL (e.g., https://tableau.company.com)
+            site_id: Site content URL (empty string for default site)
+            token_name: Personal access token name (preferred)
+            token_secret: Personal access token secret
+            username: Username for basic auth (alternative)
+            password: Password for basic auth (alternative)
+            api_version: REST API version
+            rate_limiter: Limiter shared by all GraphQL requests (default: a new RateLimiter())
+        """
+        super().__init__(
+            server_url, site_id, token_name, token_secret, username, password, api_version, rate_limiter
+        )
+        
+        # Connection failures are retried like the requests session's; there
+        # is no timeout, as with requests, since large queries can take a while
+        self.client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(retries=3),
+            timeout=None,
+        )
+        
+        # Serializes sign-ins between concurrent requests; created on first
+        # use so that it belongs to the running event loop
+        self._auth_lock: Optional[asyncio.Lock] = None
+    
+    async def authenticate(self) -> bool:
+        """
+        Authenticate with Tableau Server.
+        
+        Returns:
+            bool: True if authentication successful
+        """
+        signin_url, payload, headers = self._signin_request()
+        response = await self.client.post(signin_url, json=payload, headers=headers)
+        return self._handle_signin_response(response)
+    
+    async def _graphql_query(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """
+        Execute a GraphQL query against the Metadata API.
+        
+        Args:
+            query: GraphQL query string
+            variables: Optional query variables
+            
+        Returns:
+            Dict: Query response data
+        """
+        if not self.auth_token:
+            await self._sign_in(None)
+        
+        for attempt in range(self.MAX_THROTTLE_RETRIES + 1):
+            throttled: Optional[MetadataAPIThrottledError] = None
+            failed = False
+            await self.rate_limiter.acquire()
+            try:
+                return await self._send_graphql_query(query, variables)
+            except MetadataAPIThrottledError as e:
+                throttled = e
+                if attempt == self.MAX_THROTTLE_RETRIES:
+                    raise
+            except BaseException:
+                # Errors, timeouts and cancellation say nothing about the load
+                failed = True
+                raise
+            finally:
+                self.rate_limiter.release(
+                    throttled=throttled is not None,
+                    retry_after=throttled.retry_after if throttled else None,
+                    failed=failed,
+                )
+    
+    async def _send_graphql_query(self, query: str, variables: Optional[Dict]) -> Dict:
+        """Send a GraphQL query once, signing in again if the session expired."""
+        token = self.auth_token
+        url, payload, headers = self._graphql_request(query, variables)
+        response = await self.client.post(url, json=payload, headers=headers)
+        
+        if response.status_code == 401:
+            # The session expired (e.g. part way through a long crawl): sign in
+            # again and retry once
+            await self._sign_in(token)
+            url, payload, headers = self._graphql_request(query, variables)
+            response = await self.client.post(url, json=payload, headers=headers)
+        
+        return self._handle_graphql_response(response)
+    
+    async def _sign_in(self, expired_token: Optional[str]) -> None:
+        """Authenticate, unless a concurrent request already replaced expired_token."""
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        
+        async with self._auth_lock:
+            if self.auth_token == expired_token:
+                await self.authenticate()
+    
+    async def get_workbook_metadata(
+        self,
+        workbook_name: str,
+        project_name: Optional[str] = None,
+        consolidated: bool = True
+    ) -> WorkbookMetadata:
+        """
+        Get complete metadata for a workbook.
+        
+        Args:
+            workbook_name: Name of the workbook
+            project_name: Optional project name to filter
+            consolidated: Fetch with one query (one round trip) rather than
+                several smaller ones
+        
+        Returns:
+            WorkbookMetadata: Complete metadata object
+        """
+        if consolidated:
+            workbook_data = await self._query_workbook(
+                workbook_name, project_name, self.WORKBOOK_METADATA_QUERY
+            )
+            if not workbook_data:
+                raise ValueError(f"Workbook '{workbook_name}' not found")
+            
+            return self._build_consolidated_metadata(workbook_name, workbook_data)
+        
+        # Get basic workbook info
+        workbook_data = await self._query_workbook(workbook_name, project_name)
+        
+        if not workbook_data:
+            raise ValueError(f"Workbook '{workbook_name}' not found")
+        
+        workbook_luid = workbook_data.get("luid")
+        
+        # Get detailed metadata; the three queries are independent
+        sheets_data, datasources_data, dashboards_data = await asyncio.gather(
+            self._query_sheets(workbook_luid),
+            self._query_datasources(workbook_luid),
+            self._query_dashboards(workbook_luid),
+        )
+        
+        return self._build_workbook_metadata(
+            workbook_name, workbook_data, sheets_data, datasources_data, dashboards_data
+        )
+    
+    async def get_workbook_metadata_by_luid(
+        self,
+        workbook_luid: str,
+        consolidated: bool = True
+    ) -> WorkbookMetadata:
+        """
+        Get complete metadata for the workbook with the given LUID.
+        
+        LUIDs are unique across projects, so site crawls fetch by LUID.
+        Without consolidation the workbook, sheet, datasource and dashboard
+        queries are all sent at once, followed by the pages of datasource fields.
+        
+        Args:
+            workbook_luid: LUID of the workbook, as returned by list_workbooks()
+            consolidated: Fetch with one query rather than several smaller ones
+        
+        Returns:
+            WorkbookMetadata: Complete metadata object
+        """
+        variables = {"luid": workbook_luid}
+        
+        if consolidated:
+            data = await self._graphql_query(self.WORKBOOK_METADATA_BY_LUID_QUERY, variables)
+            workbooks = data.get("workbooks", [])
+            if not workbooks:
+                raise ValueError(f"Workbook with LUID '{workbook_luid}' not found")
+            
+            return self._build_consolidated_metadata(workbooks[0].get("name", ""), workbooks[0])
+        
+        data, sheets_data, datasources_data, dashboards_data = await asyncio.gather(
+            self._graphql_query(self.WORKBOOK_BY_LUID_QUERY, variables),
+            self._query_sheets(workbook_luid),
+            self._query_datasources(workbook_luid),
+            self._query_dashboards(workbook_luid),
+        )
+        workbooks = data.get("workbooks", [])
+        if not workbooks:
+            raise ValueError(f"Workbook with LUID '{workbook_luid}' not found")
+        
+        return self._build_workbook_metadata(
+            workbooks[0].get("name", ""), workbooks[0], sheets_data, datasources_data, dashboards_data
+        )
+    
+    async def _query_workbook(
+        self,
+        name: str,
+        project_name: Optional[str] = None,
+        query: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Query workbook by name, with WORKBOOK_QUERY or the given query."""
+        data = await self._graphql_query(query or self.WORKBOOK_QUERY, {"name": name})
+        workbooks = self._filter_workbooks(data.get("workbooks", []), project_name)
+        return workbooks[0] if workbooks else None
+    
+    async def _query_sheets(self, workbook_luid: str) -> List[Dict]:
+        """Query all sheets in a workbook."""
+        data = await self._graphql_query(self.SHEETS_QUERY, {"workbookLuid": workbook_luid})
+        return data.get("sheets", [])
+    
+    async def _query_datasources(self, workbook_luid: str) -> List[Dict]:
+        """Query all data sources in a workbook, with their fields fetched page by page."""
+        datasources = await self.list_datasources(workbook_luid)
+        
+        # Every field of every datasource in one response can run to tens of
+        # megabytes; page through each datasource's fields instead, all
+        # datasources at once
+        fields = await asyncio.gather(*(
+            self._collect_fields(datasource.get("id")) for datasource in datasources
+        ))
+        for datasource, datasource_fields in zip(datasources, fields):
+            datasource["fields"] = datasource_fields
+        
+        return datasources
+    
+    async def _collect_fields(self, datasource_id: str) -> List[Dict]:
+        """All fields of a datasource, from iter_fields()."""
+        return [field async for field in self.iter_fields(datasource_id)]
+    
+    async def _query_dashboards(self, workbook_luid: str) -> List[Dict]:
+        """Query all dashboards in a workbook."""
+        data = await self._graphql_query(self.DASHBOARDS_QUERY, {"workbookLuid": workbook_luid})
+        return data.get("dashboards", [])
+    
+    async def list_workbooks(self, project_name: Optional[str] = None) -> List[Dict]:
+        """
+        List all accessible workbooks.
+        
+        Args:
+            project_name: Optional project filter
+            
+        Returns:
+            List of workbook info dicts
+        """
+        return [workbook async for workbook in self.iter_workbooks(project_name)]
+    
+    async def iter_workbooks(
+        self,
+        project_name: Optional[str] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield accessible workbooks page by page.
+            
+            async for workbook in client.iter_workbooks():
+                ...
+        
+        Args:
+            project_name: Optional project filter
+            page_size: Workbooks per request (default PAGE_SIZE)
+        
+        Yields:
+            Workbook info dicts, as returned by list_workbooks()
+        """
+        after = None
+        while True:
+            data = await self._graphql_query(
+                self.WORKBOOKS_PAGE_QUERY,
+                self._page_variables(page_size, after, **self._workbook_filter(project_name))
+            )
+            connection = data.get("workbooksConnection") or {}
+            for workbook in self._filter_workbooks(connection.get("nodes") or [], project_name):
+                yield workbook
+            
+            after = self._next_cursor(connection)
+            if after is None:
+                return
+    
+    async def list_datasources(self, workbook_luid: str) -> List[Dict]:
+        """
+        List the embedded datasources of a workbook, without their fields.
+        
+        Args:
+            workbook_luid: LUID of the workbook
+        
+        Returns:
+            List of datasource dicts; pass their "id" to iter_fields()
+        """
+        data = await self._graphql_query(self.DATASOURCES_QUERY, {"workbookLuid": workbook_luid})
+        return data.get("embeddedDatasources", [])
+    
+    async def iter_fields(self, datasource_id: str, page_size: Optional[int] = None) -> AsyncIterator[Dict]:
+        """
+        Yield the fields of an embedded datasource page by page.
+        
+        Args:
+            datasource_id: "id" of a datasource from list_datasources()
+            page_size: Fields per request (default PAGE_SIZE)
+        
+        Yields:
+            Field dicts
+        """
+        after = None
+        while True:
+            data = await self._graphql_query(
+                self.FIELDS_PAGE_QUERY,
+                self._page_variables(page_size, after, datasourceId=datasource_id)
+            )
+            connection = self._fields_connection(data)
+            for field in connection.get("nodes") or []:
+                yield field
+            
+            after = self._next_cursor(connection)
+            if after is None:
+                return
+    
+    async def close(self):
+        """Close the HTTP client."""
+        await self.client.aclose()
+    
+    async def __aenter__(self) -> "AsyncTableauMetadataAPIClient":
+        return self
+    
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+def _run_sync(awaitable: Awaitable[T]) -> T:
+    """Run a coroutine to completion from blocking code."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(awaitable)
+    
+    # Called from inside an event loop (e.g. a notebook), where asyncio.run()
+    # is not allowed: run it on a fresh loop in a helper thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, awaitable).result()
+
+
+class MetadataAPIThrottledError(Exception):
+    """Raised when the Metadata API throttles a request more times than the client retries."""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        # Seconds the server asked to wait, if it said
+        self.retry_after = retry_after
+
+
+class NodeLimitExceededError(Exception):
+    """Raised when a query's result exceeds the server's node limit."""
+    pass
+
+
 class MetadataAPINotAvailableError(Exception):
     """Raised when trying to use Metadata API on local files."""
     pass
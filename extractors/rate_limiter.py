@@ -0,0 +1,252 @@
+"""
+Adaptive rate limiting for the Tableau Metadata API clients.
+
+One RateLimiter is shared by every request a client sends. It combines two
+limits:
+
+- A token bucket caps the request rate: tokens refill at `rate` per second,
+  up to `burst`, and each request takes one.
+- A concurrency window caps the requests in flight. It adapts AIMD-style, like
+  TCP congestion control: it starts small and doubles with every window's worth
+  of successful requests until the server first throttles; from then on every
+  window's worth of successes widens it by one, and throttling halves it.
+
+When the server sends Retry-After with a throttled request (HTTP 429/503, or
+a GraphQL throttling or timeout error), all requests pause that long. Without
+it, halving the window is the first response; only if throttling continues
+with no request getting through do all requests pause, for an exponentially
+growing backoff. Requests already in flight when the window is halved belong to
+the same congestion event, so their throttles do not halve it again. Requests
+that failed for any other reason only free their slot.
+
+The limiter holds on to an event loop only while a request on it waits for a
+slot, so one instance can serve the blocking client and the async clients it
+runs on other, short-lived event loops.
+
+    limiter = RateLimiter(rate=20)
+    await limiter.acquire()
+    response = await send()
+    limiter.release(
+        throttled=response.status_code == 429,
+        retry_after=parse_retry_after(response.headers.get("Retry-After")),
+    )
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, List, Optional
+
+
+class RateLimiter:
+    """
+    Token bucket plus an AIMD concurrency window, shared across requests.
+    
+    Every acquire() / acquire_sync() must be paired with one release().
+    """
+    
+    def __init__(
+        self,
+        rate: float = 100.0,
+        burst: Optional[int] = None,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 32,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0
+    ):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            rate: Requests per second the token bucket allows
+            burst: Requests that may be sent at once after an idle period
+                (default: one second's worth)
+            initial_concurrency: Starting size of the concurrency window
+            max_concurrency: Largest size the window may grow to
+            backoff: Pause when throttling without Retry-After continues after
+                the window was halved, in seconds; doubles each further time
+            max_backoff: Longest pause, whatever the server asks for
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        
+        self.rate = rate
+        self.burst = max(1, burst if burst is not None else int(rate))
+        self.max_concurrency = max(1, max_concurrency)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        
+        # Window size; fractional so additive increase can creep up by 1/window
+        self.concurrency = float(min(max(1, initial_concurrency), self.max_concurrency))
+        self.in_flight = 0
+        # Grow the window exponentially until the first throttle
+        self._slow_start = True
+        
+        # Counters for reporting
+        self.requests = 0
+        self.throttled = 0
+        
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._consecutive_throttles = 0
+        # Requests that were in flight when the window was last halved
+        self._stale_in_flight = 0
+        self._lock = threading.Lock()
+        # Wake-up callbacks of requests waiting for a free slot in the window
+        self._waiters: List[Callable[[], None]] = []
+    
+    async def acquire(self) -> None:
+        """Wait until a request may be sent, from async code."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            future = loop.create_future()
+            wake = functools.partial(_wake, loop, future)
+            wait = self._reserve(wake)
+            if wait == 0:
+                return
+            if wait is None:
+                try:
+                    await future
+                finally:
+                    # Cancelled waiters must not stay behind to be woken on a
+                    # loop that may be closed by then
+                    self._discard_waiter(wake)
+            else:
+                await asyncio.sleep(wait)
+    
+    def acquire_sync(self) -> None:
+        """Wait until a request may be sent, blocking the calling thread."""
+        while True:
+            event = threading.Event()
+            wait = self._reserve(event.set)
+            if wait == 0:
+                return
+            if wait is None:
+                event.wait()
+            else:
+                time.sleep(wait)
+    
+    def release(
+        self,
+        throttled: bool = False,
+        retry_after: Optional[float] = None,
+        failed: bool = False
+    ) -> None:
+        """
+        Record the outcome of a request sent after acquire().
+        
+        Args:
+            throttled: The server throttled the request (it may be retried)
+            retry_after: Seconds the server asked to wait, if it said
+            failed: The request failed otherwise (an error response, a
+                timeout, cancellation); the slot is freed but the window
+                neither grows nor shrinks
+        """
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+            
+            stale = self._stale_in_flight > 0
+            if stale:
+                self._stale_in_flight -= 1
+            
+            if throttled:
+                self.throttled += 1
+                if not stale:
+                    self.concurrency = max(1.0, self.concurrency / 2)
+                    self._slow_start = False
+                    self._stale_in_flight = self.in_flight
+                    self._consecutive_throttles += 1
+                    if retry_after is None and self._consecutive_throttles > 1:
+                        retry_after = self.backoff * 2 ** (self._consecutive_throttles - 2)
+                
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + min(retry_after, self.max_backoff))
+            elif not failed:
+                self._consecutive_throttles = 0
+                increase = 1 if self._slow_start else 1 / self.concurrency
+                self.concurrency = min(float(self.max_concurrency), self.concurrency + increase)
+            
+            waiters, self._waiters = self._waiters, []
+        
+        for wake in waiters:
+            wake()
+    
+    def _discard_waiter(self, wake: Callable[[], None]) -> None:
+        """Forget a wake-up callback that release() has not taken yet."""
+        with self._lock:
+            try:
+                self._waiters.remove(wake)
+            except ValueError:
+                pass
+    
+    def _reserve(self, wake: Callable[[], None]) -> Optional[float]:
+        """
+        Take a slot and a token if both are free.
+        
+        Returns:
+            0 if the request may go now; seconds to sleep before trying again;
+            or None if the window is full, in which case wake is called when a
+            request is released
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            
+            if self.in_flight >= int(self.concurrency):
+                self._waiters.append(wake)
+                return None
+            
+            self._tokens = min(float(self.burst), self._tokens + (now - self._refilled_at) * self.rate)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            
+            self._tokens -= 1
+            self.in_flight += 1
+            self.requests += 1
+            return 0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header.
+    
+    Accepts both forms allowed by HTTP: a number of seconds or a date.
+    Returns None if the header is missing or unreadable.
+    """
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _wake(loop: asyncio.AbstractEventLoop, future: "asyncio.Future[None]") -> None:
+    """Wake an async waiter from any thread; a waiter whose loop has closed is gone."""
+    try:
+        loop.call_soon_threadsafe(_resolve, future)
+    except RuntimeError:
+        pass
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    """Wake an async waiter, unless it was cancelled meanwhile."""
+    if not future.done():
+        future.set_result(None)
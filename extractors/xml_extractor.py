@@ -6,14 +6,28 @@ about all KPIs, fields, visuals, filters, and relationships.
 """
 
 import zipfile
-import tempfile
-import os
+import hashlib
 import re
-from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple, Set
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Optional, List, Dict, Any, Tuple, Set, Iterator, Union, IO
 from lxml import etree
 from datetime import datetime
 
+from extractors.formula_parser import (
+    AGGREGATE_FUNCTIONS,
+    TABLE_CALC_FUNCTIONS,
+    FIELD,
+    analyze_formula,
+    field_name,
+    is_federated_qualifier,
+    parse_formula,
+)
+
 from models.metadata_models import (
     DataType,
     AggregationType,
@@ -33,11 +47,230 @@ from models.metadata_models import (
     DataSourceMetadata,
     ParameterMetadata,
     RelationshipMetadata,
-    MetricDetailRow,
+    MetricDefinition,
+    MetricSheetContext,
+    MetricUsage,
     WorkbookMetadata,
 )
 
 
+# Prefixes of Tableau's internal field names, e.g. none:Category:nk or sum:Sales:qk
+_FIELD_PREFIXES = frozenset({
+    "none", "sum", "avg", "min", "max", "count", "countd", "attr", "usr",
+    "calculation", "year", "month", "day", "week", "quarter",
+})
+
+# Number of distinct raw field names whose cleaned form is kept in memory
+FIELD_NAME_CACHE_SIZE = 65536
+
+# [bracketed] field references in shelf text
+_BRACKETED_PATTERN = re.compile(r'\[([^\]]+)\]')
+
+# Explicit shelf aggregations like SUM([Sales]) and the wrapped field
+_SHELF_AGGREGATION_PATTERN = re.compile(r'(SUM|AVG|COUNTD|COUNT|MIN|MAX|MEDIAN|ATTR)\(', re.IGNORECASE)
+_PARENTHESIZED_PATTERN = re.compile(r'\(([^)]+)\)')
+
+
+@lru_cache(maxsize=FIELD_NAME_CACHE_SIZE)
+def normalize_field_name(name: str) -> str:
+    """
+    Clean Tableau internal field names to human-readable format.
+    
+    Shared by every extractor in the process. Results are interned, so the same
+    field name repeated across sheets and metric rows is a single string.
+    """
+    if not name:
+        return ""
+    
+    # Handle multipart names like [ds].[field]
+    if name.startswith("[") and name.endswith("]"):
+        name = name.rpartition("].[")[2].strip("[]")
+    
+    # Handle federated datasource prefixes
+    if "." in name and not name.startswith("["):
+        head = name.partition(".")[0]
+        if len(head) > 15 or "federated" in head.lower():
+            name = name.rpartition(".")[2]
+    
+    # Handle prefixes like none:Category:nk or sum:Sales:qk
+    if ":" in name:
+        head, _, rest = name.partition(":")
+        if head.lower() in _FIELD_PREFIXES:
+            name = rest.partition(":")[0]
+        else:
+            name = head
+    
+    return sys.intern(name.strip("[] "))
+
+
+class _SubtreeSkippingTarget:
+    """
+    lxml parser target that drops denied subtrees before any element is built.
+    
+    Events inside a skipped subtree are discarded; everything else is forwarded
+    to a regular TreeBuilder, so the result is an ordinary lxml element tree.
+    """
+    
+    def __init__(self, skip_tags: frozenset):
+        self._builder = etree.TreeBuilder()
+        self._skip_tags = skip_tags
+        self._skip_depth = 0
+    
+    def start(self, tag, attrib, nsmap=None):
+        if self._skip_depth or tag in self._skip_tags:
+            self._skip_depth += 1
+            return
+        self._builder.start(tag, attrib, nsmap)
+    
+    def end(self, tag):
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return None
+        return self._builder.end(tag)
+    
+    def data(self, data):
+        if not self._skip_depth:
+            self._builder.data(data)
+    
+    def comment(self, text):
+        if not self._skip_depth:
+            self._builder.comment(text)
+    
+    def pi(self, target, data=None):
+        if not self._skip_depth:
+            self._builder.pi(target, data)
+    
+    def close(self):
+        return self._builder.close()
+
+
+class _ElementIndex:
+    """
+    Descendant lookup table for one workbook subtree.
+    
+    Maps tag names to the matching descendants in document order, with a second
+    table for elements nested inside <panes>. It is filled during a single
+    traversal so the _parse_* methods read from it instead of rescanning the
+    subtree with ".//" queries.
+    """
+    
+    def __init__(self, element: etree._Element):
+        self.element = element
+        self._tags: Dict[str, List[etree._Element]] = {}
+        self._pane_tags: Dict[str, List[etree._Element]] = {}
+        self._keyed: Dict[Tuple[str, str, bool], Dict[Optional[str], List[etree._Element]]] = {}
+    
+    def add(self, elem: etree._Element, in_panes: bool) -> None:
+        """Record a descendant element."""
+        tag = elem.tag
+        if tag in self._tags:
+            self._tags[tag].append(elem)
+        else:
+            self._tags[tag] = [elem]
+        
+        if in_panes:
+            if tag in self._pane_tags:
+                self._pane_tags[tag].append(elem)
+            else:
+                self._pane_tags[tag] = [elem]
+    
+    def findall(self, tag: str, in_panes: bool = False) -> List[etree._Element]:
+        """All descendants with the given tag (equivalent to './/tag')."""
+        tags = self._pane_tags if in_panes else self._tags
+        return tags.get(tag, [])
+    
+    def find(self, tag: str, in_panes: bool = False) -> Optional[etree._Element]:
+        """First descendant with the given tag, or None."""
+        elems = self.findall(tag, in_panes)
+        return elems[0] if elems else None
+    
+    def findall_by(self, tag: str, attr: str, value: str, in_panes: bool = False) -> List[etree._Element]:
+        """Descendants with the given tag and attribute value (".//tag[@attr='value']")."""
+        key = (tag, attr, in_panes)
+        keyed = self._keyed.get(key)
+        if keyed is None:
+            keyed = {}
+            for elem in self.findall(tag, in_panes):
+                keyed.setdefault(elem.get(attr), []).append(elem)
+            self._keyed[key] = keyed
+        return keyed.get(value, [])
+    
+    @classmethod
+    def build(cls, element: etree._Element) -> "_ElementIndex":
+        """Index a single subtree."""
+        return cls.build_many(element, {element.tag})[element.tag][0]
+    
+    @classmethod
+    def build_many(
+        cls,
+        root: etree._Element,
+        owner_tags: Set[str],
+        sections: Optional[Dict[str, str]] = None
+    ) -> Dict[str, List["_ElementIndex"]]:
+        """
+        Index every outermost subtree rooted at one of owner_tags in a single traversal.
+        
+        Owner tags nested inside another owner (e.g. the <datasource> references
+        inside a worksheet view) are indexed as ordinary descendants of the
+        enclosing owner rather than as owners of their own. If sections is
+        given (section tag -> owner tag, like STREAMING_SECTIONS), an owner
+        must also be a child of its section directly below the root, e.g.
+        workbook/datasources/datasource, which is what the streaming parser
+        picks by depth.
+        """
+        owners: Dict[str, List[_ElementIndex]] = {tag: [] for tag in owner_tags}
+        open_owners: List[Tuple[_ElementIndex, int, int]] = []  # (index, depth, panes depth)
+        depth = 0
+        panes_depth = 0
+        section = None
+        
+        for event, elem in etree.iterwalk(root, events=("start", "end")):
+            tag = elem.tag
+            if not isinstance(tag, str):
+                continue  # comments and processing instructions
+            
+            if event == "start":
+                depth += 1
+                for owner, _, owner_panes_depth in open_owners:
+                    owner.add(elem, panes_depth > owner_panes_depth)
+                
+                if depth == 2:
+                    section = tag
+                if tag == "panes":
+                    panes_depth += 1
+                if tag in owners and not open_owners and (
+                    sections is None or (depth == 3 and sections.get(section) == tag)
+                ):
+                    index = cls(elem)
+                    owners[tag].append(index)
+                    open_owners.append((index, depth, panes_depth))
+            else:
+                if tag == "panes":
+                    panes_depth -= 1
+                if open_owners and open_owners[-1][1] == depth:
+                    open_owners.pop()
+                depth -= 1
+        
+        return owners
+
+
+@dataclass
+class IncrementalState:
+    """
+    What an incremental re-extraction needs from the previous run on a workbook.
+    
+    fingerprints lists the SHA-256 of every top-level subtree per kind
+    ("datasource", "parameters", "worksheet", "dashboard") in document order;
+    subtrees maps each fingerprint to the model parsed from it (the parameter
+    list for the Parameters datasource).
+    """
+    version: str
+    metadata: WorkbookMetadata
+    fingerprints: Dict[str, List[str]]
+    subtrees: Dict[str, Any]
+    sheet_dependencies: Dict[str, Dict[str, List[str]]]
+
+
 class XMLMetadataExtractor:
     """
     Comprehensive XML-based metadata extractor for Tableau workbooks.
@@ -46,6 +279,10 @@ class XMLMetadataExtractor:
     the native XML structure.
     """
     
+    # Bump whenever parsing or the metadata models change; part of the
+    # extraction cache key so stale cached results are never returned
+    EXTRACTOR_VERSION = "3"
+    
     # Data type mappings
     DATATYPE_MAP = {
         "string": DataType.STRING,
@@ -75,6 +312,38 @@ class XMLMetadataExtractor:
         "collect": AggregationType.COLLECT,
     }
     
+    # Top-level sections and the child elements handled one at a time in streaming mode
+    STREAMING_SECTIONS = {
+        "datasources": "datasource",
+        "worksheets": "worksheet",
+        "dashboards": "dashboard",
+    }
+    
+    # Subtrees never read by the extractor (base64 thumbnails, window layouts,
+    # formatting); skipped without building elements in selective mode
+    SKIPPED_SUBTREES = frozenset({
+        "thumbnails",
+        "windows",
+        "style",
+        "format",
+        "preferences",
+    })
+    
+    # Worksheets/dashboards sent to a worker process per task when workers > 1,
+    # and the fewest subtrees for which starting a process pool pays off
+    PARALLEL_CHUNK_SIZE = 20
+    PARALLEL_MIN_SUBTREES = 40
+    
+    # Subtree kinds each relationship type is derived from; when extracting
+    # incrementally, types whose inputs are unchanged are carried over
+    RELATIONSHIP_INPUTS = {
+        "field_to_sheet": ("datasource", "worksheet"),
+        "calc_to_field": ("datasource",),
+        "sheet_to_dashboard": ("worksheet", "dashboard"),
+        "action": ("dashboard",),
+        "parameter": ("parameters", "datasource"),
+    }
+    
     # Mark type mappings
     MARK_TYPE_MAP = {
         "bar": MarkType.BAR,
@@ -93,43 +362,59 @@ class XMLMetadataExtractor:
         "density": MarkType.DENSITY,
     }
     
-    # Aggregation functions for formula analysis
-    AGGREGATE_FUNCTIONS = {
-        "SUM", "AVG", "MIN", "MAX", "COUNT", "COUNTD", "MEDIAN",
-        "STDEV", "STDEVP", "VAR", "VARP", "CORR", "COVAR", "COVARP",
-        "ATTR", "COLLECT", "PERCENTILE"
-    }
-    
-    # Table calculation functions
-    TABLE_CALC_FUNCTIONS = {
-        "RUNNING_SUM", "RUNNING_AVG", "RUNNING_COUNT", "RUNNING_MIN", "RUNNING_MAX",
-        "WINDOW_SUM", "WINDOW_AVG", "WINDOW_COUNT", "WINDOW_MIN", "WINDOW_MAX",
-        "WINDOW_MEDIAN", "WINDOW_STDEV", "WINDOW_STDEVP", "WINDOW_VAR", "WINDOW_VARP",
-        "INDEX", "FIRST", "LAST", "SIZE", "LOOKUP", "PREVIOUS_VALUE",
-        "RANK", "RANK_DENSE", "RANK_MODIFIED", "RANK_PERCENTILE", "RANK_UNIQUE",
-        "TOTAL", "SCRIPT_BOOL", "SCRIPT_INT", "SCRIPT_REAL", "SCRIPT_STR"
-    }
+    # Function sets used by formula analysis
+    AGGREGATE_FUNCTIONS = AGGREGATE_FUNCTIONS
+    TABLE_CALC_FUNCTIONS = TABLE_CALC_FUNCTIONS
     
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        streaming: bool = False,
+        selective: bool = False,
+        workers: int = 1
+    ):
         """
         Initialize the extractor with a path to a .twbx or .twb file.
         
         Args:
             file_path: Path to the Tableau workbook file
+            streaming: Parse incrementally with iterparse, releasing each top-level
+                datasource/worksheet/dashboard once it has been processed
+            selective: Skip SKIPPED_SUBTREES while parsing so time and memory
+                follow the metadata-bearing content rather than the file size
+            workers: Number of processes used to parse worksheets and dashboards;
+                1 parses everything in the calling process
         """
         self.file_path = Path(file_path)
+        self.streaming = streaming
+        self.selective = selective
+        self.workers = max(1, workers)
         self.workbook_name = self.file_path.stem
         self.is_packaged = self.file_path.suffix.lower() == ".twbx"
-        self.temp_dir: Optional[tempfile.TemporaryDirectory] = None
         self.twb_path: Optional[Path] = None
+        self.twb_member: Optional[str] = None
         self.extract_files: List[str] = []
+        self.extract_file_info: List[Dict[str, Any]] = []
         self.root: Optional[etree._Element] = None
+        self._subtrees: Dict[str, List[_ElementIndex]] = {}
         
         # Field tracking for relationship mapping
         self._field_to_sheets: Dict[str, List[str]] = {}
         self._calc_field_to_sheets: Dict[str, List[str]] = {}
         self._sheet_to_dashboards: Dict[str, List[str]] = {}
         
+        # Worksheet datasource-dependencies: sheet -> datasource -> column names
+        self._sheet_dependencies: Dict[str, Dict[str, List[str]]] = {}
+        
+        # Incremental extraction: the previous run's state, this run's subtree
+        # fingerprints per kind (None unless extracting incrementally), the
+        # model parsed or reused for each fingerprint, and what was reused
+        self._previous: Optional[IncrementalState] = None
+        self._fingerprints: Optional[Dict[str, List[str]]] = None
+        self._parsed_subtrees: Dict[str, Any] = {}
+        self._reused: Set[str] = set()
+        self._reused_sheets: Set[str] = set()
+        
     def extract(self) -> WorkbookMetadata:
         """
         Extract all metadata from the Tableau workbook.
@@ -137,135 +422,409 @@ class XMLMetadataExtractor:
         Returns:
             WorkbookMetadata: Complete metadata object
         """
-        try:
-            # Extract packaged workbook if needed
-            if self.is_packaged:
-                self._extract_twbx()
+        with self._open_twb() as twb_source:
+            if self.streaming:
+                version, build, datasources, parameters, sheets, dashboards = self._parse_streaming(twb_source)
             else:
-                self.twb_path = self.file_path
-            
-            # Parse the TWB XML
-            tree = etree.parse(str(self.twb_path))
-            self.root = tree.getroot()
-            
-            # Extract version info
-            version = self.root.get("version", "unknown")
-            build = self.root.get("source-build", None)
-            
-            # Extract all components
-            datasources = self._parse_datasources()
-            parameters = self._parse_parameters()
-            sheets = self._parse_worksheets()
-            dashboards = self._parse_dashboards()
-            
-            # Build relationships
-            relationships = self._build_relationships(datasources, sheets, dashboards, parameters)
-            
-            # Build flattened metric rows (one row per metric-worksheet combination)
-            metric_rows = self._build_metric_rows(datasources, sheets, dashboards)
-            
-            # Build workbook metadata
-            metadata = WorkbookMetadata(
-                name=self.workbook_name,
-                version=version,
-                build=build,
-                source_file=str(self.file_path),
-                extraction_timestamp=datetime.now(),
-                extraction_method="xml",
-                datasources=datasources,
-                sheets=sheets,
-                dashboards=dashboards,
-                parameters=parameters,
-                relationships=relationships,
-                metric_rows=metric_rows,
-            )
-            
-            # Compute statistics
-            metadata.compute_statistics()
-            
-            return metadata
-            
-        finally:
-            # Cleanup temp directory
-            if self.temp_dir:
-                self.temp_dir.cleanup()
+                # Parse the TWB XML
+                if self.selective:
+                    parser = etree.XMLParser(target=_SubtreeSkippingTarget(self.SKIPPED_SUBTREES))
+                    self.root = etree.parse(twb_source, parser)
+                else:
+                    tree = etree.parse(twb_source)
+                    self.root = tree.getroot()
+                
+                # Index the top-level datasources, worksheets and dashboards in one traversal
+                self._subtrees = _ElementIndex.build_many(
+                    self.root, set(self.STREAMING_SECTIONS.values()), self.STREAMING_SECTIONS
+                )
+                
+                # Extract version info
+                version = self.root.get("version", "unknown")
+                build = self.root.get("source-build", None)
+                
+                # Extract all components
+                datasources = self._parse_datasources()
+                parameters = self._parse_parameters()
+                if self._use_workers(self._subtrees.get("worksheet", []) + self._subtrees.get("dashboard", [])):
+                    sheets, dashboards = self._parse_views_parallel()
+                else:
+                    sheets = self._parse_worksheets()
+                    dashboards = self._parse_dashboards()
+        
+        # Resolve worksheet dependencies against the top-level definitions
+        self._resolve_dependencies(datasources, parameters, sheets)
+        
+        # Build relationships
+        relationships = self._build_relationships(datasources, sheets, dashboards, parameters)
+        
+        # Build normalized metric usage (one usage per metric-worksheet combination)
+        metric_definitions, metric_sheets, metric_usages = self._build_metrics(datasources, sheets, dashboards)
+        
+        # Build workbook metadata
+        metadata = WorkbookMetadata(
+            name=self.workbook_name,
+            version=version,
+            build=build,
+            source_file=str(self.file_path),
+            extraction_timestamp=datetime.now(),
+            extraction_method="xml",
+            datasources=datasources,
+            sheets=sheets,
+            dashboards=dashboards,
+            parameters=parameters,
+            relationships=relationships,
+            metric_definitions=metric_definitions,
+            metric_sheets=metric_sheets,
+            metric_usages=metric_usages,
+        )
+        
+        # Compute statistics
+        metadata.compute_statistics()
+        
+        return metadata
+    
+    def extract_incremental(self, previous: Optional[IncrementalState] = None) -> IncrementalState:
+        """
+        Extract metadata, reparsing only the subtrees changed since a previous run.
+        
+        Every top-level datasource, worksheet and dashboard is fingerprinted.
+        Those whose fingerprint appears in previous are taken from it instead of
+        being parsed, and relationship types and metric rows whose inputs are
+        unchanged are carried over. The models in previous are reused in place,
+        so previous must not be used again afterwards.
+        
+        Args:
+            previous: State returned by the last extraction of this workbook,
+                or None for a full extraction
+        
+        Returns:
+            IncrementalState: The new metadata and the state for the next run
+        """
+        if previous is not None and previous.version == self.EXTRACTOR_VERSION:
+            self._previous = previous
+        self._fingerprints = {kind: [] for kind in ("datasource", "parameters", "worksheet", "dashboard")}
+        
+        metadata = self.extract()
+        
+        return IncrementalState(
+            version=self.EXTRACTOR_VERSION,
+            metadata=metadata,
+            fingerprints=self._fingerprints,
+            subtrees=self._parsed_subtrees,
+            sheet_dependencies=self._sheet_dependencies,
+        )
     
-    def _extract_twbx(self) -> None:
-        """Extract TWBX archive to temporary directory."""
-        self.temp_dir = tempfile.TemporaryDirectory()
+    @contextmanager
+    def _open_twb(self) -> Iterator[Union[str, IO[bytes]]]:
+        """
+        Open the workbook XML for parsing.
+        
+        Plain .twb files are handed to lxml by path. For .twbx archives the .twb
+        member is streamed straight out of the zip, so nothing is written to disk
+        and bundled extracts are never decompressed.
+        """
+        if not self.is_packaged:
+            self.twb_path = self.file_path
+            yield str(self.file_path)
+            return
         
         with zipfile.ZipFile(self.file_path, 'r') as zip_ref:
-            zip_ref.extractall(self.temp_dir.name)
-        
-        # Find the .twb file
-        for item in os.listdir(self.temp_dir.name):
-            if item.endswith(".twb"):
-                self.twb_path = Path(self.temp_dir.name) / item
-                break
-        
-        # Find extract files
-        data_dir = Path(self.temp_dir.name) / "Data"
-        if data_dir.exists():
-            for item in data_dir.rglob("*"):
-                if item.suffix in [".hyper", ".tde"]:
-                    self.extract_files.append(str(item))
-        
-        if not self.twb_path:
+            twb_info = self._scan_twbx(zip_ref)
+            with zip_ref.open(twb_info) as twb_stream:
+                yield twb_stream
+    
+    def content_hash(self) -> str:
+        """
+        SHA-256 of the workbook XML (the inner .twb for packaged workbooks).
+        
+        The XML is read in chunks without being parsed. Bundled extracts are not
+        read; only their names and sizes from the zip directory are hashed, since
+        the extracted metadata records which extracts a packaged workbook carries.
+        """
+        digest = hashlib.sha256()
+        with self._open_twb() as twb_source:
+            if isinstance(twb_source, str):
+                with open(twb_source, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+            else:
+                for chunk in iter(lambda: twb_source.read(1 << 20), b""):
+                    digest.update(chunk)
+        
+        for info in self.extract_file_info:
+            digest.update(f"\0{info['name']}\0{info['uncompressed_size']}".encode())
+        return digest.hexdigest()
+    
+    def _scan_twbx(self, zip_ref: zipfile.ZipFile) -> zipfile.ZipInfo:
+        """Find the .twb member and list extract files from the zip central directory."""
+        twb_info = None
+        self.extract_files = []
+        self.extract_file_info = []
+        
+        for info in zip_ref.infolist():
+            name = info.filename
+            
+            # The workbook XML sits at the root of the archive
+            if twb_info is None and "/" not in name and name.endswith(".twb"):
+                twb_info = info
+            
+            # Extracts live under Data/ and are only listed, never decompressed
+            elif name.startswith("Data/") and PurePosixPath(name).suffix in [".hyper", ".tde"]:
+                self.extract_files.append(name)
+                self.extract_file_info.append({
+                    "name": name,
+                    "compressed_size": info.compress_size,
+                    "uncompressed_size": info.file_size,
+                })
+        
+        if twb_info is None:
             raise ValueError(f"No .twb file found in {self.file_path}")
+        
+        self.twb_member = twb_info.filename
+        return twb_info
     
-    def _clean_field_name(self, name: str) -> str:
-        """Clean Tableau internal field names to human-readable format."""
-        if not name:
-            return ""
+    def _parse_streaming(self, twb_source: Union[str, IO[bytes]]) -> Tuple[
+        str, Optional[str], List[DataSourceMetadata], List[ParameterMetadata],
+        List[SheetMetadata], List[DashboardMetadata]
+    ]:
+        """
+        Parse the workbook with iterparse, one top-level subtree at a time.
+        
+        Each datasource, worksheet and dashboard is handed to the regular
+        _parse_single_* method as soon as its end tag is read and then cleared,
+        so peak memory tracks the largest single subtree instead of the file.
+        In selective mode SKIPPED_SUBTREES are also cleared the moment they
+        close, even when nested inside a subtree that is still being read.
+        With workers > 1, worksheets and dashboards are serialized as they
+        close; once PARALLEL_MIN_SUBTREES of them have been read a process pool
+        is started and parses them while the file is still being read. A
+        workbook with fewer is parsed inline once the file has been read.
+        """
+        version = "unknown"
+        build = None
+        datasources: List[DataSourceMetadata] = []
+        parameters: List[ParameterMetadata] = []
+        sheets: List[SheetMetadata] = []
+        dashboards: List[DashboardMetadata] = []
+        
+        depth = 0
+        section = None
+        
+        pool: Optional[ProcessPoolExecutor] = None
+        # Serialized views read before the pool is started, in document order
+        deferred: List[Tuple[str, bytes]] = []
+        pending: Dict[str, List[Tuple[bytes, Optional[str]]]] = {"worksheet": [], "dashboard": []}
+        futures: Dict[str, List[Tuple[Future, List[Optional[str]]]]] = {"worksheet": [], "dashboard": []}
+        
+        try:
+            context = etree.iterparse(twb_source, events=("start", "end"), huge_tree=True)
+            for event, elem in context:
+                if event == "start":
+                    depth += 1
+                    if depth == 1:
+                        version = elem.get("version", "unknown")
+                        build = elem.get("source-build", None)
+                    elif depth == 2:
+                        section = elem.tag
+                    continue
+                
+                if self.selective and depth > 3 and elem.tag in self.SKIPPED_SUBTREES:
+                    elem.clear()
+                
+                if depth == 3 and self.STREAMING_SECTIONS.get(section) == elem.tag:
+                    if elem.tag == "datasource":
+                        if elem.get("name", "") == "Parameters":
+                            if not parameters:
+                                parameters = self._parse_subtree("parameters", elem)
+                        else:
+                            datasource = self._parse_subtree("datasource", elem)
+                            if datasource:
+                                datasources.append(datasource)
+                    
+                    elif pool is not None:
+                        self._queue_subtree(pool, elem.tag, elem, pending, futures)
+                    
+                    elif self.workers > 1:
+                        deferred.append((elem.tag, etree.tostring(elem, with_tail=False)))
+                        if len(deferred) >= self.PARALLEL_MIN_SUBTREES:
+                            pool = ProcessPoolExecutor(max_workers=self.workers)
+                            for kind, payload in deferred:
+                                self._queue_subtree(pool, kind, etree.fromstring(payload), pending, futures)
+                            deferred = []
+                    
+                    elif elem.tag == "worksheet":
+                        sheet = self._parse_subtree("worksheet", elem)
+                        if sheet:
+                            sheets.append(sheet)
+                            self._track_worksheet(sheet)
+                    
+                    elif elem.tag == "dashboard":
+                        dashboard = self._parse_subtree("dashboard", elem)
+                        if dashboard:
+                            dashboards.append(dashboard)
+                            self._track_dashboard(dashboard)
+                
+                # Release every finished subtree below the workbook root, including
+                # sections the extractor never reads (windows, thumbnails, ...)
+                if depth in (2, 3):
+                    elem.clear()
+                    parent = elem.getparent()
+                    while elem.getprevious() is not None:
+                        del parent[0]
+                
+                depth -= 1
+            
+            del context
+            
+            # Too few views for a pool to pay off
+            for kind, payload in deferred:
+                if kind == "worksheet":
+                    sheet = self._parse_subtree("worksheet", etree.fromstring(payload))
+                    if sheet:
+                        sheets.append(sheet)
+                        self._track_worksheet(sheet)
+                else:
+                    dashboard = self._parse_subtree("dashboard", etree.fromstring(payload))
+                    if dashboard:
+                        dashboards.append(dashboard)
+                        self._track_dashboard(dashboard)
+            
+            if pool is not None:
+                for kind in pending:
+                    self._flush_chunk(pool, kind, pending, futures)
+                sheets, dashboards = self._merge_parallel(futures["worksheet"], futures["dashboard"])
+        finally:
+            if pool is not None:
+                pool.shutdown()
         
-        # Handle multipart names like [ds].[field]
-        if name.startswith("[") and name.endswith("]"):
-            if "].[" in name:
-                parts = name.split("].[")
-                name = parts[-1].strip("[]")
+        return version, build, datasources, parameters, sheets, dashboards
+    
+    # Clean Tableau internal field names to human-readable format (cached, interned)
+    _clean_field_name = staticmethod(normalize_field_name)
+    
+    def _parse_subtree(
+        self,
+        kind: str,
+        elem: etree._Element,
+        index: Optional[_ElementIndex] = None
+    ) -> Any:
+        """
+        Parse one top-level subtree with the _parse_single_* method for its kind.
+        
+        When extracting incrementally the subtree is fingerprinted first and
+        the previous run's model is reused if the fingerprint is unchanged.
+        """
+        digest = self._fingerprint(kind, elem)
+        model = self._reuse(digest)
+        
+        if model is None:
+            if kind == "datasource":
+                model = self._parse_single_datasource(elem, index)
+            elif kind == "parameters":
+                model = self._parse_parameters_datasource(elem, index)
+            elif kind == "worksheet":
+                model = self._parse_single_worksheet(elem, index)
             else:
-                name = name.strip("[]")
-        
-        # Handle federated datasource prefixes
-        if "." in name and not name.startswith("["):
-            parts = name.split(".")
-            if len(parts) > 1 and (len(parts[0]) > 15 or "federated" in parts[0].lower()):
-                name = parts[-1]
-        
-        # Handle prefixes like none:Category:nk or sum:Sales:qk
-        if ":" in name:
-            prefixes = ["none", "sum", "avg", "min", "max", "count", "countd", "attr", "usr", "calculation", "year", "month", "day", "week", "quarter"]
-            parts = name.split(":")
-            if parts[0].lower() in prefixes:
-                if len(parts) >= 2:
-                    name = parts[1]
-            elif len(parts) > 1:
-                name = parts[0]
-        
-        return name.strip("[] ")
+                model = self._parse_single_dashboard(elem, index)
+        
+        self._record(digest, model)
+        return model
+    
+    def _fingerprint(self, kind: str, elem: etree._Element) -> Optional[str]:
+        """SHA-256 of a top-level subtree, recorded when extracting incrementally."""
+        if self._fingerprints is None:
+            return None
+        
+        digest = hashlib.sha256(etree.tostring(elem, with_tail=False))
+        if kind == "datasource" and self.extract_files:
+            digest.update(b"\0has-extract")  # has_extract comes from the archive, not the XML
+        
+        fingerprint = digest.hexdigest()
+        self._fingerprints[kind].append(fingerprint)
+        return fingerprint
+    
+    def _reuse(self, digest: Optional[str]) -> Any:
+        """
+        Take the previous run's model for an unchanged subtree, or None.
+        
+        What _resolve_dependencies derives from other subtrees is cleared so it
+        can be resolved again. A fingerprint occurring twice (identical
+        subtrees) is only reused once; the copy is parsed.
+        """
+        if digest is None or self._previous is None or digest in self._reused:
+            return None
+        
+        model = self._previous.subtrees.get(digest)
+        if model is None:
+            return None
+        self._reused.add(digest)
+        
+        if isinstance(model, DataSourceMetadata):
+            for field in model.fields:
+                field.used_in_sheets = []
+            for calc in model.calculated_fields:
+                calc.used_in_sheets = []
+        elif isinstance(model, SheetMetadata):
+            model.datasource_caption = None
+            model.calculated_fields_used = []
+            model.parameters_used = []
+            self._sheet_dependencies[model.name] = self._previous.sheet_dependencies.get(model.name, {})
+            self._reused_sheets.add(model.name)
+        elif isinstance(model, list):
+            for param in model:
+                param.used_in_sheets = []
+        
+        return model
+    
+    def _record(self, digest: Optional[str], model: Any) -> None:
+        """Remember the model parsed or reused for a fingerprint, for the next run."""
+        if digest is not None and model is not None:
+            self._parsed_subtrees[digest] = model
+    
+    def _unchanged(self, *kinds: str) -> bool:
+        """Whether every subtree of the given kinds is unchanged since the previous run."""
+        if self._previous is None or self._fingerprints is None:
+            return False
+        return all(
+            self._fingerprints[kind] == self._previous.fingerprints.get(kind)
+            for kind in kinds
+        )
     
     def _parse_datasources(self) -> List[DataSourceMetadata]:
-        """Parse all data sources from the workbook."""
+        """
+        Parse the data sources defined under /workbook/datasources.
+        
+        The <datasource> elements inside worksheet views are references to these
+        definitions and are resolved by _resolve_dependencies instead.
+        """
         datasources = []
         
-        for ds_elem in self.root.findall(".//datasource"):
-            ds_name = ds_elem.get("name", "")
+        for ds_index in self._subtrees.get("datasource", []):
+            ds_name = ds_index.element.get("name", "")
             if ds_name == "Parameters":
                 continue  # Handle parameters separately
             
-            datasource = self._parse_single_datasource(ds_elem)
+            datasource = self._parse_subtree("datasource", ds_index.element, ds_index)
             if datasource:
                 datasources.append(datasource)
         
         return datasources
     
-    def _parse_single_datasource(self, ds_elem: etree._Element) -> Optional[DataSourceMetadata]:
+    def _parse_single_datasource(
+        self,
+        ds_elem: etree._Element,
+        index: Optional[_ElementIndex] = None
+    ) -> Optional[DataSourceMetadata]:
         """Parse a single data source element."""
+        if index is None:
+            index = _ElementIndex.build(ds_elem)
+        
         name = ds_elem.get("name", "Unnamed")
         caption = ds_elem.get("caption")
         
         # Parse connection
-        conn_elem = ds_elem.find(".//connection")
+        conn_elem = index.find("connection")
         connection_type = "unknown"
         connection_class = None
         server = None
@@ -282,17 +841,17 @@ class XMLMetadataExtractor:
             schema_name = conn_elem.get("schema")
         
         # Parse tables and joins
-        tables = self._parse_tables(ds_elem)
-        joins = self._parse_joins(ds_elem)
+        tables = self._parse_tables(index)
+        joins = self._parse_joins(index)
         
         # Parse custom SQL
-        custom_sql = self._parse_custom_sql(ds_elem)
+        custom_sql = self._parse_custom_sql(index)
         
         # Parse fields
-        fields = self._parse_fields(ds_elem)
+        fields = self._parse_fields(index)
         
         # Parse calculated fields
-        calculated_fields = self._parse_calculated_fields(ds_elem)
+        calculated_fields = self._parse_calculated_fields(index)
         
         # Check for extract
         has_extract = len(self.extract_files) > 0
@@ -336,12 +895,12 @@ class XMLMetadataExtractor:
         }
         return type_map.get(class_name.lower(), class_name)
     
-    def _parse_tables(self, ds_elem: etree._Element) -> List[Dict[str, Any]]:
+    def _parse_tables(self, index: _ElementIndex) -> List[Dict[str, Any]]:
         """Parse table information from data source."""
         tables = []
         seen_tables = set()
         
-        for relation in ds_elem.findall(".//relation"):
+        for relation in index.findall("relation"):
             table_name = relation.get("name") or relation.get("table")
             table_type = relation.get("type", "table")
             
@@ -355,12 +914,14 @@ class XMLMetadataExtractor:
         
         return tables
     
-    def _parse_joins(self, ds_elem: etree._Element) -> List[Dict[str, Any]]:
+    def _parse_joins(self, index: _ElementIndex) -> List[Dict[str, Any]]:
         """Parse join relationships from data source."""
         joins = []
         
-        for relation in ds_elem.findall(".//relation[@join]"):
+        for relation in index.findall("relation"):
             join_type = relation.get("join")
+            if join_type is None:
+                continue
             
             # Find join clauses
             clauses = []
@@ -396,20 +957,20 @@ class XMLMetadataExtractor:
         
         return joins
     
-    def _parse_custom_sql(self, ds_elem: etree._Element) -> Optional[str]:
+    def _parse_custom_sql(self, index: _ElementIndex) -> Optional[str]:
         """Extract custom SQL if present."""
-        for relation in ds_elem.findall(".//relation[@type='text']"):
+        for relation in index.findall_by("relation", "type", "text"):
             # Custom SQL is stored as text content or in a special attribute
             text = relation.text
             if text and text.strip():
                 return text.strip()
         return None
     
-    def _parse_fields(self, ds_elem: etree._Element) -> List[FieldMetadata]:
+    def _parse_fields(self, index: _ElementIndex) -> List[FieldMetadata]:
         """Parse field/column definitions from data source."""
         fields = []
         
-        for col_elem in ds_elem.findall(".//column"):
+        for col_elem in index.findall("column"):
             name = col_elem.get("name", "")
             
             # Skip calculated fields (handled separately)
@@ -448,11 +1009,11 @@ class XMLMetadataExtractor:
         
         return fields
     
-    def _parse_calculated_fields(self, ds_elem: etree._Element) -> List[CalculatedFieldMetadata]:
+    def _parse_calculated_fields(self, index: _ElementIndex) -> List[CalculatedFieldMetadata]:
         """Parse calculated field definitions with full formula analysis."""
         calc_fields = []
         
-        for col_elem in ds_elem.findall(".//column"):
+        for col_elem in index.findall("column"):
             name = col_elem.get("name", "")
             
             calc_elem = col_elem.find(".//calculation")
@@ -493,121 +1054,103 @@ class XMLMetadataExtractor:
                 table_calc_type=analysis.get("table_calc_type"),
                 complexity_score=analysis.get("complexity_score", 0),
                 has_nested_calculations=analysis.get("has_nested", False),
+                nesting_depth=analysis.get("nesting_depth", 0),
+                lod_expressions=analysis.get("lod_expressions", []),
             ))
         
         return calc_fields
     
     def _analyze_formula(self, formula: str) -> Dict[str, Any]:
-        """Perform comprehensive analysis of a Tableau formula."""
-        formula_upper = formula.upper()
+        """
+        Perform comprehensive analysis of a Tableau formula.
+        
+        The AST-based analysis is cached per formula text by analyze_formula;
+        this returns fresh lists so the models never share them.
+        """
+        analysis = analyze_formula(formula)
         
         result = {
-            "calculation_type": CalculationType.SIMPLE,
-            "aggregations": [],
-            "functions": [],
-            "referenced_fields": [],
-            "referenced_parameters": [],
-            "complexity_score": 0,
-            "has_nested": False,
+            "calculation_type": analysis.calculation_type,
+            "aggregations": list(analysis.aggregations),
+            "functions": list(analysis.functions),
+            "referenced_fields": list(analysis.referenced_fields),
+            "referenced_parameters": list(analysis.referenced_parameters),
+            "complexity_score": analysis.complexity_score,
+            "has_nested": analysis.has_nested,
+            "nesting_depth": analysis.nesting_depth,
+            "lod_expressions": [
+                {
+                    "type": lod.lod_type,
+                    "dimensions": [self._clean_field_name(d) for d in lod.dimensions],
+                    "expression": lod.expression,
+                }
+                for lod in analysis.lod_expressions
+            ],
         }
         
-        # Extract field references [Field Name]
-        result["referenced_fields"] = re.findall(r'\[([^\]]+)\]', formula)
+        if analysis.lod_type:
+            result["lod_type"] = analysis.lod_type
+            result["lod_dimensions"] = [self._clean_field_name(d) for d in analysis.lod_dimensions]
+            result["lod_expression"] = analysis.lod_expression
         
-        # Extract parameter references [Parameters].[Param Name]
-        param_matches = re.findall(r'\[Parameters\]\.\[([^\]]+)\]', formula)
-        result["referenced_parameters"] = param_matches
-        
-        # Check for LOD expressions
-        lod_match = re.search(r'\{(FIXED|INCLUDE|EXCLUDE)\s+([^:]*):([^}]+)\}', formula, re.IGNORECASE)
-        if lod_match:
-            lod_type = lod_match.group(1).upper()
-            lod_dims_str = lod_match.group(2)
-            lod_expr = lod_match.group(3)
-            
-            lod_dims = [self._clean_field_name(d) for d in re.findall(r'\[([^\]]+)\]', lod_dims_str)]
-            
-            result["lod_type"] = lod_type
-            result["lod_dimensions"] = lod_dims
-            result["lod_expression"] = lod_expr.strip()
-            result["complexity_score"] += 30
-            
-            if lod_type == "FIXED":
-                result["calculation_type"] = CalculationType.LOD_FIXED
-            elif lod_type == "INCLUDE":
-                result["calculation_type"] = CalculationType.LOD_INCLUDE
-            elif lod_type == "EXCLUDE":
-                result["calculation_type"] = CalculationType.LOD_EXCLUDE
-        
-        # Check for table calculations
-        for func in self.TABLE_CALC_FUNCTIONS:
-            if func in formula_upper:
-                result["calculation_type"] = CalculationType.TABLE_CALC
-                result["table_calc_type"] = func
-                result["complexity_score"] += 40
-                break
-        
-        # Find all functions used
-        func_pattern = r'\b([A-Z_]+)\s*\('
-        functions = re.findall(func_pattern, formula_upper)
-        result["functions"] = list(set(functions))
-        
-        # Find aggregations used
-        for agg in self.AGGREGATE_FUNCTIONS:
-            if agg in formula_upper:
-                result["aggregations"].append(agg)
-                if result["calculation_type"] == CalculationType.SIMPLE:
-                    result["calculation_type"] = CalculationType.AGGREGATE
-        
-        # Check for IF statements
-        if "IF " in formula_upper or "IIF(" in formula_upper:
-            result["complexity_score"] += 5
-            if formula_upper.count("IF ") > 2 or formula_upper.count("ELSEIF") > 1:
-                result["complexity_score"] += 10
-        
-        # Check for CASE statements
-        if "CASE " in formula_upper:
-            result["complexity_score"] += 5
-            when_count = formula_upper.count("WHEN ")
-            if when_count > 3:
-                result["complexity_score"] += 10
-        
-        # Check for nested calculations
-        if formula.count("{") > 1 or (len(functions) > 3):
-            result["has_nested"] = True
-            result["complexity_score"] += 15
-        
-        # Cap complexity score
-        result["complexity_score"] = min(result["complexity_score"], 100)
+        if analysis.table_calc_type:
+            result["table_calc_type"] = analysis.table_calc_type
         
         return result
     
     def _make_formula_readable(self, formula: str) -> str:
-        """Convert internal formula to more readable format."""
-        readable = formula
-        
-        # Remove datasource prefixes like [federated.xxx].
-        readable = re.sub(r'\[federated\.[^\]]+\]\.', '', readable)
+        """
+        Convert internal formula to more readable format.
         
-        # Clean up field references with prefixes
-        def clean_field(match):
-            field = match.group(1)
-            cleaned = self._clean_field_name(field)
-            return f"[{cleaned}]"
+        Works on the cached token stream of the formula: [federated.xxx].
+        qualifiers are dropped and field references cleaned, while strings,
+        comments and spacing are copied through unchanged.
+        """
+        tokens = parse_formula(formula).tokens
+        parts = []
+        position = 0
         
-        readable = re.sub(r'\[([^\]]+)\]', clean_field, readable)
+        for i, token in enumerate(tokens):
+            if token.kind != FIELD:
+                continue
+            
+            parts.append(formula[position:token.start])
+            position = token.end
+            
+            # Remove datasource prefixes like [federated.xxx].
+            if is_federated_qualifier(tokens, i):
+                position = tokens[i + 1].end
+                continue
+            
+            # Clean up field references with prefixes
+            cleaned = self._clean_field_name(field_name(token))
+            parts.append("[" + cleaned.replace("]", "]]") + "]")
         
-        return readable
+        parts.append(formula[position:])
+        return "".join(parts)
     
     def _parse_parameters(self) -> List[ParameterMetadata]:
         """Parse parameters from the workbook."""
         parameters = []
         
-        params_ds = self.root.find(".//datasource[@name='Parameters']")
-        if params_ds is None:
-            return parameters
+        for ds_index in self._subtrees.get("datasource", []):
+            if ds_index.element.get("name") == "Parameters":
+                return self._parse_subtree("parameters", ds_index.element, ds_index)
+        
+        return parameters
+    
+    def _parse_parameters_datasource(
+        self,
+        params_ds: etree._Element,
+        index: Optional[_ElementIndex] = None
+    ) -> List[ParameterMetadata]:
+        """Parse the parameter columns of the 'Parameters' datasource."""
+        if index is None:
+            index = _ElementIndex.build(params_ds)
+        
+        parameters = []
         
-        for col_elem in params_ds.findall(".//column"):
+        for col_elem in index.findall("column"):
             name = col_elem.get("name", "").strip("[]")
             if not name:
                 continue
@@ -661,34 +1204,151 @@ class XMLMetadataExtractor:
         
         return parameters
     
+    def _use_workers(self, indexes: List[_ElementIndex]) -> bool:
+        """Whether enough subtrees are left to parse for a process pool to pay off."""
+        return self.workers > 1 and len(indexes) >= self.PARALLEL_MIN_SUBTREES
+    
+    def _parse_views_parallel(self) -> Tuple[List[SheetMetadata], List[DashboardMetadata]]:
+        """
+        Parse worksheets and dashboards in a process pool.
+        
+        Subtrees are serialized and sent in chunks of PARALLEL_CHUNK_SIZE. The
+        results are merged in document order and the cross-sheet tracking is
+        rebuilt here, so the output matches a serial parse.
+        """
+        pending: Dict[str, List[Tuple[bytes, Optional[str]]]] = {"worksheet": [], "dashboard": []}
+        futures: Dict[str, List[Tuple[Future, List[Optional[str]]]]] = {"worksheet": [], "dashboard": []}
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for kind in pending:
+                for index in self._subtrees.get(kind, []):
+                    self._queue_subtree(pool, kind, index.element, pending, futures)
+                self._flush_chunk(pool, kind, pending, futures)
+            return self._merge_parallel(futures["worksheet"], futures["dashboard"])
+    
+    def _queue_subtree(
+        self,
+        pool: ProcessPoolExecutor,
+        kind: str,
+        elem: etree._Element,
+        pending: Dict[str, List[Tuple[bytes, Optional[str]]]],
+        futures: Dict[str, List[Tuple[Future, List[Optional[str]]]]]
+    ) -> None:
+        """
+        Serialize a worksheet/dashboard into the pending chunk for its kind.
+        
+        Full chunks are submitted to the pool. A subtree reused from the previous
+        run flushes the pending chunk and is queued as an already completed
+        future, so results still merge in document order.
+        """
+        digest = self._fingerprint(kind, elem)
+        model = self._reuse(digest)
+        
+        if model is not None:
+            self._flush_chunk(pool, kind, pending, futures)
+            dependencies = self._sheet_dependencies.get(model.name, {}) if kind == "worksheet" else None
+            done: Future = Future()
+            done.set_result([(model, dependencies)])
+            futures[kind].append((done, [digest]))
+            return
+        
+        pending[kind].append((etree.tostring(elem, with_tail=False), digest))
+        if len(pending[kind]) >= self.PARALLEL_CHUNK_SIZE:
+            self._flush_chunk(pool, kind, pending, futures)
+    
+    def _flush_chunk(
+        self,
+        pool: ProcessPoolExecutor,
+        kind: str,
+        pending: Dict[str, List[Tuple[bytes, Optional[str]]]],
+        futures: Dict[str, List[Tuple[Future, List[Optional[str]]]]]
+    ) -> None:
+        """Submit the pending chunk of a kind, if any, with the fingerprints of its subtrees."""
+        chunk = pending[kind]
+        if not chunk:
+            return
+        
+        payloads = [payload for payload, _ in chunk]
+        digests = [digest for _, digest in chunk]
+        futures[kind].append((self._submit_chunk(pool, kind, payloads), digests))
+        pending[kind] = []
+    
+    def _submit_chunk(self, pool: ProcessPoolExecutor, kind: str, payloads: List[bytes]) -> Future:
+        """Submit one chunk of serialized subtrees to the pool."""
+        return pool.submit(_parse_subtree_chunk, str(self.file_path), kind, payloads)
+    
+    def _merge_parallel(
+        self,
+        sheet_futures: List[Tuple[Future, List[Optional[str]]]],
+        dashboard_futures: List[Tuple[Future, List[Optional[str]]]]
+    ) -> Tuple[List[SheetMetadata], List[DashboardMetadata]]:
+        """Collect worker results in submission order and rebuild cross-sheet tracking."""
+        sheets = []
+        dashboards = []
+        
+        for future, digests in sheet_futures:
+            for (sheet, dependencies), digest in zip(future.result(), digests):
+                if sheet:
+                    sheets.append(sheet)
+                    self._sheet_dependencies[sheet.name] = dependencies
+                    self._track_worksheet(sheet)
+                    self._record(digest, sheet)
+        
+        for future, digests in dashboard_futures:
+            for (dashboard, _), digest in zip(future.result(), digests):
+                if dashboard:
+                    dashboards.append(dashboard)
+                    self._track_dashboard(dashboard)
+                    self._record(digest, dashboard)
+        
+        return sheets, dashboards
+    
     def _parse_worksheets(self) -> List[SheetMetadata]:
         """Parse all worksheets from the workbook."""
         sheets = []
         
-        for ws_elem in self.root.findall(".//worksheet"):
-            sheet = self._parse_single_worksheet(ws_elem)
+        for ws_index in self._subtrees.get("worksheet", []):
+            sheet = self._parse_subtree("worksheet", ws_index.element, ws_index)
             if sheet:
                 sheets.append(sheet)
+                self._track_worksheet(sheet)
         
         return sheets
     
-    def _parse_single_worksheet(self, ws_elem: etree._Element) -> Optional[SheetMetadata]:
+    def _track_worksheet(self, sheet: SheetMetadata) -> None:
+        """Record the field to sheet mapping for a parsed worksheet."""
+        for field in sheet.all_fields_used:
+            if field not in self._field_to_sheets:
+                self._field_to_sheets[field] = []
+            self._field_to_sheets[field].append(sheet.name)
+    
+    def _parse_single_worksheet(
+        self,
+        ws_elem: etree._Element,
+        index: Optional[_ElementIndex] = None
+    ) -> Optional[SheetMetadata]:
         """Parse a single worksheet with full metadata."""
+        if index is None:
+            index = _ElementIndex.build(ws_elem)
+        
         name = ws_elem.get("name", "Unnamed")
         title = ws_elem.get("title")
         
         # Get datasource reference
         datasource_name = None
         datasource_caption = None
-        ds_deps = ws_elem.find(".//datasource-dependencies")
+        ds_deps = index.find("datasource-dependencies")
         if ds_deps is not None:
             datasource_name = ds_deps.get("datasource")
         
         # Parse visual configuration
-        visual = self._parse_visual(ws_elem, name)
+        visual = self._parse_visual(index, name)
         
         # Parse filters with full detail
-        filters = self._parse_worksheet_filters(ws_elem)
+        filters = self._parse_worksheet_filters(index)
+        
+        # Record dependency columns for resolution against the top-level datasources
+        self._sheet_dependencies[name] = self._parse_datasource_dependencies(index)
         
         # Collect all fields used
         all_fields = set()
@@ -719,18 +1379,11 @@ class XMLMetadataExtractor:
             for detail in visual.detail:
                 all_fields.add(detail.get("field", ""))
         
-        # Track field usage
-        for field in all_fields:
-            if field:
-                if field not in self._field_to_sheets:
-                    self._field_to_sheets[field] = []
-                self._field_to_sheets[field].append(name)
-        
         # Parse quick filters (exposed filters)
-        quick_filters = self._parse_quick_filters(ws_elem)
+        quick_filters = self._parse_quick_filters(index)
         
         # Parse sort
-        sort_fields = self._parse_sort(ws_elem)
+        sort_fields = self._parse_sort(index)
         
         return SheetMetadata(
             name=name,
@@ -746,9 +1399,22 @@ class XMLMetadataExtractor:
             sort_fields=sort_fields,
         )
     
-    def _parse_visual(self, ws_elem: etree._Element, sheet_name: str) -> Optional[VisualMetadata]:
+    def _parse_datasource_dependencies(self, index: _ElementIndex) -> Dict[str, List[str]]:
+        """Collect the columns each datasource-dependencies block references, by datasource name."""
+        dependencies: Dict[str, List[str]] = {}
+        
+        for deps_elem in index.findall("datasource-dependencies"):
+            columns = dependencies.setdefault(deps_elem.get("datasource", ""), [])
+            for col_elem in deps_elem.iterchildren("column"):
+                name = self._clean_field_name(col_elem.get("name", ""))
+                if name and name not in columns:
+                    columns.append(name)
+        
+        return dependencies
+    
+    def _parse_visual(self, index: _ElementIndex, sheet_name: str) -> Optional[VisualMetadata]:
         """Parse visual/chart configuration from worksheet."""
-        table_elem = ws_elem.find(".//table")
+        table_elem = index.find("table")
         if table_elem is None:
             return None
         
@@ -756,49 +1422,50 @@ class XMLMetadataExtractor:
         chart_type = MarkType.AUTOMATIC
         chart_type_inferred = None
         
-        panes = table_elem.find(".//panes")
+        panes = index.find("panes")
         if panes is not None:
-            mark_elem = panes.find(".//mark")
+            mark_elem = index.find("mark", in_panes=True)
             if mark_elem is not None:
                 mark_class = mark_elem.get("class", "Automatic").lower()
                 chart_type = self.MARK_TYPE_MAP.get(mark_class, MarkType.AUTOMATIC)
         
         # Parse rows and columns shelves
-        rows = self._parse_shelf(ws_elem, "rows")
-        columns = self._parse_shelf(ws_elem, "cols")
+        rows = self._parse_shelf(index, "rows")
+        columns = self._parse_shelf(index, "cols")
         
         # Infer more specific chart type
         chart_type_inferred = self._infer_chart_type(chart_type, rows, columns)
         
         # Parse encoding shelves
-        color = self._parse_encoding(ws_elem, "color")
-        size = self._parse_encoding(ws_elem, "size")
-        shape = self._parse_encoding(ws_elem, "shape")
-        label = self._parse_encoding_list(ws_elem, "text")
-        detail = self._parse_encoding_list(ws_elem, "lod")
-        tooltip = self._parse_encoding_list(ws_elem, "tooltip")
-        path = self._parse_encoding(ws_elem, "path")
+        color = self._parse_encoding(index, "color")
+        size = self._parse_encoding(index, "size")
+        shape = self._parse_encoding(index, "shape")
+        label = self._parse_encoding_list(index, "text")
+        detail = self._parse_encoding_list(index, "lod")
+        tooltip = self._parse_encoding_list(index, "tooltip")
+        path = self._parse_encoding(index, "path")
         
         # Parse axes
-        x_axis = self._parse_axis(ws_elem, "x")
-        y_axis = self._parse_axis(ws_elem, "y")
+        x_axis = self._parse_axis(index, "x")
+        y_axis = self._parse_axis(index, "y")
         
         # Get size from layout if available
         width = None
         height = None
-        layout = ws_elem.find(".//layout")
+        layout = index.find("layout")
         if layout is not None:
             width = int(layout.get("maxwidth", 0)) or None
             height = int(layout.get("maxheight", 0)) or None
         
         # Check for dual axis
-        is_dual_axis = len(ws_elem.findall(".//panes/pane")) > 1
+        pane_count = sum(1 for pane in index.findall("pane", in_panes=True) if pane.getparent().tag == "panes")
+        is_dual_axis = pane_count > 1
         
         # Parse reference lines
-        reference_lines = self._parse_reference_lines(ws_elem)
+        reference_lines = self._parse_reference_lines(index)
         
         # Parse trend lines
-        trend_lines = self._parse_trend_lines(ws_elem)
+        trend_lines = self._parse_trend_lines(index)
         
         return VisualMetadata(
             sheet_name=sheet_name,
@@ -845,37 +1512,36 @@ class XMLMetadataExtractor:
         
         return str(mark_type.value)
     
-    def _parse_shelf(self, ws_elem: etree._Element, shelf_name: str) -> List[Dict[str, Any]]:
+    def _parse_shelf(self, index: _ElementIndex, shelf_name: str) -> List[Dict[str, Any]]:
         """Parse a shelf (rows/columns) with aggregation info."""
         mappings = []
         
-        shelf_elem = ws_elem.find(f".//{shelf_name}")
+        shelf_elem = index.find(shelf_name)
         if shelf_elem is not None:
             shelf_text = shelf_elem.text or ""
             
             # Parse field references with aggregations
-            fields = re.findall(r'\[([^\]]+)\]', shelf_text)
+            fields = _BRACKETED_PATTERN.findall(shelf_text)
             
             for field in fields:
                 aggregation = "none"
-                field_name = field
+                inner_name = field
                 
                 # Check for explicit aggregation like SUM([Sales])
-                for agg_name in ["SUM", "AVG", "COUNT", "COUNTD", "MIN", "MAX", "MEDIAN", "ATTR"]:
-                    if field.upper().startswith(f"{agg_name}("):
-                        aggregation = agg_name.lower()
-                        inner_match = re.search(r'\(([^)]+)\)', field)
-                        if inner_match:
-                            field_name = inner_match.group(1)
-                        break
+                agg_match = _SHELF_AGGREGATION_PATTERN.match(field)
+                if agg_match:
+                    aggregation = agg_match.group(1).lower()
+                    inner_match = _PARENTHESIZED_PATTERN.search(field)
+                    if inner_match:
+                        inner_name = inner_match.group(1)
                 
                 # Check for prefix style aggregation (sum:Sales:qk)
-                if ":" in field_name:
-                    parts = field_name.split(":")
-                    if parts[0].lower() in self.AGGREGATION_MAP:
-                        aggregation = parts[0].lower()
+                if ":" in inner_name:
+                    prefix = inner_name.partition(":")[0].lower()
+                    if prefix in self.AGGREGATION_MAP:
+                        aggregation = prefix
                 
-                clean_field = self._clean_field_name(field_name)
+                clean_field = self._clean_field_name(inner_name)
                 
                 mappings.append({
                     "field": clean_field,
@@ -886,10 +1552,11 @@ class XMLMetadataExtractor:
         
         return mappings
     
-    def _parse_encoding(self, ws_elem: etree._Element, encoding_type: str) -> Optional[Dict[str, Any]]:
+    def _parse_encoding(self, index: _ElementIndex, encoding_type: str) -> Optional[Dict[str, Any]]:
         """Parse a single encoding (color, size, etc.)."""
-        encoding_elem = ws_elem.find(f".//panes//encoding[@attr='{encoding_type}']")
-        if encoding_elem is not None:
+        encodings = index.findall_by("encoding", "attr", encoding_type, in_panes=True)
+        if encodings:
+            encoding_elem = encodings[0]
             field = encoding_elem.get("column", "")
             if field:
                 return {
@@ -899,11 +1566,11 @@ class XMLMetadataExtractor:
                 }
         return None
     
-    def _parse_encoding_list(self, ws_elem: etree._Element, encoding_type: str) -> List[Dict[str, Any]]:
+    def _parse_encoding_list(self, index: _ElementIndex, encoding_type: str) -> List[Dict[str, Any]]:
         """Parse encoding shelves that can have multiple fields."""
         mappings = []
         
-        for encoding_elem in ws_elem.findall(f".//panes//encoding[@attr='{encoding_type}']"):
+        for encoding_elem in index.findall_by("encoding", "attr", encoding_type, in_panes=True):
             field = encoding_elem.get("column", "")
             if field:
                 mappings.append({
@@ -914,13 +1581,10 @@ class XMLMetadataExtractor:
         
         return mappings
     
-    def _parse_axis(self, ws_elem: etree._Element, axis_type: str) -> Optional[AxisMetadata]:
+    def _parse_axis(self, index: _ElementIndex, axis_type: str) -> Optional[AxisMetadata]:
         """Parse axis configuration."""
-        # Axis info is typically in the style section
-        axis_elem = ws_elem.find(f".//style-rule[@element='axis']/format[@attr='{axis_type}']")
-        
         # Basic axis metadata from table settings
-        table_elem = ws_elem.find(".//table")
+        table_elem = index.find("table")
         if table_elem is None:
             return None
         
@@ -929,7 +1593,7 @@ class XMLMetadataExtractor:
         range_max = None
         include_zero = True
         
-        for ruler in ws_elem.findall(".//panes//ruler"):
+        for ruler in index.findall("ruler", in_panes=True):
             if ruler.get("scope") in [axis_type, f"{axis_type}-axis"]:
                 range_min = float(ruler.get("min")) if ruler.get("min") else None
                 range_max = float(ruler.get("max")) if ruler.get("max") else None
@@ -943,11 +1607,11 @@ class XMLMetadataExtractor:
             include_zero=include_zero,
         )
     
-    def _parse_reference_lines(self, ws_elem: etree._Element) -> List[Dict[str, Any]]:
+    def _parse_reference_lines(self, index: _ElementIndex) -> List[Dict[str, Any]]:
         """Parse reference lines from worksheet."""
         ref_lines = []
         
-        for ref_elem in ws_elem.findall(".//reference-line"):
+        for ref_elem in index.findall("reference-line"):
             ref_lines.append({
                 "value": ref_elem.get("value"),
                 "scope": ref_elem.get("scope"),
@@ -957,11 +1621,11 @@ class XMLMetadataExtractor:
         
         return ref_lines
     
-    def _parse_trend_lines(self, ws_elem: etree._Element) -> List[Dict[str, Any]]:
+    def _parse_trend_lines(self, index: _ElementIndex) -> List[Dict[str, Any]]:
         """Parse trend lines from worksheet."""
         trend_lines = []
         
-        for trend_elem in ws_elem.findall(".//trend-line"):
+        for trend_elem in index.findall("trend-line"):
             trend_lines.append({
                 "type": trend_elem.get("type"),  # linear, polynomial, exponential, etc.
                 "degree": int(trend_elem.get("degree", 1)),
@@ -971,11 +1635,11 @@ class XMLMetadataExtractor:
         
         return trend_lines
     
-    def _parse_worksheet_filters(self, ws_elem: etree._Element) -> List[FilterMetadata]:
+    def _parse_worksheet_filters(self, index: _ElementIndex) -> List[FilterMetadata]:
         """Parse all filters with complete calculation logic."""
         filters = []
         
-        for filter_elem in ws_elem.findall(".//filter"):
+        for filter_elem in index.findall("filter"):
             field_raw = filter_elem.get("column", "")
             if not field_raw:
                 continue
@@ -1214,23 +1878,23 @@ class XMLMetadataExtractor:
         else:
             return f"Filter on [{field}]"
     
-    def _parse_quick_filters(self, ws_elem: etree._Element) -> List[str]:
+    def _parse_quick_filters(self, index: _ElementIndex) -> List[str]:
         """Parse quick filters (filters exposed in UI)."""
         quick_filters = []
         
         # Quick filters are typically referenced in the view section
-        for qf_elem in ws_elem.findall(".//filter[@quick-filter='true']"):
+        for qf_elem in index.findall_by("filter", "quick-filter", "true"):
             field = qf_elem.get("column", "")
             if field:
                 quick_filters.append(self._clean_field_name(field))
         
         return quick_filters
     
-    def _parse_sort(self, ws_elem: etree._Element) -> List[Dict[str, Any]]:
+    def _parse_sort(self, index: _ElementIndex) -> List[Dict[str, Any]]:
         """Parse sort configuration."""
         sort_fields = []
         
-        for sort_elem in ws_elem.findall(".//sort"):
+        for sort_elem in index.findall("sort"):
             sort_fields.append({
                 "field": self._clean_field_name(sort_elem.get("column", "")),
                 "direction": sort_elem.get("direction", "ascending"),
@@ -1243,26 +1907,35 @@ class XMLMetadataExtractor:
         """Parse all dashboards from the workbook."""
         dashboards = []
         
-        for dash_elem in self.root.findall(".//dashboard"):
-            dashboard = self._parse_single_dashboard(dash_elem)
+        for dash_index in self._subtrees.get("dashboard", []):
+            dashboard = self._parse_subtree("dashboard", dash_index.element, dash_index)
             if dashboard:
                 dashboards.append(dashboard)
-                
-                # Track sheet to dashboard mapping
-                for ws in dashboard.worksheets:
-                    if ws not in self._sheet_to_dashboards:
-                        self._sheet_to_dashboards[ws] = []
-                    self._sheet_to_dashboards[ws].append(dashboard.name)
+                self._track_dashboard(dashboard)
         
         return dashboards
     
-    def _parse_single_dashboard(self, dash_elem: etree._Element) -> Optional[DashboardMetadata]:
+    def _track_dashboard(self, dashboard: DashboardMetadata) -> None:
+        """Record the sheet to dashboard mapping for a parsed dashboard."""
+        for ws in dashboard.worksheets:
+            if ws not in self._sheet_to_dashboards:
+                self._sheet_to_dashboards[ws] = []
+            self._sheet_to_dashboards[ws].append(dashboard.name)
+    
+    def _parse_single_dashboard(
+        self,
+        dash_elem: etree._Element,
+        index: Optional[_ElementIndex] = None
+    ) -> Optional[DashboardMetadata]:
         """Parse a single dashboard with zones and actions."""
+        if index is None:
+            index = _ElementIndex.build(dash_elem)
+        
         name = dash_elem.get("name", "Unnamed")
         title = dash_elem.get("title")
         
         # Parse size
-        size_elem = dash_elem.find(".//size")
+        size_elem = index.find("size")
         width = 1000
         height = 800
         if size_elem is not None:
@@ -1275,7 +1948,7 @@ class XMLMetadataExtractor:
         exposed_filters = []
         exposed_parameters = []
         
-        for zone_elem in dash_elem.findall(".//zone"):
+        for zone_elem in index.findall("zone"):
             zone = self._parse_dashboard_zone(zone_elem)
             if zone:
                 zones.append(zone)
@@ -1290,7 +1963,7 @@ class XMLMetadataExtractor:
                         exposed_parameters.append(zone.name)
         
         # Parse actions
-        actions = self._parse_dashboard_actions(dash_elem)
+        actions = self._parse_dashboard_actions(index)
         
         # Determine layout type
         layout_type = "tiled"
@@ -1360,11 +2033,11 @@ class XMLMetadataExtractor:
             layout_direction=zone_type_raw if zone_type_raw in ["horizontal", "vertical"] else None,
         )
     
-    def _parse_dashboard_actions(self, dash_elem: etree._Element) -> List[DashboardActionMetadata]:
+    def _parse_dashboard_actions(self, index: _ElementIndex) -> List[DashboardActionMetadata]:
         """Parse dashboard actions (filter, highlight, URL, etc.)."""
         actions = []
         
-        for action_elem in dash_elem.findall(".//action"):
+        for action_elem in index.findall("action"):
             action_name = action_elem.get("name", "")
             action_type_raw = action_elem.get("type", "filter")
             
@@ -1424,6 +2097,48 @@ class XMLMetadataExtractor:
         
         return actions
     
+    def _resolve_dependencies(
+        self,
+        datasources: List[DataSourceMetadata],
+        parameters: List[ParameterMetadata],
+        sheets: List[SheetMetadata]
+    ) -> None:
+        """
+        Merge worksheet datasource-dependencies into the top-level definitions.
+        
+        Dependency columns are matched by datasource and column name to the
+        fields, calculated fields and parameters already parsed, which record
+        the sheets using them; nothing in the worksheet copy is reparsed.
+        """
+        datasource_lookup = {ds.name: ds for ds in datasources}
+        parameter_lookup = {param.name: param for param in parameters}
+        column_lookup: Dict[str, Dict[str, Union[FieldMetadata, CalculatedFieldMetadata]]] = {}
+        for ds in datasources:
+            columns = column_lookup.setdefault(ds.name, {})
+            for field in ds.fields:
+                columns.setdefault(field.name, field)
+            for calc in ds.calculated_fields:
+                columns.setdefault(calc.name, calc)
+        
+        for sheet in sheets:
+            ds = datasource_lookup.get(sheet.datasource_name)
+            if ds is not None:
+                sheet.datasource_caption = ds.caption
+            
+            for ds_name, column_names in self._sheet_dependencies.get(sheet.name, {}).items():
+                for column_name in column_names:
+                    if ds_name == "Parameters":
+                        target = parameter_lookup.get(column_name)
+                        if target is not None and target.name not in sheet.parameters_used:
+                            sheet.parameters_used.append(target.name)
+                    else:
+                        target = column_lookup.get(ds_name, {}).get(column_name)
+                        if isinstance(target, CalculatedFieldMetadata) and target.name not in sheet.calculated_fields_used:
+                            sheet.calculated_fields_used.append(target.name)
+                    
+                    if target is not None and sheet.name not in target.used_in_sheets:
+                        target.used_in_sheets.append(sheet.name)
+    
     def _build_relationships(
         self,
         datasources: List[DataSourceMetadata],
@@ -1431,10 +2146,38 @@ class XMLMetadataExtractor:
         dashboards: List[DashboardMetadata],
         parameters: List[ParameterMetadata]
     ) -> List[RelationshipMetadata]:
-        """Build comprehensive relationship mapping between all elements."""
+        """
+        Build comprehensive relationship mapping between all elements.
+        
+        When extracting incrementally, relationship types whose inputs
+        (RELATIONSHIP_INPUTS) are unchanged are taken from the previous run.
+        """
+        builders = {
+            "field_to_sheet": lambda: self._build_field_relationships(datasources),
+            "calc_to_field": lambda: self._build_calc_relationships(datasources),
+            "sheet_to_dashboard": lambda: self._build_dashboard_relationships(sheets),
+            "action": lambda: self._build_action_relationships(dashboards),
+            "parameter": lambda: self._build_parameter_relationships(parameters, datasources),
+        }
+        
+        previous: Dict[str, List[RelationshipMetadata]] = {}
+        if self._previous is not None:
+            for rel in self._previous.metadata.relationships:
+                previous.setdefault(rel.relationship_type, []).append(rel)
+        
+        relationships = []
+        for relationship_type, build in builders.items():
+            if self._unchanged(*self.RELATIONSHIP_INPUTS[relationship_type]):
+                relationships.extend(previous.get(relationship_type, []))
+            else:
+                relationships.extend(build())
+        
+        return relationships
+    
+    def _build_field_relationships(self, datasources: List[DataSourceMetadata]) -> List[RelationshipMetadata]:
+        """Field to sheet relationships."""
         relationships = []
         
-        # Field to sheet relationships
         for ds in datasources:
             for field in ds.fields:
                 if field.name in self._field_to_sheets:
@@ -1448,7 +2191,12 @@ class XMLMetadataExtractor:
                             description=f"Field '{field.display_name}' is used in sheet '{sheet_name}'",
                         ))
         
-        # Calculated field dependencies
+        return relationships
+    
+    def _build_calc_relationships(self, datasources: List[DataSourceMetadata]) -> List[RelationshipMetadata]:
+        """Calculated field dependencies."""
+        relationships = []
+        
         for ds in datasources:
             for calc in ds.calculated_fields:
                 for ref_field in calc.referenced_fields:
@@ -1461,7 +2209,12 @@ class XMLMetadataExtractor:
                         description=f"Calculated field '{calc.display_name}' references '{ref_field}'",
                     ))
         
-        # Sheet to dashboard relationships
+        return relationships
+    
+    def _build_dashboard_relationships(self, sheets: List[SheetMetadata]) -> List[RelationshipMetadata]:
+        """Sheet to dashboard relationships."""
+        relationships = []
+        
         for sheet in sheets:
             if sheet.name in self._sheet_to_dashboards:
                 for dash_name in self._sheet_to_dashboards[sheet.name]:
@@ -1474,7 +2227,12 @@ class XMLMetadataExtractor:
                         description=f"Sheet '{sheet.name}' is embedded in dashboard '{dash_name}'",
                     ))
         
-        # Dashboard action relationships
+        return relationships
+    
+    def _build_action_relationships(self, dashboards: List[DashboardMetadata]) -> List[RelationshipMetadata]:
+        """Dashboard action relationships."""
+        relationships = []
+        
         for dashboard in dashboards:
             for action in dashboard.actions:
                 for source_ws in action.source_worksheets:
@@ -1493,7 +2251,16 @@ class XMLMetadataExtractor:
                             description=f"{action.action_type.title()} action '{action.name}' links '{source_ws}' to '{target_ws}'",
                         ))
         
-        # Parameter usage
+        return relationships
+    
+    def _build_parameter_relationships(
+        self,
+        parameters: List[ParameterMetadata],
+        datasources: List[DataSourceMetadata]
+    ) -> List[RelationshipMetadata]:
+        """Parameter usage in calculated fields."""
+        relationships = []
+        
         for param in parameters:
             # Check calculated fields for parameter references
             for ds in datasources:
@@ -1510,19 +2277,25 @@ class XMLMetadataExtractor:
         
         return relationships
     
-    def _build_metric_rows(
+    def _build_metrics(
         self,
         datasources: List[DataSourceMetadata],
         sheets: List[SheetMetadata],
         dashboards: List[DashboardMetadata]
-    ) -> List[MetricDetailRow]:
+    ) -> Tuple[Dict[str, MetricDefinition], Dict[str, MetricSheetContext], List[MetricUsage]]:
         """
-        Build flattened metric rows - one row per metric usage in each worksheet.
-        
-        This creates a denormalized view where each calculated field, measure, or dimension
-        that is used in a worksheet gets its own row with full context.
+        Build normalized metric usage - one usage per metric in each worksheet.
+        
+        Each calculated field, measure, or dimension used in a worksheet gets a
+        MetricUsage referencing a MetricDefinition (stored once per metric) and
+        the worksheet's MetricSheetContext (filters, chart type, dashboards,
+        stored once per worksheet). When extracting incrementally, the usages of
+        a reused worksheet are carried over if the datasources and the
+        dashboards containing it are unchanged.
         """
-        metric_rows = []
+        definitions: Dict[str, MetricDefinition] = {}
+        contexts: Dict[str, MetricSheetContext] = {}
+        usages: List[MetricUsage] = []
         
         # Build lookup for calculated fields by name
         calc_field_lookup: Dict[str, Tuple[CalculatedFieldMetadata, DataSourceMetadata]] = {}
@@ -1547,301 +2320,201 @@ class XMLMetadataExtractor:
                     sheet_to_dashboards[ws_name] = []
                 sheet_to_dashboards[ws_name].append(dashboard.name)
         
+        # Previous usages per worksheet, for worksheets reused from the last run
+        previous_usages: Dict[str, List[MetricUsage]] = {}
+        if self._unchanged("datasource"):
+            for usage in self._previous.metadata.metric_usages:
+                previous_usages.setdefault(usage.worksheet_name, []).append(usage)
+        
         # Process each worksheet
         for sheet in sheets:
-            # Get filter details for this worksheet
-            filter_names = [f.field for f in sheet.filters]
-            filter_details = [
-                {
-                    "field": f.field,
-                    "type": f.filter_type.value,
-                    "explanation": f.calculation_explanation or "",
-                    "include_values": f.include_values[:5] if f.include_values else [],
-                    "exclude_values": f.exclude_values[:5] if f.exclude_values else [],
-                    "range_min": f.range_min,
-                    "range_max": f.range_max,
-                    "condition": f.condition_formula or f.formula or "",
-                }
-                for f in sheet.filters
-            ]
-            
-            # Get chart type
-            chart_type = sheet.visual.chart_type.value if sheet.visual else None
-            
             # Get dashboards containing this sheet
             dashboards_containing = sheet_to_dashboards.get(sheet.name, [])
             
-            # Track which metrics we've already added for this sheet (to avoid duplicates)
-            added_metrics: Set[str] = set()
+            previous_context = None
+            if sheet.name in self._reused_sheets and sheet.name in previous_usages:
+                previous_context = self._previous.metadata.metric_sheets.get(sheet.name)
             
-            # Process visual encodings to find all metrics with their shelf positions
-            if sheet.visual:
-                # Process rows
-                for row in sheet.visual.rows:
-                    field_name = row.get("field", "")
-                    if field_name and field_name not in added_metrics:
-                        metric_row = self._create_metric_row(
-                            field_name=field_name,
-                            shelf_position="rows",
-                            aggregation=row.get("aggregation"),
-                            sheet=sheet,
-                            chart_type=chart_type,
-                            filter_names=filter_names,
-                            filter_details=filter_details,
-                            dashboards_containing=dashboards_containing,
-                            calc_field_lookup=calc_field_lookup,
-                            field_lookup=field_lookup
-                        )
-                        if metric_row:
-                            metric_rows.append(metric_row)
-                            added_metrics.add(field_name)
-                
-                # Process columns
-                for col in sheet.visual.columns:
-                    field_name = col.get("field", "")
-                    if field_name and field_name not in added_metrics:
-                        metric_row = self._create_metric_row(
-                            field_name=field_name,
-                            shelf_position="columns",
-                            aggregation=col.get("aggregation"),
-                            sheet=sheet,
-                            chart_type=chart_type,
-                            filter_names=filter_names,
-                            filter_details=filter_details,
-                            dashboards_containing=dashboards_containing,
-                            calc_field_lookup=calc_field_lookup,
-                            field_lookup=field_lookup
-                        )
-                        if metric_row:
-                            metric_rows.append(metric_row)
-                            added_metrics.add(field_name)
-                
-                # Process color encoding
-                if sheet.visual.color:
-                    field_name = sheet.visual.color.get("field", "")
-                    if field_name and field_name not in added_metrics:
-                        metric_row = self._create_metric_row(
-                            field_name=field_name,
-                            shelf_position="color",
-                            aggregation=None,
-                            sheet=sheet,
-                            chart_type=chart_type,
-                            filter_names=filter_names,
-                            filter_details=filter_details,
-                            dashboards_containing=dashboards_containing,
-                            calc_field_lookup=calc_field_lookup,
-                            field_lookup=field_lookup
-                        )
-                        if metric_row:
-                            metric_rows.append(metric_row)
-                            added_metrics.add(field_name)
-                
-                # Process size encoding
-                if sheet.visual.size:
-                    field_name = sheet.visual.size.get("field", "")
-                    if field_name and field_name not in added_metrics:
-                        metric_row = self._create_metric_row(
-                            field_name=field_name,
-                            shelf_position="size",
-                            aggregation=None,
-                            sheet=sheet,
-                            chart_type=chart_type,
-                            filter_names=filter_names,
-                            filter_details=filter_details,
-                            dashboards_containing=dashboards_containing,
-                            calc_field_lookup=calc_field_lookup,
-                            field_lookup=field_lookup
-                        )
-                        if metric_row:
-                            metric_rows.append(metric_row)
-                            added_metrics.add(field_name)
-                
-                # Process labels
-                for label in sheet.visual.label:
-                    field_name = label.get("field", "")
-                    if field_name and field_name not in added_metrics:
-                        metric_row = self._create_metric_row(
-                            field_name=field_name,
-                            shelf_position="label",
-                            aggregation=None,
-                            sheet=sheet,
-                            chart_type=chart_type,
-                            filter_names=filter_names,
-                            filter_details=filter_details,
-                            dashboards_containing=dashboards_containing,
-                            calc_field_lookup=calc_field_lookup,
-                            field_lookup=field_lookup
-                        )
-                        if metric_row:
-                            metric_rows.append(metric_row)
-                            added_metrics.add(field_name)
-                
-                # Process details
-                for detail in sheet.visual.detail:
-                    field_name = detail.get("field", "")
-                    if field_name and field_name not in added_metrics:
-                        metric_row = self._create_metric_row(
-                            field_name=field_name,
-                            shelf_position="detail",
-                            aggregation=None,
-                            sheet=sheet,
-                            chart_type=chart_type,
-                            filter_names=filter_names,
-                            filter_details=filter_details,
-                            dashboards_containing=dashboards_containing,
-                            calc_field_lookup=calc_field_lookup,
-                            field_lookup=field_lookup
-                        )
-                        if metric_row:
-                            metric_rows.append(metric_row)
-                            added_metrics.add(field_name)
-                
-                # Process tooltip
-                for tooltip in sheet.visual.tooltip:
-                    field_name = tooltip.get("field", "")
-                    if field_name and field_name not in added_metrics:
-                        metric_row = self._create_metric_row(
-                            field_name=field_name,
-                            shelf_position="tooltip",
-                            aggregation=None,
-                            sheet=sheet,
-                            chart_type=chart_type,
-                            filter_names=filter_names,
-                            filter_details=filter_details,
-                            dashboards_containing=dashboards_containing,
-                            calc_field_lookup=calc_field_lookup,
-                            field_lookup=field_lookup
-                        )
-                        if metric_row:
-                            metric_rows.append(metric_row)
-                            added_metrics.add(field_name)
-            
-            # Also add any fields from all_fields_used that weren't in visual encodings
-            for field_name in sheet.all_fields_used:
-                if field_name and field_name not in added_metrics:
-                    metric_row = self._create_metric_row(
-                        field_name=field_name,
-                        shelf_position="unknown",
-                        aggregation=None,
-                        sheet=sheet,
-                        chart_type=chart_type,
-                        filter_names=filter_names,
-                        filter_details=filter_details,
-                        dashboards_containing=dashboards_containing,
-                        calc_field_lookup=calc_field_lookup,
-                        field_lookup=field_lookup
-                    )
-                    if metric_row:
-                        metric_rows.append(metric_row)
-                        added_metrics.add(field_name)
-        
-        return metric_rows
-    
-    def _create_metric_row(
+            if previous_context is not None and previous_context.dashboards_containing_worksheet == dashboards_containing:
+                contexts[sheet.name] = previous_context
+                for usage in previous_usages.pop(sheet.name):
+                    if usage.metric_id not in definitions:
+                        definitions[usage.metric_id] = self._previous.metadata.metric_definitions[usage.metric_id]
+                    usages.append(usage)
+            else:
+                contexts[sheet.name] = self._create_sheet_context(sheet, dashboards_containing)
+                usages.extend(self._build_sheet_metric_usages(
+                    sheet, definitions, calc_field_lookup, field_lookup
+                ))
+        
+        return definitions, contexts, usages
+    
+    def _create_sheet_context(self, sheet: SheetMetadata, dashboards_containing: List[str]) -> MetricSheetContext:
+        """Filters, chart type and dashboards of a worksheet, shared by its metric usages."""
+        filter_details = [
+            {
+                "field": f.field,
+                "type": f.filter_type.value,
+                "explanation": f.calculation_explanation or "",
+                "include_values": f.include_values[:5] if f.include_values else [],
+                "exclude_values": f.exclude_values[:5] if f.exclude_values else [],
+                "range_min": f.range_min,
+                "range_max": f.range_max,
+                "condition": f.condition_formula or f.formula or "",
+            }
+            for f in sheet.filters
+        ]
+        
+        return MetricSheetContext(
+            worksheet_name=sheet.name,
+            worksheet_title=sheet.title,
+            chart_type=sheet.visual.chart_type.value if sheet.visual else None,
+            filters_applied=[f.field for f in sheet.filters],
+            filter_details=filter_details,
+            dashboards_containing_worksheet=dashboards_containing,
+        )
+    
+    def _build_sheet_metric_usages(
+        self,
+        sheet: SheetMetadata,
+        definitions: Dict[str, MetricDefinition],
+        calc_field_lookup: Dict[str, Tuple[CalculatedFieldMetadata, DataSourceMetadata]],
+        field_lookup: Dict[str, Tuple[FieldMetadata, DataSourceMetadata]]
+    ) -> List[MetricUsage]:
+        """Build the metric usages of one worksheet, adding missing definitions."""
+        # Fields with their shelf positions: visual encodings first, then any
+        # fields from all_fields_used that weren't in visual encodings
+        placements: List[Tuple[str, str, Optional[str]]] = []
+        visual = sheet.visual
+        if visual:
+            placements.extend(("rows", row.get("field", ""), row.get("aggregation")) for row in visual.rows)
+            placements.extend(("columns", col.get("field", ""), col.get("aggregation")) for col in visual.columns)
+            if visual.color:
+                placements.append(("color", visual.color.get("field", ""), None))
+            if visual.size:
+                placements.append(("size", visual.size.get("field", ""), None))
+            placements.extend(("label", label.get("field", ""), None) for label in visual.label)
+            placements.extend(("detail", detail.get("field", ""), None) for detail in visual.detail)
+            placements.extend(("tooltip", tooltip.get("field", ""), None) for tooltip in visual.tooltip)
+        placements.extend(("unknown", field_name, None) for field_name in sheet.all_fields_used)
+        
+        # Track which metrics we've already added for this sheet (to avoid duplicates)
+        added_metrics: Set[str] = set()
+        usages = []
+        
+        for shelf_position, field_name, aggregation in placements:
+            if field_name and field_name not in added_metrics:
+                usages.append(self._create_metric_usage(
+                    field_name=field_name,
+                    shelf_position=shelf_position,
+                    aggregation=aggregation,
+                    sheet=sheet,
+                    definitions=definitions,
+                    calc_field_lookup=calc_field_lookup,
+                    field_lookup=field_lookup
+                ))
+                added_metrics.add(field_name)
+        
+        return usages
+    
+    def _create_metric_usage(
         self,
         field_name: str,
         shelf_position: str,
         aggregation: Optional[str],
         sheet: SheetMetadata,
-        chart_type: Optional[str],
-        filter_names: List[str],
-        filter_details: List[Dict[str, Any]],
-        dashboards_containing: List[str],
+        definitions: Dict[str, MetricDefinition],
         calc_field_lookup: Dict[str, Tuple[CalculatedFieldMetadata, DataSourceMetadata]],
         field_lookup: Dict[str, Tuple[FieldMetadata, DataSourceMetadata]]
-    ) -> Optional[MetricDetailRow]:
-        """Create a single metric row for a field in a worksheet."""
+    ) -> MetricUsage:
+        """
+        Create the usage of a field in a worksheet, defining the metric on first use.
+        
+        Metric IDs are the qualified column reference "[datasource].[name]".
+        """
         
         # Check if it's a calculated field
         if field_name in calc_field_lookup:
             calc, ds = calc_field_lookup[field_name]
-            return MetricDetailRow(
-                metric_name=calc.name,
-                metric_caption=calc.caption,
-                metric_type="calculated_field",
-                datasource_name=ds.name,
-                datasource_caption=ds.caption,
-                formula=calc.formula,
-                formula_readable=calc.formula_readable,
-                calculation_type=calc.calculation_type.value if calc.calculation_type else None,
-                data_type=calc.data_type.value if calc.data_type else None,
-                aggregation_used=aggregation,
-                aggregations_in_formula=calc.aggregations_used,
-                functions_used=calc.functions_used,
-                referenced_fields=calc.referenced_fields,
-                referenced_parameters=calc.referenced_parameters,
-                lod_type=calc.lod_type,
-                lod_dimensions=calc.lod_dimensions,
-                lod_expression=calc.lod_expression,
-                worksheet_name=sheet.name,
-                worksheet_title=sheet.title,
-                chart_type=chart_type,
-                shelf_position=shelf_position,
-                filters_applied=filter_names,
-                filter_details=filter_details,
-                dashboards_containing_worksheet=dashboards_containing,
-                complexity_score=calc.complexity_score,
-            )
+            metric_id = f"[{ds.name}].[{calc.name}]"
+            if metric_id not in definitions:
+                definitions[metric_id] = MetricDefinition(
+                    metric_name=calc.name,
+                    metric_caption=calc.caption,
+                    metric_type="calculated_field",
+                    datasource_name=ds.name,
+                    datasource_caption=ds.caption,
+                    formula=calc.formula,
+                    formula_readable=calc.formula_readable,
+                    calculation_type=calc.calculation_type.value if calc.calculation_type else None,
+                    data_type=calc.data_type.value if calc.data_type else None,
+                    aggregations_in_formula=calc.aggregations_used,
+                    functions_used=calc.functions_used,
+                    referenced_fields=calc.referenced_fields,
+                    referenced_parameters=calc.referenced_parameters,
+                    lod_type=calc.lod_type,
+                    lod_dimensions=calc.lod_dimensions,
+                    lod_expression=calc.lod_expression,
+                    complexity_score=calc.complexity_score,
+                )
         
         # Check if it's a regular field
         elif field_name in field_lookup:
             field, ds = field_lookup[field_name]
-            metric_type = "measure" if field.role == FieldRole.MEASURE else "dimension"
-            
-            return MetricDetailRow(
-                metric_name=field.name,
-                metric_caption=field.caption,
-                metric_type=metric_type,
-                datasource_name=ds.name,
-                datasource_caption=ds.caption,
-                formula=None,
-                formula_readable=None,
-                calculation_type=None,
-                data_type=field.data_type.value if field.data_type else None,
-                aggregation_used=aggregation or (field.default_aggregation.value if field.default_aggregation else None),
-                aggregations_in_formula=[],
-                functions_used=[],
-                referenced_fields=[],
-                referenced_parameters=[],
-                lod_type=None,
-                lod_dimensions=[],
-                lod_expression=None,
-                worksheet_name=sheet.name,
-                worksheet_title=sheet.title,
-                chart_type=chart_type,
-                shelf_position=shelf_position,
-                filters_applied=filter_names,
-                filter_details=filter_details,
-                dashboards_containing_worksheet=dashboards_containing,
-                complexity_score=0,
-            )
-        
-        # Unknown field - still create a row with basic info
+            metric_id = f"[{ds.name}].[{field.name}]"
+            if metric_id not in definitions:
+                definitions[metric_id] = MetricDefinition(
+                    metric_name=field.name,
+                    metric_caption=field.caption,
+                    metric_type="measure" if field.role == FieldRole.MEASURE else "dimension",
+                    datasource_name=ds.name,
+                    datasource_caption=ds.caption,
+                    data_type=field.data_type.value if field.data_type else None,
+                )
+            aggregation = aggregation or (field.default_aggregation.value if field.default_aggregation else None)
+        
+        # Unknown field - still define it with basic info
         else:
-            return MetricDetailRow(
-                metric_name=field_name,
-                metric_caption=None,
-                metric_type="unknown",
-                datasource_name=sheet.datasource_name,
-                datasource_caption=None,
-                formula=None,
-                formula_readable=None,
-                calculation_type=None,
-                data_type=None,
-                aggregation_used=aggregation,
-                aggregations_in_formula=[],
-                functions_used=[],
-                referenced_fields=[],
-                referenced_parameters=[],
-                lod_type=None,
-                lod_dimensions=[],
-                lod_expression=None,
-                worksheet_name=sheet.name,
-                worksheet_title=sheet.title,
-                chart_type=chart_type,
-                shelf_position=shelf_position,
-                filters_applied=filter_names,
-                filter_details=filter_details,
-                dashboards_containing_worksheet=dashboards_containing,
-                complexity_score=0,
-            )
\ No newline at end of file
+            metric_id = f"[{sheet.datasource_name or ''}].[{field_name}]"
+            if metric_id not in definitions:
+                definitions[metric_id] = MetricDefinition(
+                    metric_name=field_name,
+                    metric_type="unknown",
+                    datasource_name=sheet.datasource_name,
+                )
+        
+        return MetricUsage(
+            metric_id=metric_id,
+            worksheet_name=sheet.name,
+            shelf_position=shelf_position,
+            aggregation_used=aggregation,
+        )
+
+
+def _parse_subtree_chunk(
+    file_path: str,
+    kind: str,
+    payloads: List[bytes]
+) -> List[Tuple[Optional[Union[SheetMetadata, DashboardMetadata]], Optional[Dict[str, List[str]]]]]:
+    """
+    Parse serialized worksheet or dashboard subtrees in a worker process.
+    
+    Returns one (model, datasource dependencies) pair per payload, in input
+    order; dependencies are None for dashboards. Cross-sheet tracking is left
+    to the parent.
+    """
+    extractor = XMLMetadataExtractor(file_path)
+    results = []
+    
+    for payload in payloads:
+        elem = etree.fromstring(payload)
+        if kind == "worksheet":
+            model = extractor._parse_single_worksheet(elem)
+            dependencies = extractor._sheet_dependencies.get(elem.get("name", "Unnamed"), {})
+        else:
+            model = extractor._parse_single_dashboard(elem)
+            dependencies = None
+        
+        results.append((model, dependencies))
+    
+    return results
@@ -6,13 +6,17 @@ A comprehensive tool to extract 100% accurate metadata from Tableau workbooks.
 
 Usage:
     python main.py extract /path/to/workbook.twbx [options]
+    python main.py extract-batch /path/to/workbooks/ -o outputs/ [options]
     python main.py compare /path/to/workbook.twbx --server URL [options]
     python main.py validate /path/to/workbook.twbx [options]
+    python main.py report /path/to/metadata.json -f excel -o metadata.xlsx
     python main.py list-workbooks --server URL [options]
+    python main.py crawl --server URL -o /path/to/site_metadata/ [options]
 """
 
 import sys
 import json
+import asyncio
 from pathlib import Path
 from typing import Optional
 
@@ -28,10 +32,16 @@ except ImportError:
     sys.exit(1)
 
 from extractors.xml_extractor import XMLMetadataExtractor
-from extractors.metadata_api import TableauMetadataAPIClient
+from extractors.metadata_api import TableauMetadataAPIClient, AsyncTableauMetadataAPIClient
+from extractors.rate_limiter import RateLimiter
+from models.metadata_models import WorkbookMetadata
 from utils.comparison import MetadataComparator
 from utils.validation import MetadataValidator
 from utils.output import OutputGenerator
+from utils.batch import BatchExtractor, BatchStatus
+from utils.cache import ExtractionCache
+from utils.crawl import SiteCrawler
+from utils.snapshot import SNAPSHOT_SUFFIX, is_snapshot, read_snapshot
 
 console = Console()
 
@@ -51,11 +61,31 @@ def cli():
 @cli.command()
 @click.argument('file_path', type=click.Path(exists=True))
 @click.option('--output', '-o', type=click.Path(), help='Output file path')
-@click.option('--format', '-f', type=click.Choice(['json', 'excel', 'html', 'summary']), 
+@click.option('--format', '-f', type=click.Choice(['json', 'ndjson', 'excel', 'html', 'summary', 'csv', 'snapshot']), 
               default='json', help='Output format')
 @click.option('--validate/--no-validate', default=True, help='Run validation after extraction')
+@click.option('--streaming', is_flag=True, help='Parse one top-level element at a time (lower memory for very large workbooks)')
+@click.option('--selective', is_flag=True, help='Skip thumbnails, window layouts and style blocks while parsing')
+@click.option('--workers', '-w', type=click.IntRange(min=1), default=1,
+              help='Processes used to parse worksheets and dashboards (for workbooks with hundreds of sheets)')
+@click.option('--no-cache', is_flag=True, help='Do not read or write the extraction cache')
+@click.option('--refresh', is_flag=True, help='Re-extract and overwrite the cached result for this workbook')
+@click.option('--metric-rows', is_flag=True,
+              help='Also write the flattened metric_rows view (one full row per metric and worksheet) to JSON')
 @click.option('--verbose', '-v', is_flag=True, help='Verbose output')
-def extract(file_path: str, output: Optional[str], format: str, validate: bool, verbose: bool):
+def extract(
+    file_path: str,
+    output: Optional[str],
+    format: str,
+    validate: bool,
+    streaming: bool,
+    selective: bool,
+    workers: int,
+    no_cache: bool,
+    refresh: bool,
+    metric_rows: bool,
+    verbose: bool
+):
     """
     Extract metadata from a Tableau workbook file.
     
@@ -64,78 +94,181 @@ def extract(file_path: str, output: Optional[str], format: str, validate: bool,
         python main.py extract workbook.twbx -o metadata.json
         python main.py extract workbook.twbx -f excel -o metadata.xlsx
         python main.py extract workbook.twbx -f html -o report.html
+        python main.py extract workbook.twbx -f snapshot -o metadata.snapshot
+        python main.py extract huge_workbook.twb --streaming -o metadata.json
+        python main.py extract huge_workbook.twb --workers 4 -o metadata.json
+        python main.py extract workbook.twbx --refresh -o metadata.json
+    
+    Results are cached by the content of the workbook XML, so extracting an
+    unchanged workbook again is served from the cache without parsing.
     """
+    # Without -o, JSON/NDJSON/CSV are written to stdout. NDJSON and CSV, and
+    # JSON when stdout is not a terminal, are streamed as plain text with the
+    # progress, summary and validation messages sent to stderr, so the output
+    # can be piped (e.g. into jq) without rich formatting it
+    raw_stdout = output is None and (
+        format in ('ndjson', 'csv') or (format == 'json' and not sys.stdout.isatty())
+    )
+    info_console = Console(stderr=True) if raw_stdout else console
+    
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
-        console=console,
+        console=info_console,
     ) as progress:
         # Extract metadata
         task = progress.add_task("Extracting metadata...", total=None)
         
         try:
-            extractor = XMLMetadataExtractor(file_path)
-            metadata = extractor.extract()
-            progress.update(task, description="[green]Extraction complete!")
+            extractor = XMLMetadataExtractor(
+                file_path,
+                streaming=streaming,
+                selective=selective,
+                workers=workers,
+            )
+            if no_cache:
+                metadata = extractor.extract()
+                progress.update(task, description="[green]Extraction complete!")
+            else:
+                with ExtractionCache() as cache:
+                    metadata = cache.extract(extractor, refresh=refresh)
+                if cache.hits:
+                    progress.update(task, description="[green]Loaded from cache!")
+                else:
+                    progress.update(task, description="[green]Extraction complete!")
         except Exception as e:
-            console.print(f"[red]Error extracting metadata: {e}[/red]")
+            info_console.print(f"[red]Error extracting metadata: {e}[/red]")
             if verbose:
                 import traceback
                 traceback.print_exc()
             sys.exit(1)
     
     # Display summary
-    console.print()
-    _display_summary(metadata)
+    info_console.print()
+    _display_summary(metadata, info_console)
     
     # Validate if requested
     if validate:
-        console.print()
-        console.print("[bold]Running validation...[/bold]")
+        info_console.print()
+        info_console.print("[bold]Running validation...[/bold]")
         validator = MetadataValidator()
         validation_result = validator.validate(metadata)
         
         if validation_result.is_valid:
-            console.print(f"[green]✓ Validation passed (score: {validation_result.get_score()}/100)[/green]")
+            info_console.print(f"[green]✓ Validation passed (score: {validation_result.get_score()}/100)[/green]")
         else:
-            console.print(f"[yellow]⚠ Validation completed with issues (score: {validation_result.get_score()}/100)[/yellow]")
-            console.print(f"  Errors: {validation_result.errors_count}, Warnings: {validation_result.warnings_count}")
+            info_console.print(f"[yellow]⚠ Validation completed with issues (score: {validation_result.get_score()}/100)[/yellow]")
+            info_console.print(f"  Errors: {validation_result.errors_count}, Warnings: {validation_result.warnings_count}")
         
         if verbose and validation_result.issues:
-            console.print()
+            info_console.print()
             for issue in validation_result.issues[:10]:
                 icon = "🔴" if issue.level.value == "error" else "🟡" if issue.level.value == "warning" else "ℹ️"
-                console.print(f"  {icon} [{issue.category}] {issue.message}")
+                info_console.print(f"  {icon} [{issue.category}] {issue.message}")
     
     # Generate output
     output_generator = OutputGenerator(metadata)
     
     if output:
-        output_path = Path(output)
-        
-        if format == 'json':
-            output_generator.to_json(str(output_path))
-            console.print(f"\n[green]✓ JSON saved to: {output_path}[/green]")
-        
-        elif format == 'excel':
-            output_generator.to_excel(str(output_path))
-            console.print(f"\n[green]✓ Excel saved to: {output_path}[/green]")
+        _write_output(output_generator, format, Path(output), metric_rows, info_console)
+    
+    elif format == 'json' and raw_stdout:
+        # Piped or redirected: stream the plain document
+        output_generator.write_json(include_metric_rows=metric_rows)
+    
+    elif format == 'json':
+        # Print JSON to the terminal if no output file specified
+        info_console.print()
+        info_console.print("[bold]Metadata JSON:[/bold]")
+        info_console.print(output_generator.to_json(include_metric_rows=metric_rows), markup=False)
+    
+    elif format == 'ndjson':
+        # Stream records to stdout if no output file specified
+        output_generator.write_ndjson()
+    
+    elif format == 'csv':
+        # Stream metric rows to stdout if no output file specified
+        output_generator.to_metrics_csv()
+
+
+@cli.command('extract-batch')
+@click.argument('source')
+@click.option('--output-dir', '-o', type=click.Path(file_okay=False), required=True,
+              help='Directory for the per-workbook outputs and manifest.json')
+@click.option('--format', '-f', type=click.Choice(['json', 'ndjson', 'excel', 'html', 'summary', 'csv', 'snapshot']),
+              default='json', help='Output format')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1, help='Number of worker processes')
+@click.option('--streaming', is_flag=True, help='Parse one top-level element at a time (lower memory for very large workbooks)')
+@click.option('--selective', is_flag=True, help='Skip thumbnails, window layouts and style blocks while parsing')
+@click.option('--no-cache', is_flag=True, help='Do not read or write the extraction cache')
+@click.option('--refresh', is_flag=True, help='Re-extract every workbook and overwrite its cached result')
+def extract_batch_command(
+    source: str,
+    output_dir: str,
+    format: str,
+    jobs: int,
+    streaming: bool,
+    selective: bool,
+    no_cache: bool,
+    refresh: bool
+):
+    """
+    Extract metadata from every workbook in a directory or glob.
+    
+    Writes one output per workbook plus a manifest.json with per-file timing
+    and status. A failing workbook is recorded in the manifest and does not
+    stop the batch; the exit code is 1 if any workbook failed.
+    
+    Examples:
+        python main.py extract-batch ./workbooks -o ./metadata
+        python main.py extract-batch "./exports/**/*.twbx" -o ./metadata --jobs 8
+    """
+    batch_extractor = BatchExtractor(
+        output_dir,
+        format=format,
+        jobs=jobs,
+        cache_path=None if no_cache else ExtractionCache.DEFAULT_PATH,
+        refresh_cache=refresh,
+        streaming=streaming,
+        selective=selective,
+    )
+    
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        task = progress.add_task("Extracting workbooks...", total=None)
+        completed = 0
         
-        elif format == 'html':
-            output_generator.to_html(str(output_path))
-            console.print(f"\n[green]✓ HTML report saved to: {output_path}[/green]")
+        def on_result(item):
+            nonlocal completed
+            completed += 1
+            progress.update(task, description=f"Extracted {completed} workbooks ({Path(item.source_file).name})")
         
-        elif format == 'summary':
-            summary = output_generator.to_summary()
-            with open(output_path, 'w') as f:
-                f.write(summary)
-            console.print(f"\n[green]✓ Summary saved to: {output_path}[/green]")
+        result = batch_extractor.run(source, on_result=on_result)
     
-    elif format == 'json':
-        # Print JSON to stdout if no output file specified
-        console.print()
-        console.print("[bold]Metadata JSON:[/bold]")
-        console.print(metadata.to_json())
+    if not result.items:
+        console.print(f"[yellow]No .twb/.twbx files found for: {source}[/yellow]")
+        sys.exit(1)
+    
+    failures = [item for item in result.items if item.status != BatchStatus.OK]
+    if failures:
+        failures_table = Table(title="Failed Workbooks", show_header=True)
+        failures_table.add_column("Workbook", style="cyan")
+        failures_table.add_column("Error", style="red")
+        for item in failures:
+            failures_table.add_row(item.source_file, item.error or "")
+        console.print(failures_table)
+    
+    console.print(
+        f"\n[bold]{result.succeeded}[/bold] succeeded, [bold]{result.failed}[/bold] failed "
+        f"in {result.total_seconds:.2f}s"
+    )
+    console.print(f"[green]✓ Manifest saved to: {Path(output_dir) / BatchExtractor.MANIFEST_NAME}[/green]")
+    
+    if failures:
+        sys.exit(1)
 
 
 @cli.command()
@@ -148,6 +281,8 @@ def extract(file_path: str, output: Optional[str], format: str, validate: bool,
 @click.option('--password', '-p', help='Password (if not using PAT)')
 @click.option('--workbook-name', '-w', help='Workbook name on server (defaults to file name)')
 @click.option('--project', help='Project name to filter')
+@click.option('--separate-queries', is_flag=True,
+              help="Fetch with several smaller GraphQL queries instead of one (for workbooks over the server's node limit)")
 @click.option('--output', '-o', type=click.Path(), help='Output comparison report')
 def compare(
     file_path: str,
@@ -159,6 +294,7 @@ def compare(
     password: Optional[str],
     workbook_name: Optional[str],
     project: Optional[str],
+    separate_queries: bool,
     output: Optional[str]
 ):
     """
@@ -210,7 +346,9 @@ def compare(
         task3 = progress.add_task("Extracting from Metadata API...", total=None)
         try:
             wb_name = workbook_name or Path(file_path).stem
-            api_metadata = api_client.get_workbook_metadata(wb_name, project)
+            api_metadata = api_client.get_workbook_metadata(
+                wb_name, project, consolidated=not separate_queries
+            )
             progress.update(task3, description="[green]✓ API extraction complete")
         except Exception as e:
             console.print(f"[red]Error extracting from API: {e}[/red]")
@@ -288,18 +426,27 @@ def validate(file_path: str, strict: bool, output: Optional[str]):
     """
     Validate extracted metadata for completeness and accuracy.
     
+    FILE_PATH is a workbook, or a JSON or snapshot file saved by extract,
+    which is loaded instead of being extracted again.
+    
     Examples:
         python main.py validate workbook.twbx
         python main.py validate workbook.twbx --strict
+        python main.py validate metadata.json
+        python main.py validate metadata.snapshot
     """
     console.print("[bold]Validating Tableau Workbook Metadata[/bold]")
     console.print(f"File: {file_path}")
     console.print()
     
-    # Extract
-    with console.status("Extracting metadata..."):
-        extractor = XMLMetadataExtractor(file_path)
-        metadata = extractor.extract()
+    # Extract, or load a saved extraction
+    if Path(file_path).suffix.lower() in (".json", SNAPSHOT_SUFFIX):
+        with console.status("Loading metadata..."):
+            metadata = _load_saved(file_path)
+    else:
+        with console.status("Extracting metadata..."):
+            extractor = XMLMetadataExtractor(file_path)
+            metadata = extractor.extract()
     
     # Validate
     with console.status("Running validation checks..."):
@@ -355,6 +502,32 @@ def validate(file_path: str, strict: bool, output: Optional[str]):
         sys.exit(1)
 
 
+@cli.command()
+@click.argument('json_path', type=click.Path(exists=True))
+@click.option('--output', '-o', type=click.Path(), required=True, help='Output file path')
+@click.option('--format', '-f', type=click.Choice(['json', 'ndjson', 'excel', 'html', 'summary', 'csv', 'snapshot']),
+              default='excel', help='Output format')
+@click.option('--metric-rows', is_flag=True,
+              help='Also write the flattened metric_rows view (one full row per metric and worksheet) to JSON')
+def report(json_path: str, output: str, format: str, metric_rows: bool):
+    """
+    Generate output from a saved JSON or snapshot extraction without re-parsing the workbook.
+    
+    Examples:
+        python main.py report metadata.json -f excel -o metadata.xlsx
+        python main.py report metadata.json -f html -o report.html
+        python main.py report metadata.snapshot -f excel -o metadata.xlsx
+    """
+    try:
+        with console.status("Loading metadata..."):
+            metadata = _load_saved(json_path)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Error loading {json_path}: {e}[/red]")
+        sys.exit(1)
+    
+    _write_output(OutputGenerator(metadata), format, Path(output), metric_rows)
+
+
 @cli.command('list-workbooks')
 @click.option('--server', '-s', required=True, help='Tableau Server URL')
 @click.option('--site', default='', help='Tableau site content URL')
@@ -420,7 +593,176 @@ def list_workbooks(
         sys.exit(1)
 
 
-def _display_summary(metadata):
+@cli.command()
+@click.option('--server', '-s', required=True, help='Tableau Server URL')
+@click.option('--site', default='', help='Tableau site content URL')
+@click.option('--token-name', help='Personal access token name')
+@click.option('--token-secret', help='Personal access token secret')
+@click.option('--username', '-u', help='Username')
+@click.option('--password', '-p', help='Password')
+@click.option('--output-dir', '-o', type=click.Path(file_okay=False), required=True,
+              help='Directory for the per-workbook outputs, crawl state and manifest.json')
+@click.option('--format', '-f', type=click.Choice(['json', 'ndjson', 'excel', 'html', 'summary', 'csv', 'snapshot']),
+              default='json', help='Output format')
+@click.option('--concurrency', '-c', type=click.IntRange(min=1), default=8,
+              help='Number of workbooks fetched at the same time')
+@click.option('--project', help='Only crawl workbooks in this project')
+@click.option('--separate-queries', is_flag=True,
+              help="Fetch with several smaller GraphQL queries instead of one (for workbooks over the server's node limit)")
+@click.option('--max-rate', type=click.FloatRange(min=0, min_open=True), default=100.0,
+              help='Most GraphQL requests per second; fewer are sent while the server throttles')
+@click.option('--restart', is_flag=True, help='Ignore the previous crawl state and fetch every workbook again')
+def crawl(
+    server: str,
+    site: str,
+    token_name: Optional[str],
+    token_secret: Optional[str],
+    username: Optional[str],
+    password: Optional[str],
+    output_dir: str,
+    format: str,
+    concurrency: int,
+    project: Optional[str],
+    separate_queries: bool,
+    max_rate: float,
+    restart: bool
+):
+    """
+    Fetch metadata for every workbook on a Tableau Server site.
+    
+    Writes one output per workbook (named by workbook LUID) plus a
+    manifest.json. Progress is saved as each workbook finishes, so running
+    the same command again after an interruption only fetches the workbooks
+    not written yet, and retries the failed ones. Requests are paced to what
+    the server tolerates: when it throttles, the crawl backs off (honoring
+    Retry-After) and sends fewer requests at once.
+    
+    Examples:
+        python main.py crawl -s https://tableau.company.com --token-name MyToken --token-secret secret -o ./site
+        python main.py crawl -s https://tableau.company.com --token-name MyToken --token-secret secret -o ./site -c 16 -f snapshot
+    """
+    console.print(f"[bold]Crawling: {server}[/bold]")
+    
+    rate_limiter = RateLimiter(rate=max_rate)
+    
+    async def run_crawl(on_result):
+        async with AsyncTableauMetadataAPIClient(
+            server_url=server,
+            site_id=site,
+            token_name=token_name,
+            token_secret=token_secret,
+            username=username,
+            password=password,
+            rate_limiter=rate_limiter,
+        ) as client:
+            crawler = SiteCrawler(
+                client,
+                output_dir,
+                format=format,
+                concurrency=concurrency,
+                project_name=project,
+                consolidated=not separate_queries,
+                resume=not restart,
+            )
+            return await crawler.crawl(on_result)
+    
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        task = progress.add_task("Listing workbooks...", total=None)
+        completed = 0
+        
+        def on_result(item):
+            nonlocal completed
+            completed += 1
+            progress.update(task, description=f"Fetched {completed} workbooks ({item.name})")
+        
+        try:
+            result = asyncio.run(run_crawl(on_result))
+        except Exception as e:
+            console.print(f"[red]Error: {e}[/red]")
+            sys.exit(1)
+    
+    if not result.items:
+        console.print("[yellow]No workbooks found[/yellow]")
+        return
+    
+    failures = [item for item in result.items if item.status != BatchStatus.OK]
+    if failures:
+        failures_table = Table(title="Failed Workbooks", show_header=True)
+        failures_table.add_column("Workbook", style="cyan")
+        failures_table.add_column("Project", style="magenta")
+        failures_table.add_column("Error", style="red")
+        for item in failures:
+            failures_table.add_row(item.name, item.project or "", item.error or "")
+        console.print(failures_table)
+    
+    if result.resumed:
+        console.print(f"\n{result.resumed} workbooks already fetched by a previous run")
+    if rate_limiter.throttled:
+        console.print(
+            f"\nServer throttled {rate_limiter.throttled} of {rate_limiter.requests} requests; "
+            f"ended at {int(rate_limiter.concurrency)} requests in flight"
+        )
+    console.print(
+        f"\n[bold]{result.succeeded}[/bold] succeeded, [bold]{result.failed}[/bold] failed "
+        f"in {result.total_seconds:.2f}s"
+    )
+    console.print(f"[green]✓ Manifest saved to: {Path(output_dir) / SiteCrawler.MANIFEST_NAME}[/green]")
+    
+    if failures:
+        sys.exit(1)
+
+
+def _load_saved(path: str) -> WorkbookMetadata:
+    """Load metadata saved by extract, as a snapshot or as JSON."""
+    if Path(path).suffix.lower() == SNAPSHOT_SUFFIX or is_snapshot(path):
+        return read_snapshot(path)
+    return WorkbookMetadata.load(path)
+
+
+def _write_output(
+    output_generator: OutputGenerator,
+    format: str,
+    output_path: Path,
+    metric_rows: bool = False,
+    out: Console = console
+):
+    """Write metadata to a file in the given format and report where it went."""
+    if format == 'json':
+        output_generator.write_json(str(output_path), include_metric_rows=metric_rows)
+        out.print(f"\n[green]✓ JSON saved to: {output_path}[/green]")
+    
+    elif format == 'ndjson':
+        count = output_generator.write_ndjson(str(output_path))
+        out.print(f"\n[green]✓ {count} NDJSON records saved to: {output_path}[/green]")
+    
+    elif format == 'excel':
+        output_generator.to_excel(str(output_path))
+        out.print(f"\n[green]✓ Excel saved to: {output_path}[/green]")
+    
+    elif format == 'html':
+        output_generator.to_html(str(output_path))
+        out.print(f"\n[green]✓ HTML report saved to: {output_path}[/green]")
+    
+    elif format == 'summary':
+        summary = output_generator.to_summary()
+        with open(output_path, 'w') as f:
+            f.write(summary)
+        out.print(f"\n[green]✓ Summary saved to: {output_path}[/green]")
+    
+    elif format == 'csv':
+        count = output_generator.to_metrics_csv(str(output_path))
+        out.print(f"\n[green]✓ {count} metric rows saved to: {output_path}[/green]")
+    
+    elif format == 'snapshot':
+        output_generator.to_snapshot(str(output_path))
+        out.print(f"\n[green]✓ Snapshot saved to: {output_path}[/green]")
+
+
+def _display_summary(metadata, out: Console = console):
     """Display extraction summary."""
     table = Table(title="Extraction Summary")
     table.add_column("Component", style="cyan")
@@ -434,11 +776,11 @@ def _display_summary(metadata):
     table.add_row("Parameters", str(metadata.total_parameters))
     table.add_row("Total Filters", str(metadata.total_filters))
     
-    console.print(table)
+    out.print(table)
     
     # Show worksheets
     if metadata.sheets:
-        console.print()
+        out.print()
         sheets_table = Table(title="Worksheets")
         sheets_table.add_column("Name", style="cyan")
         sheets_table.add_column("Chart Type", style="magenta")
@@ -457,7 +799,7 @@ def _display_summary(metadata):
         if len(metadata.sheets) > 10:
             sheets_table.add_row("...", f"({len(metadata.sheets) - 10} more)", "", "")
         
-        console.print(sheets_table)
+        out.print(sheets_table)
 
 
 # Simple API for programmatic use
@@ -475,6 +817,23 @@ def extract_metadata(file_path: str):
     return extractor.extract()
 
 
+def extract_batch(source: str, output_dir: str, format: str = "json", jobs: int = 1):
+    """
+    Extract metadata from every workbook in a directory or glob.
+    
+    Args:
+        source: Directory or glob pattern of .twb/.twbx files
+        output_dir: Directory for the per-workbook outputs and manifest.json
+        format: Output format (json/ndjson/excel/html/summary/csv/snapshot)
+        jobs: Number of worker processes
+        
+    Returns:
+        BatchResult: Per-workbook status, timing and output paths
+    """
+    batch_extractor = BatchExtractor(output_dir, format=format, jobs=jobs)
+    return batch_extractor.run(source)
+
+
 def compare_extraction_methods(
     file_path: str,
     server_url: str,
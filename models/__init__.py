@@ -18,8 +18,17 @@ from .metadata_models import (
     ParameterMetadata,
     RelationshipMetadata,
     MetricDetailRow,
+    MetricDefinition,
+    MetricSheetContext,
+    MetricUsage,
     WorkbookMetadata,
 )
+from .compact import (
+    CompactRecord,
+    CompactWorkbookMetadata,
+    AnyWorkbookMetadata,
+    to_compact,
+)
 
 __all__ = [
     "DataType",
@@ -39,5 +48,12 @@ __all__ = [
     "ParameterMetadata",
     "RelationshipMetadata",
     "MetricDetailRow",
+    "MetricDefinition",
+    "MetricSheetContext",
+    "MetricUsage",
     "WorkbookMetadata",
+    "CompactRecord",
+    "CompactWorkbookMetadata",
+    "AnyWorkbookMetadata",
+    "to_compact",
 ]
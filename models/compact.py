@@ -0,0 +1,168 @@
+"""
+Compact in-memory form of extracted metadata.
+
+Every pydantic model in models.metadata_models has a slotted record class here
+with the same fields and properties (display_name, is_lod, ...). The record
+classes are generated from the models' field lists, so the two can never drift
+apart. Strings are interned while converting, so the field, sheet and
+datasource names repeated across thousands of filters, relationships and metric
+usages are stored once.
+
+A compact workbook takes roughly a quarter of the memory of its pydantic models.
+That makes it the form to hold on to when many workbooks are kept at once (site
+crawls, comparisons across a batch). MetadataValidator and MetadataComparator
+read either form; convert back with to_model() for JSON/Excel/HTML output.
+
+    compact = to_compact(XMLMetadataExtractor("workbook.twbx").extract())
+    result = MetadataValidator().validate(compact)
+    metadata = compact.to_model()
+"""
+
+import sys
+from typing import Any, ClassVar, Dict, Iterable, Type, Union
+
+from pydantic import BaseModel
+
+from models.metadata_models import (
+    FieldMetadata,
+    CalculatedFieldMetadata,
+    FilterMetadata,
+    AxisMetadata,
+    VisualMetadata,
+    SheetMetadata,
+    DashboardZoneMetadata,
+    DashboardActionMetadata,
+    DashboardMetadata,
+    ParameterMetadata,
+    DataSourceMetadata,
+    RelationshipMetadata,
+    MetricDetailRow,
+    MetricDefinition,
+    MetricSheetContext,
+    MetricUsage,
+    WorkbookMetadata,
+    _construct_trusted,
+)
+
+
+class CompactRecord:
+    """
+    Base class of the slotted records.
+    
+    Each subclass has one slot per field of its pydantic model. Records are
+    plain attribute containers: no validation happens on assignment.
+    """
+    
+    __slots__ = ()
+    
+    # The pydantic model this record mirrors
+    model_class: ClassVar[Type[BaseModel]]
+    
+    def to_model(self) -> BaseModel:
+        """Convert to the pydantic model, recursively and without revalidation."""
+        return _construct_trusted(
+            self.model_class,
+            **{name: _to_model_value(getattr(self, name)) for name in self.__slots__}
+        )
+    
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+# Record class per pydantic model, filled by _record_class()
+_RECORD_CLASSES: Dict[Type[BaseModel], Type[CompactRecord]] = {}
+
+
+def _record_class(model_class: Type[BaseModel], methods: Iterable[str] = ()) -> Type[CompactRecord]:
+    """
+    Generate the slotted record class for a pydantic model.
+    
+    Properties of the model are carried over, as are the named methods (which
+    must only read fields).
+    """
+    namespace = {
+        "__slots__": tuple(model_class.model_fields),
+        "__module__": __name__,
+        "__doc__": f"Compact form of {model_class.__name__}.",
+        "model_class": model_class,
+    }
+    for name, value in vars(model_class).items():
+        if isinstance(value, property) or name in methods:
+            namespace[name] = value
+    
+    record_class = type(f"Compact{model_class.__name__}", (CompactRecord,), namespace)
+    _RECORD_CLASSES[model_class] = record_class
+    return record_class
+
+
+CompactFieldMetadata = _record_class(FieldMetadata)
+CompactCalculatedFieldMetadata = _record_class(CalculatedFieldMetadata)
+CompactFilterMetadata = _record_class(FilterMetadata)
+CompactAxisMetadata = _record_class(AxisMetadata)
+CompactVisualMetadata = _record_class(VisualMetadata)
+CompactSheetMetadata = _record_class(SheetMetadata)
+CompactDashboardZoneMetadata = _record_class(DashboardZoneMetadata)
+CompactDashboardActionMetadata = _record_class(DashboardActionMetadata)
+CompactDashboardMetadata = _record_class(DashboardMetadata)
+CompactParameterMetadata = _record_class(ParameterMetadata)
+CompactDataSourceMetadata = _record_class(DataSourceMetadata)
+CompactRelationshipMetadata = _record_class(RelationshipMetadata)
+CompactMetricDetailRow = _record_class(MetricDetailRow)
+CompactMetricDefinition = _record_class(MetricDefinition)
+CompactMetricSheetContext = _record_class(MetricSheetContext)
+CompactMetricUsage = _record_class(MetricUsage)
+CompactWorkbookMetadata = _record_class(
+    WorkbookMetadata,
+    methods=("compute_statistics", "iter_metric_rows", "get_metric_rows"),
+)
+
+# Either form of a workbook, as accepted by MetadataValidator and MetadataComparator
+AnyWorkbookMetadata = Union[WorkbookMetadata, CompactWorkbookMetadata]
+
+
+def to_compact(model: BaseModel) -> CompactRecord:
+    """
+    Convert a metadata model, and everything nested in it, to compact records.
+    
+    Args:
+        model: Any model from models.metadata_models, usually a WorkbookMetadata
+    
+    Returns:
+        CompactRecord: The matching Compact* record; the model is not modified
+    """
+    return _to_compact_value(model)
+
+
+def _to_compact_value(value: Any) -> Any:
+    """Convert one field value: models to records, containers copied, strings interned."""
+    if type(value) is str:
+        return sys.intern(value)
+    if isinstance(value, BaseModel):
+        record_class = _RECORD_CLASSES[type(value)]
+        record = record_class.__new__(record_class)
+        values = value.__dict__
+        for name in record_class.__slots__:
+            setattr(record, name, _to_compact_value(values[name]))
+        return record
+    if type(value) is list:
+        return [_to_compact_value(item) for item in value]
+    if type(value) is dict:
+        return {_to_compact_value(key): _to_compact_value(item) for key, item in value.items()}
+    return value
+
+
+def _to_model_value(value: Any) -> Any:
+    """Convert one record field value back: records to models, containers copied."""
+    if isinstance(value, CompactRecord):
+        return value.to_model()
+    if type(value) is list:
+        return [_to_model_value(item) for item in value]
+    if type(value) is dict:
+        return {key: _to_model_value(item) for key, item in value.items()}
+    return value
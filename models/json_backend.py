@@ -0,0 +1,86 @@
+"""
+JSON backend for dumping and loading metadata.
+
+pydantic-core's own serializer and parser are used by default: for models
+they are faster than orjson, which first has to go through model_dump() and
+validate the parsed dict. orjson (pip install orjson) can be selected instead,
+except for indents it cannot produce (anything but 2 or compact). Both write
+the same document: UTF-8 text with non-ASCII characters unescaped, enums as
+their values and datetimes in ISO 8601.
+
+    set_json_backend("orjson")   # e.g. to compare the two
+    text = dumps(metadata)
+    metadata = validate_json(WorkbookMetadata, text)
+"""
+
+from typing import Any, Optional, Type, TypeVar, Union
+
+from pydantic import BaseModel
+from pydantic_core import to_json as _to_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+JSON_BACKENDS = ("orjson", "pydantic")
+
+_backend = "pydantic"
+
+
+def get_json_backend() -> str:
+    """Name of the backend in use: "orjson" or "pydantic"."""
+    return _backend
+
+
+def set_json_backend(name: str) -> None:
+    """
+    Select the JSON backend.
+    
+    Raises:
+        ValueError: If name is not one of JSON_BACKENDS
+        ImportError: If "orjson" is selected but not installed
+    """
+    global _backend
+    
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name} (expected one of {', '.join(JSON_BACKENDS)})")
+    if name == "orjson" and orjson is None:
+        raise ImportError("orjson is not installed. Install with: pip install orjson")
+    _backend = name
+
+
+def dumps(value: Any, indent: Optional[int] = 2) -> str:
+    """
+    Serialize a model, or plain data that may contain models, to JSON text.
+    
+    Args:
+        value: Model or JSON-compatible data
+        indent: Indentation level (None for compact output)
+    """
+    if _backend == "orjson" and indent in (None, 2):
+        option = orjson.OPT_INDENT_2 if indent else 0
+        if isinstance(value, BaseModel):
+            value = value.model_dump(mode="json")
+        return orjson.dumps(value, default=_orjson_default, option=option).decode("utf-8")
+    
+    if isinstance(value, BaseModel):
+        return value.model_dump_json(indent=indent)
+    return _to_json(value, indent=indent).decode("utf-8")
+
+
+def validate_json(model_cls: Type[ModelT], data: Union[str, bytes]) -> ModelT:
+    """Parse JSON text and validate it into model_cls."""
+    if _backend == "orjson":
+        return model_cls.model_validate(orjson.loads(data))
+    return model_cls.model_validate_json(data)
+
+
+def _orjson_default(value: Any) -> Any:
+    """Serialize what orjson does not know natively (models nested in plain data)."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
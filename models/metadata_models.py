@@ -3,11 +3,18 @@ Comprehensive metadata models for Tableau workbook extraction.
 Designed for 100% accuracy in metadata capture.
 """
 
-from typing import Optional, List, Dict, Any, Union
+import os
+from typing import Optional, List, Dict, Any, Union, Iterator, Tuple, Type, TypeVar, Callable
 from enum import Enum
-from pydantic import BaseModel, Field
+from pathlib import Path
+from pydantic import BaseModel, Field, model_validator
+from pydantic_core import PydanticUndefined
 from datetime import datetime
 
+from models import json_backend
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
 
 class DataType(str, Enum):
     """Tableau data types."""
@@ -155,6 +162,10 @@ class CalculatedFieldMetadata(BaseModel):
     # Complexity
     complexity_score: int = 0
     has_nested_calculations: bool = False
+    nesting_depth: int = 0  # Deepest nesting of functions, LODs and IF/CASE blocks
+    
+    # Every LOD expression in the formula: {"type", "dimensions", "expression"}
+    lod_expressions: List[Dict[str, Any]] = Field(default_factory=list)
     
     # Usage tracking
     used_in_sheets: List[str] = Field(default_factory=list)
@@ -574,6 +585,64 @@ class MetricDetailRow(BaseModel):
         return self.metric_caption or self.metric_name
 
 
+class MetricDefinition(BaseModel):
+    """
+    What a metric is, independent of where it is used.
+    
+    Stored once per metric in WorkbookMetadata.metric_definitions and referenced
+    by ID from each MetricUsage.
+    """
+    metric_name: str
+    metric_caption: Optional[str] = None
+    metric_type: str = Field(description="'calculated_field', 'measure', 'dimension', 'unknown'")
+    
+    # Data source context
+    datasource_name: Optional[str] = None
+    datasource_caption: Optional[str] = None
+    
+    # Calculation/Logic information
+    formula: Optional[str] = None
+    formula_readable: Optional[str] = None
+    calculation_type: Optional[str] = None
+    data_type: Optional[str] = None
+    aggregations_in_formula: List[str] = Field(default_factory=list)
+    functions_used: List[str] = Field(default_factory=list)
+    
+    # Dependencies
+    referenced_fields: List[str] = Field(default_factory=list)
+    referenced_parameters: List[str] = Field(default_factory=list)
+    
+    # LOD specific
+    lod_type: Optional[str] = None
+    lod_dimensions: List[str] = Field(default_factory=list)
+    lod_expression: Optional[str] = None
+    
+    # Complexity
+    complexity_score: int = 0
+
+
+class MetricSheetContext(BaseModel):
+    """Worksheet context shared by every metric used in a worksheet."""
+    worksheet_name: str
+    worksheet_title: Optional[str] = None
+    chart_type: Optional[str] = None
+    
+    # Filters applied to this worksheet
+    filters_applied: List[str] = Field(default_factory=list)
+    filter_details: List[Dict[str, Any]] = Field(default_factory=list)
+    
+    # Dashboard context
+    dashboards_containing_worksheet: List[str] = Field(default_factory=list)
+
+
+class MetricUsage(BaseModel):
+    """One metric used in one worksheet, referencing its definition and sheet context."""
+    metric_id: str
+    worksheet_name: str
+    shelf_position: Optional[str] = None  # rows, columns, color, size, label, detail, tooltip
+    aggregation_used: Optional[str] = None  # How this metric is aggregated in the worksheet
+
+
 class WorkbookMetadata(BaseModel):
     """Complete metadata for a Tableau workbook."""
     # Basic info
@@ -601,8 +670,12 @@ class WorkbookMetadata(BaseModel):
     # All relationships (aggregated view)
     relationships: List[RelationshipMetadata] = Field(default_factory=list)
     
-    # Flattened metric rows (one row per metric-worksheet combination)
-    metric_rows: List[MetricDetailRow] = Field(default_factory=list)
+    # Normalized metric usage: definitions by metric ID, worksheet context by
+    # worksheet name, and one usage per metric-worksheet combination.
+    # get_metric_rows() materializes the flattened MetricDetailRow view.
+    metric_definitions: Dict[str, MetricDefinition] = Field(default_factory=dict)
+    metric_sheets: Dict[str, MetricSheetContext] = Field(default_factory=dict)
+    metric_usages: List[MetricUsage] = Field(default_factory=list)
     
     # Summary statistics
     total_sheets: int = 0
@@ -616,6 +689,55 @@ class WorkbookMetadata(BaseModel):
     validation_errors: List[str] = Field(default_factory=list)
     validation_warnings: List[str] = Field(default_factory=list)
     
+    @model_validator(mode="before")
+    @classmethod
+    def _split_legacy_metric_rows(cls, data: Any) -> Any:
+        """
+        Accept metadata saved before metric usage was normalized.
+        
+        Older versions stored a flattened metric_rows list instead of
+        metric_definitions, metric_sheets and metric_usages; the three are
+        rebuilt from it. Where the normalized keys are present, metric_rows is
+        only the optional view written by --metric-rows and is ignored.
+        """
+        if not isinstance(data, dict) or "metric_rows" not in data or "metric_usages" in data:
+            return data
+        
+        definitions: Dict[str, Dict[str, Any]] = {}
+        sheets: Dict[str, Dict[str, Any]] = {}
+        usages: List[Dict[str, Any]] = []
+        
+        for row in data["metric_rows"] or []:
+            if isinstance(row, BaseModel):
+                row = row.model_dump()
+            if not isinstance(row, dict):
+                raise ValueError(f"metric_rows entries must be objects, got {type(row).__name__}")
+            
+            metric_id = f"[{row.get('datasource_name') or ''}].[{row.get('metric_name')}]"
+            if metric_id not in definitions:
+                definitions[metric_id] = {
+                    name: row[name] for name in MetricDefinition.model_fields if name in row
+                }
+            
+            worksheet_name = row.get("worksheet_name")
+            if worksheet_name not in sheets:
+                sheets[worksheet_name] = {
+                    name: row[name] for name in MetricSheetContext.model_fields if name in row
+                }
+            
+            usages.append({
+                "metric_id": metric_id,
+                "worksheet_name": worksheet_name,
+                "shelf_position": row.get("shelf_position"),
+                "aggregation_used": row.get("aggregation_used"),
+            })
+        
+        data = {key: value for key, value in data.items() if key != "metric_rows"}
+        data.setdefault("metric_definitions", definitions)
+        data.setdefault("metric_sheets", sheets)
+        data["metric_usages"] = usages
+        return data
+    
     def compute_statistics(self):
         """Compute summary statistics."""
         self.total_sheets = len(self.sheets)
@@ -637,10 +759,126 @@ class WorkbookMetadata(BaseModel):
         self.total_calculated_fields = total_calc
         self.total_filters = total_filters
     
+    def iter_metric_rows(self) -> Iterator[MetricDetailRow]:
+        """
+        Yield flattened metric rows (one row per metric-worksheet combination).
+        
+        Each row is built when requested by joining a metric usage with its
+        definition and worksheet context, so writers consuming the rows one at
+        a time hold a single row in memory however many usages there are.
+        Rows reuse the already-typed values of the definition and context
+        without validation, so list fields are shared with them rather than
+        copied; treat the rows as read-only.
+        """
+        for usage in self.metric_usages:
+            definition = self.metric_definitions[usage.metric_id]
+            context = self.metric_sheets[usage.worksheet_name]
+            yield _construct_trusted(
+                MetricDetailRow,
+                metric_name=definition.metric_name,
+                metric_caption=definition.metric_caption,
+                metric_type=definition.metric_type,
+                datasource_name=definition.datasource_name,
+                datasource_caption=definition.datasource_caption,
+                formula=definition.formula,
+                formula_readable=definition.formula_readable,
+                calculation_type=definition.calculation_type,
+                data_type=definition.data_type,
+                aggregation_used=usage.aggregation_used,
+                aggregations_in_formula=definition.aggregations_in_formula,
+                functions_used=definition.functions_used,
+                referenced_fields=definition.referenced_fields,
+                referenced_parameters=definition.referenced_parameters,
+                lod_type=definition.lod_type,
+                lod_dimensions=definition.lod_dimensions,
+                lod_expression=definition.lod_expression,
+                worksheet_name=context.worksheet_name,
+                worksheet_title=context.worksheet_title,
+                chart_type=context.chart_type,
+                shelf_position=usage.shelf_position,
+                filters_applied=context.filters_applied,
+                filter_details=context.filter_details,
+                dashboards_containing_worksheet=context.dashboards_containing_worksheet,
+                complexity_score=definition.complexity_score,
+            )
+    
+    def get_metric_rows(self) -> List[MetricDetailRow]:
+        """All flattened metric rows as a list; prefer iter_metric_rows() for exports."""
+        return list(self.iter_metric_rows())
+    
     def to_json(self, indent: int = 2) -> str:
-        """Export to JSON."""
-        return self.model_dump_json(indent=indent)
+        """Export to JSON with the selected backend (see models.json_backend)."""
+        return json_backend.dumps(self, indent)
+    
+    @classmethod
+    def from_json(cls, data: Union[str, bytes]) -> "WorkbookMetadata":
+        """
+        Rebuild metadata from JSON written by to_json() or OutputGenerator.
+        
+        Parsed and validated in one pass by pydantic-core, unless orjson was
+        selected (see models.json_backend). Keys the model does not know,
+        such as the optional metric_rows view, are ignored; JSON from
+        versions that only stored metric_rows is converted to the normalized
+        metric fields.
+        """
+        return json_backend.validate_json(cls, data)
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "WorkbookMetadata":
+        """Load metadata saved as JSON, e.g. by `main.py extract -o metadata.json`."""
+        with open(path, 'rb') as f:
+            return cls.from_json(f.read())
     
     def to_dict(self) -> Dict[str, Any]:
         """Export to dictionary."""
         return self.model_dump()
+
+
+# Per model class: (field name, default, default factory) in declaration order
+_CONSTRUCT_FIELDS: Dict[type, List[Tuple[str, Any, Optional[Callable[[], Any]]]]] = {}
+
+# Set TABLEAU_METADATA_VERIFY_TRUSTED=1 to check every model built by
+# _construct_trusted against the validating constructor (not under python -O)
+_VERIFY_TRUSTED = __debug__ and os.environ.get("TABLEAU_METADATA_VERIFY_TRUSTED") == "1"
+
+
+def _construct_trusted(model_cls: Type[ModelT], **values: Any) -> ModelT:
+    """
+    Create a model from values that already have the field types, without validation.
+    
+    Behaves like model_cls.model_construct(**values), but field defaults are
+    collected once per class; model_construct inspects every default factory
+    on every call and is slower than validating. Validation itself is cheap
+    for scalar fields, so this only pays off where it would copy large list
+    and dict values, as for MetricDetailRow. Values must come from already
+    validated models; mutable defaults must use default_factory.
+    """
+    fields = _CONSTRUCT_FIELDS.get(model_cls)
+    if fields is None:
+        if model_cls.__pydantic_post_init__ or model_cls.__private_attributes__:
+            return model_cls.model_construct(**values)
+        fields = [
+            (name, field.default, field.default_factory)
+            for name, field in model_cls.model_fields.items()
+        ]
+        _CONSTRUCT_FIELDS[model_cls] = fields
+    
+    fields_values = {}
+    for name, default, default_factory in fields:
+        if name in values:
+            fields_values[name] = values[name]
+        elif default_factory is not None:
+            fields_values[name] = default_factory()
+        elif default is not PydanticUndefined:
+            fields_values[name] = default
+    
+    model = model_cls.__new__(model_cls)
+    object.__setattr__(model, "__dict__", fields_values)
+    object.__setattr__(model, "__pydantic_fields_set__", set(values))
+    object.__setattr__(model, "__pydantic_extra__", None)
+    object.__setattr__(model, "__pydantic_private__", None)
+    
+    if _VERIFY_TRUSTED:
+        expected = model_cls.model_validate(values)
+        assert model == expected, f"{model_cls.__name__} built without validation differs: {model!r} != {expected!r}"
+    return model
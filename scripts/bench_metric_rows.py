@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark building metric rows without validation.
+
+Times WorkbookMetadata.iter_metric_rows(), which builds each MetricDetailRow
+with _construct_trusted(), against validating construction of the same values
+(MetricDetailRow(**values), what iter_metric_rows() did before), and checks
+that both give equal rows.
+
+By default a synthetic workbook is generated, so runs are comparable across
+machines and versions:
+
+    python scripts/bench_metric_rows.py
+    python scripts/bench_metric_rows.py --definitions 2000 --sheets 1500 --per-sheet 40
+    python scripts/bench_metric_rows.py --workbook /path/to/workbook.twbx
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extractors.xml_extractor import XMLMetadataExtractor
+from models.metadata_models import (
+    MetricDefinition,
+    MetricDetailRow,
+    MetricSheetContext,
+    MetricUsage,
+    WorkbookMetadata,
+)
+
+
+def synthetic_workbook(definitions: int, sheets: int, per_sheet: int) -> WorkbookMetadata:
+    """Workbook with the given number of metrics and worksheets, each worksheet using per_sheet metrics."""
+    metric_definitions = {}
+    for i in range(definitions):
+        metric_id = f"[Datasource {i % 5}].[Metric {i}]"
+        metric_definitions[metric_id] = MetricDefinition(
+            metric_name=f"Metric {i}",
+            metric_caption=f"Metric {i}",
+            metric_type="calculated_field",
+            datasource_name=f"Datasource {i % 5}",
+            formula=f"SUM([Sales {i}]) / COUNTD([Order ID])",
+            formula_readable=f"SUM([Sales {i}]) / COUNTD([Order ID])",
+            calculation_type="ratio",
+            data_type="real",
+            aggregations_in_formula=["SUM", "COUNTD"],
+            functions_used=["SUM", "COUNTD"],
+            referenced_fields=[f"Sales {i}", "Order ID"],
+            complexity_score=i % 10,
+        )
+    
+    metric_sheets = {}
+    for j in range(sheets):
+        name = f"Sheet {j}"
+        metric_sheets[name] = MetricSheetContext(
+            worksheet_name=name,
+            worksheet_title=f"Sheet {j} title",
+            chart_type="bar",
+            filters_applied=[f"Region {k}" for k in range(3)],
+            filter_details=[{"field": f"Region {k}", "type": "categorical", "values": ["East", "West"]} for k in range(3)],
+            dashboards_containing_worksheet=[f"Dashboard {j % 20}"],
+        )
+    
+    metric_ids = list(metric_definitions)
+    metric_usages = [
+        MetricUsage(
+            metric_id=metric_ids[(j * per_sheet + k) % definitions],
+            worksheet_name=f"Sheet {j}",
+            shelf_position="rows" if k % 2 else "columns",
+            aggregation_used="SUM",
+        )
+        for j in range(sheets)
+        for k in range(per_sheet)
+    ]
+    
+    return WorkbookMetadata(
+        name="Synthetic",
+        metric_definitions=metric_definitions,
+        metric_sheets=metric_sheets,
+        metric_usages=metric_usages,
+    )
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    """Fastest of repeat runs of func, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workbook", help="Extract this workbook instead of generating one")
+    parser.add_argument("--definitions", type=int, default=1000, help="Synthetic metrics (default: 1000)")
+    parser.add_argument("--sheets", type=int, default=500, help="Synthetic worksheets (default: 500)")
+    parser.add_argument("--per-sheet", type=int, default=25, help="Metrics used per synthetic worksheet (default: 25)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the fastest counts (default: 5)")
+    args = parser.parse_args(argv)
+    
+    if args.workbook:
+        metadata = XMLMetadataExtractor(args.workbook).extract()
+    else:
+        metadata = synthetic_workbook(args.definitions, args.sheets, args.per_sheet)
+    
+    rows = list(metadata.iter_metric_rows())
+    values = [dict(row) for row in rows]
+    validated = [MetricDetailRow(**row_values) for row_values in values]
+    if rows != validated:
+        mismatch = next(i for i, (a, b) in enumerate(zip(rows, validated)) if a != b)
+        print(f"Row {mismatch} differs from its validated counterpart:\n  {rows[mismatch]!r}\n  {validated[mismatch]!r}")
+        return 1
+    
+    trusted_time = best_of(args.repeat, lambda: list(metadata.iter_metric_rows()))
+    validated_time = best_of(args.repeat, lambda: [MetricDetailRow(**row_values) for row_values in values])
+    
+    print(f"{len(rows):,} metric rows, best of {args.repeat}")
+    print(f"  iter_metric_rows (trusted):  {trusted_time * 1000:8.1f} ms")
+    print(f"  MetricDetailRow(**values):   {validated_time * 1000:8.1f} ms")
+    print(f"  speedup:                     {validated_time / trusted_time:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
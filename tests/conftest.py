@@ -0,0 +1,24 @@
+"""
+Shared fixtures: a small synthetic workbook (see tests/workbooks.py).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tests.workbooks import make_workbook_xml
+
+
+@pytest.fixture
+def workbook_xml() -> str:
+    return make_workbook_xml()
+
+
+@pytest.fixture
+def workbook_path(tmp_path: Path, workbook_xml: str) -> Path:
+    path = tmp_path / "Superstore.twb"
+    path.write_text(workbook_xml, encoding="utf-8")
+    return path
@@ -0,0 +1,56 @@
+"""
+Tests for batch extraction recovering from a broken process pool.
+"""
+
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from utils.batch import BatchExtractor, BatchStatus
+
+
+@pytest.fixture
+def source(tmp_path, workbook_xml):
+    source = tmp_path / "workbooks"
+    source.mkdir()
+    for i in range(3):
+        (source / f"Workbook {i}.twb").write_text(workbook_xml, encoding="utf-8")
+    return source
+
+
+def test_parallel_batch(tmp_path, source):
+    result = BatchExtractor(str(tmp_path / "out"), jobs=2).run(str(source))
+    
+    assert [item.status for item in result.items] == [BatchStatus.OK] * 3
+
+
+def test_pool_broken_while_idle_is_rebuilt(tmp_path, source, monkeypatch):
+    submit = BatchExtractor._submit
+    calls = []
+    
+    def breaks_once(self, pool, task):
+        calls.append(task)
+        if len(calls) == 1:
+            raise BrokenProcessPool("worker killed between tasks")
+        return submit(self, pool, task)
+    
+    monkeypatch.setattr(BatchExtractor, "_submit", breaks_once)
+    result = BatchExtractor(str(tmp_path / "out"), jobs=2).run(str(source))
+    
+    assert [item.status for item in result.items] == [BatchStatus.OK] * 3
+
+
+def test_pool_that_always_breaks_ends(tmp_path, source, monkeypatch):
+    calls = []
+    
+    def always_breaks(self, pool, task):
+        calls.append(task)
+        if len(calls) > 100:
+            pytest.fail("batch keeps resubmitting to broken pools")
+        raise BrokenProcessPool("pool broken")
+    
+    monkeypatch.setattr(BatchExtractor, "_submit", always_breaks)
+    result = BatchExtractor(str(tmp_path / "out"), jobs=2).run(str(source))
+    
+    assert [item.status for item in result.items] == [BatchStatus.ERROR] * 3
+    assert all("BrokenProcessPool" in item.error for item in result.items)
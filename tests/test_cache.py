@@ -0,0 +1,112 @@
+"""
+Tests for the on-disk extraction cache.
+"""
+
+import os
+
+from extractors.xml_extractor import XMLMetadataExtractor
+from utils.cache import ExtractionCache
+
+
+def _comparable(metadata):
+    return metadata.model_dump(exclude={"extraction_timestamp"})
+
+
+def test_miss_then_hit(tmp_path, workbook_path):
+    with ExtractionCache(tmp_path / "cache.sqlite3") as cache:
+        first = cache.extract(XMLMetadataExtractor(str(workbook_path)))
+        second = cache.extract(XMLMetadataExtractor(str(workbook_path)))
+        
+        assert (cache.misses, cache.hits) == (1, 1)
+        assert len(cache) == 1
+        assert _comparable(second) == _comparable(first)
+
+
+def test_hit_survives_reopening(tmp_path, workbook_path):
+    with ExtractionCache(tmp_path / "cache.sqlite3") as cache:
+        first = cache.extract(XMLMetadataExtractor(str(workbook_path)))
+    
+    with ExtractionCache(tmp_path / "cache.sqlite3") as cache:
+        second = cache.extract(XMLMetadataExtractor(str(workbook_path)))
+        assert cache.hits == 1
+        assert _comparable(second) == _comparable(first)
+
+
+def test_same_xml_under_another_name_hits(tmp_path, workbook_path, workbook_xml):
+    copy = tmp_path / "Copy.twb"
+    copy.write_text(workbook_xml, encoding="utf-8")
+    
+    with ExtractionCache(tmp_path / "cache.sqlite3") as cache:
+        cache.extract(XMLMetadataExtractor(str(workbook_path)))
+        metadata = cache.extract(XMLMetadataExtractor(str(copy)))
+        
+        assert cache.hits == 1
+        assert metadata.name == "Copy"
+        assert metadata.source_file == str(copy)
+
+
+def test_changed_workbook_misses(tmp_path, workbook_path, workbook_xml):
+    with ExtractionCache(tmp_path / "cache.sqlite3") as cache:
+        cache.extract(XMLMetadataExtractor(str(workbook_path)))
+        
+        workbook_path.write_text(workbook_xml.replace("Sheet 1<", "Renamed Sheet<"), encoding="utf-8")
+        stat = workbook_path.stat()
+        os.utime(workbook_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        cached = cache.extract(XMLMetadataExtractor(str(workbook_path)))
+        fresh = XMLMetadataExtractor(str(workbook_path)).extract()
+        
+        assert cache.misses == 2
+        assert len(cache) == 2
+        assert _comparable(cached) == _comparable(fresh)
+
+
+def test_refresh_ignores_entry(tmp_path, workbook_path):
+    with ExtractionCache(tmp_path / "cache.sqlite3") as cache:
+        cache.extract(XMLMetadataExtractor(str(workbook_path)))
+        cache.extract(XMLMetadataExtractor(str(workbook_path)), refresh=True)
+        
+        assert (cache.misses, cache.hits) == (2, 0)
+        assert len(cache) == 1
+
+
+def test_evicts_least_recently_used(tmp_path, workbook_xml):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"Workbook {i}.twb"
+        path.write_text(workbook_xml.replace("Superstore Sales", f"Superstore {i}"), encoding="utf-8")
+        paths.append(path)
+    
+    with ExtractionCache(tmp_path / "cache.sqlite3") as cache:
+        keys = [cache.key_for(XMLMetadataExtractor(str(path))) for path in paths]
+        
+        cache.extract(XMLMetadataExtractor(str(paths[0])))
+        entry_size = cache._conn.execute("SELECT MAX(size) FROM extractions").fetchone()[0]
+        cache.max_bytes = int(entry_size * 2.5)
+        
+        cache.extract(XMLMetadataExtractor(str(paths[1])))
+        cache.extract(XMLMetadataExtractor(str(paths[0])))  # now more recent than paths[1]
+        cache.extract(XMLMetadataExtractor(str(paths[2])))
+        
+        assert len(cache) == 2
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[2]) is not None
+
+
+def test_entry_larger_than_cap_is_not_stored(tmp_path, workbook_path):
+    with ExtractionCache(tmp_path / "cache.sqlite3", max_bytes=1) as cache:
+        cache.extract(XMLMetadataExtractor(str(workbook_path)))
+        assert len(cache) == 0
+
+
+def test_unreadable_entry_is_dropped(tmp_path, workbook_path):
+    with ExtractionCache(tmp_path / "cache.sqlite3") as cache:
+        key = cache.key_for(XMLMetadataExtractor(str(workbook_path)))
+        cache.extract(XMLMetadataExtractor(str(workbook_path)))
+        cache._conn.execute("UPDATE extractions SET payload = ? WHERE key = ?", (b"not a pickle", key))
+        cache._conn.commit()
+        
+        assert cache.get(key) is None
+        assert len(cache) == 0
+        cache.extract(XMLMetadataExtractor(str(workbook_path)))
+        assert cache.misses == 2
@@ -0,0 +1,170 @@
+"""
+Tests for the resumable site crawl, against an in-memory stand-in for the async client.
+"""
+
+import asyncio
+import json
+from typing import Dict, List, Optional
+
+import pytest
+
+from extractors.metadata_api import MetadataAPIThrottledError, NodeLimitExceededError
+from models.metadata_models import WorkbookMetadata
+from utils.batch import BatchStatus
+from utils.crawl import SiteCrawler
+
+
+class FakeClient:
+    """Lists workbooks and returns metadata for them; LUIDs in failing raise instead."""
+    
+    server_url = "https://tableau.example.com"
+    
+    def __init__(self, luids: List[str], failing: Optional[Dict[str, Exception]] = None):
+        self.workbooks = [
+            {"luid": luid, "name": f"Workbook {luid}", "projectName": "Sales" if i % 2 else "Finance"}
+            for i, luid in enumerate(luids)
+        ]
+        self.failing = failing or {}
+        self.fetched: List[str] = []
+        self.fetched_separately: List[str] = []
+        self.list_error: Optional[Exception] = None
+    
+    async def iter_workbooks(self, project_name: Optional[str] = None):
+        for workbook in self.workbooks:
+            if self.list_error is not None:
+                raise self.list_error
+            if project_name is None or workbook["projectName"] == project_name:
+                yield workbook
+    
+    async def get_workbook_metadata_by_luid(self, luid: str, consolidated: bool = True) -> WorkbookMetadata:
+        await asyncio.sleep(0)
+        (self.fetched if consolidated else self.fetched_separately).append(luid)
+        error = self.failing.get(luid)
+        if error is not None and (consolidated or not isinstance(error, NodeLimitExceededError)):
+            raise error
+        return WorkbookMetadata(name=f"Workbook {luid}", total_sheets=3)
+
+
+def _crawl(client, output_dir, **kwargs):
+    return asyncio.run(SiteCrawler(client, str(output_dir), concurrency=3, **kwargs).crawl())
+
+
+def _statuses(result) -> Dict[str, BatchStatus]:
+    return {item.luid: item.status for item in result.items}
+
+
+LUIDS = [f"wb{i:03d}" for i in range(10)]
+
+
+def test_crawl_writes_outputs_state_and_manifest(tmp_path):
+    client = FakeClient(LUIDS)
+    result = _crawl(client, tmp_path)
+    
+    assert [item.luid for item in result.items] == LUIDS
+    assert result.succeeded == len(LUIDS) and result.failed == 0
+    assert sorted(client.fetched) == LUIDS
+    for luid in LUIDS:
+        assert WorkbookMetadata.load(tmp_path / f"{luid}.json").name == f"Workbook {luid}"
+    
+    manifest = json.loads((tmp_path / SiteCrawler.MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert len(manifest["items"]) == len(LUIDS)
+    assert len((tmp_path / SiteCrawler.STATE_NAME).read_text(encoding="utf-8").splitlines()) == len(LUIDS)
+
+
+def test_resume_skips_completed_luids(tmp_path):
+    failing = {"wb003": RuntimeError("server error"), "wb007": RuntimeError("server error")}
+    first = _crawl(FakeClient(LUIDS, failing), tmp_path)
+    assert first.failed == 2
+    
+    client = FakeClient(LUIDS)
+    second = _crawl(client, tmp_path)
+    
+    assert sorted(client.fetched) == ["wb003", "wb007"]
+    assert second.resumed == len(LUIDS) - 2
+    assert set(_statuses(second).values()) == {BatchStatus.OK}
+    assert [item.luid for item in second.items] == LUIDS
+    
+    third_client = FakeClient(LUIDS)
+    third = _crawl(third_client, tmp_path)
+    assert third_client.fetched == []
+    assert third.resumed == len(LUIDS)
+
+
+def test_restart_fetches_everything(tmp_path):
+    _crawl(FakeClient(LUIDS), tmp_path)
+    
+    client = FakeClient(LUIDS)
+    result = _crawl(client, tmp_path, resume=False)
+    
+    assert sorted(client.fetched) == LUIDS
+    assert result.resumed == 0
+
+
+def test_missing_output_is_fetched_again(tmp_path):
+    _crawl(FakeClient(LUIDS), tmp_path)
+    (tmp_path / "wb004.json").unlink()
+    
+    client = FakeClient(LUIDS)
+    _crawl(client, tmp_path)
+    
+    assert client.fetched == ["wb004"]
+
+
+def test_other_format_is_fetched_again(tmp_path):
+    _crawl(FakeClient(LUIDS), tmp_path)
+    
+    client = FakeClient(LUIDS)
+    _crawl(client, tmp_path, format="snapshot")
+    
+    assert sorted(client.fetched) == LUIDS
+
+
+def test_line_cut_short_by_a_crash_is_ignored(tmp_path):
+    _crawl(FakeClient(LUIDS[:3]), tmp_path)
+    with open(tmp_path / SiteCrawler.STATE_NAME, "a", encoding="utf-8") as f:
+        f.write('{"luid": "wb003", "name": "Work')
+    
+    client = FakeClient(LUIDS[:5])
+    result = _crawl(client, tmp_path)
+    
+    assert sorted(client.fetched) == ["wb003", "wb004"]
+    assert result.resumed == 3
+
+
+def test_project_filter(tmp_path):
+    client = FakeClient(LUIDS)
+    result = _crawl(client, tmp_path, project_name="Sales")
+    
+    assert [item.luid for item in result.items] == LUIDS[1::2]
+
+
+def test_node_limit_falls_back_to_separate_queries(tmp_path):
+    client = FakeClient(LUIDS[:3], {"wb001": NodeLimitExceededError("node limit")})
+    result = _crawl(client, tmp_path)
+    
+    assert client.fetched_separately == ["wb001"]
+    assert set(_statuses(result).values()) == {BatchStatus.OK}
+
+
+def test_throttling_does_not_fall_back(tmp_path):
+    client = FakeClient(LUIDS[:3], {"wb001": MetadataAPIThrottledError("Too many requests")})
+    result = _crawl(client, tmp_path)
+    
+    assert client.fetched_separately == []
+    assert _statuses(result)["wb001"] == BatchStatus.ERROR
+
+
+def test_other_errors_do_not_fall_back(tmp_path):
+    client = FakeClient(LUIDS[:3], {"wb001": RuntimeError("server error")})
+    result = _crawl(client, tmp_path)
+    
+    assert client.fetched_separately == []
+    assert _statuses(result)["wb001"] == BatchStatus.ERROR
+
+
+def test_listing_failure_stops_the_crawl(tmp_path):
+    client = FakeClient(LUIDS)
+    client.list_error = RuntimeError("listing failed")
+    
+    with pytest.raises(RuntimeError, match="listing failed"):
+        _crawl(client, tmp_path)
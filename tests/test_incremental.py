@@ -0,0 +1,92 @@
+"""
+Tests for incremental re-extraction: after any change to a top-level subtree,
+extract_incremental(previous) must give what a full extraction gives.
+"""
+
+import pytest
+
+from extractors.xml_extractor import XMLMetadataExtractor
+from tests.workbooks import DATASOURCE, make_workbook_xml
+
+
+BASE = make_workbook_xml(n_sheets=9)
+
+_SHEET_4 = BASE.index("<worksheet name='Sheet 4'>")
+_SHEET_4_END = BASE.index("</worksheet>", _SHEET_4) + len("</worksheet>")
+
+VARIANTS = {
+    "unchanged": BASE,
+    "worksheet": BASE[:_SHEET_4] + BASE[_SHEET_4:_SHEET_4_END].replace(
+        "<rows>", f"<rows>[{DATASOURCE}].[none:Field 2:nk] / ", 1
+    ) + BASE[_SHEET_4_END:],
+    "worksheet_removed": BASE[:_SHEET_4] + BASE[_SHEET_4_END:],
+    "datasource": BASE.replace("caption='Field 2'", "caption='Field Two'", 1),
+    "calculation": BASE.replace("RUNNING_SUM(SUM([Field 6]))", "RUNNING_AVG(SUM([Field 6]))", 1),
+    "parameters": BASE.replace("value='0.1'>", "value='0.2'>", 1),
+    "dashboard_zone_removed": BASE.replace("<zone h='50000' id='4' name='Sheet 1' w='33000' x='33000' y='0' />", "", 1),
+    "dashboard_zone_added": BASE.replace(
+        "<zone h='50000' id='4' name='Sheet 1'",
+        "<zone h='50000' id='97' name='Sheet 8' w='1' x='1' y='1' /><zone h='50000' id='4' name='Sheet 1'",
+        1,
+    ),
+}
+
+MODES = {
+    "in_memory": {},
+    "streaming": {"streaming": True},
+    "selective": {"selective": True},
+}
+
+
+def _comparable(metadata):
+    return metadata.model_dump(exclude={"extraction_timestamp", "source_file", "name"})
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_incremental_equals_full(tmp_path, mode, variant):
+    options = MODES[mode]
+    base_path = tmp_path / "base.twb"
+    base_path.write_text(BASE, encoding="utf-8")
+    changed_path = tmp_path / "changed.twb"
+    changed_path.write_text(VARIANTS[variant], encoding="utf-8")
+    
+    previous = XMLMetadataExtractor(str(base_path), **options).extract_incremental()
+    full = XMLMetadataExtractor(str(changed_path), **options).extract()
+    state = XMLMetadataExtractor(str(changed_path), **options).extract_incremental(previous)
+    
+    assert _comparable(state.metadata) == _comparable(full)
+    
+    # And again on top of the incremental result
+    again = XMLMetadataExtractor(str(changed_path), **options).extract_incremental(state)
+    assert _comparable(again.metadata) == _comparable(full)
+
+
+def test_only_changed_worksheet_is_parsed(tmp_path, monkeypatch):
+    base_path = tmp_path / "base.twb"
+    base_path.write_text(BASE, encoding="utf-8")
+    changed_path = tmp_path / "changed.twb"
+    changed_path.write_text(VARIANTS["worksheet"], encoding="utf-8")
+    previous = XMLMetadataExtractor(str(base_path)).extract_incremental()
+    
+    parsed = []
+    original = XMLMetadataExtractor._parse_single_worksheet
+    
+    def counting(self, elem, *args, **kwargs):
+        parsed.append(elem.get("name"))
+        return original(self, elem, *args, **kwargs)
+    
+    monkeypatch.setattr(XMLMetadataExtractor, "_parse_single_worksheet", counting)
+    XMLMetadataExtractor(str(changed_path)).extract_incremental(previous)
+    
+    assert parsed == ["Sheet 4"]
+
+
+def test_state_from_another_extractor_version_is_ignored(tmp_path, workbook_path):
+    previous = XMLMetadataExtractor(str(workbook_path)).extract_incremental()
+    previous.version = "0"
+    
+    state = XMLMetadataExtractor(str(workbook_path)).extract_incremental(previous)
+    
+    assert state.version == XMLMetadataExtractor.EXTRACTOR_VERSION
+    assert _comparable(state.metadata) == _comparable(XMLMetadataExtractor(str(workbook_path)).extract())
@@ -0,0 +1,115 @@
+"""
+Tests for the normalized metric storage and the flattened metric rows built from it.
+"""
+
+import json
+
+import pytest
+
+import models.metadata_models as metadata_models
+from extractors.xml_extractor import XMLMetadataExtractor
+from models import json_backend
+from models.metadata_models import MetricDetailRow, WorkbookMetadata
+from utils.output import OutputGenerator
+
+
+@pytest.fixture
+def metadata(workbook_path) -> WorkbookMetadata:
+    return XMLMetadataExtractor(str(workbook_path)).extract()
+
+
+@pytest.fixture(params=json_backend.JSON_BACKENDS)
+def backend(request):
+    if request.param == "orjson" and json_backend.orjson is None:
+        pytest.skip("orjson is not installed")
+    previous = json_backend.get_json_backend()
+    json_backend.set_json_backend(request.param)
+    yield request.param
+    json_backend.set_json_backend(previous)
+
+
+def _joined_rows(metadata):
+    """The flattened rows as the extractor used to store them: definition, context and usage joined."""
+    rows = []
+    for usage in metadata.metric_usages:
+        rows.append(MetricDetailRow(
+            **metadata.metric_definitions[usage.metric_id].model_dump(),
+            **metadata.metric_sheets[usage.worksheet_name].model_dump(),
+            shelf_position=usage.shelf_position,
+            aggregation_used=usage.aggregation_used,
+        ))
+    return rows
+
+
+def _legacy_json(metadata):
+    """JSON in the layout written before metric usage was normalized."""
+    data = json.loads(OutputGenerator(metadata).to_json(include_metric_rows=True))
+    for key in ("metric_definitions", "metric_sheets", "metric_usages"):
+        del data[key]
+    return json.dumps(data)
+
+
+def test_rows_match_joined_usages(metadata):
+    rows = list(metadata.iter_metric_rows())
+    
+    assert rows
+    assert len(rows) == len(metadata.metric_usages)
+    assert rows == _joined_rows(metadata)
+    assert metadata.get_metric_rows() == rows
+
+
+def test_rows_equal_validated_rows(metadata, monkeypatch):
+    monkeypatch.setattr(metadata_models, "_VERIFY_TRUSTED", True)
+    
+    for row in metadata.iter_metric_rows():
+        assert row == MetricDetailRow.model_validate(row.model_dump())
+
+
+def test_json_metric_rows_view(metadata):
+    data = json.loads(OutputGenerator(metadata).to_json(include_metric_rows=True))
+    
+    assert data["metric_rows"] == [row.model_dump(mode="json") for row in metadata.iter_metric_rows()]
+    assert "metric_rows" not in json.loads(OutputGenerator(metadata).to_json())
+
+
+def test_pydantic_is_the_default_backend():
+    assert json_backend._backend == "pydantic"
+
+
+def test_metric_rows_view_is_ignored_on_load(metadata, backend):
+    loaded = WorkbookMetadata.from_json(OutputGenerator(metadata).to_json(include_metric_rows=True))
+    
+    assert loaded == metadata
+
+
+def test_legacy_metric_rows_are_normalized_on_load(metadata, backend):
+    loaded = WorkbookMetadata.from_json(_legacy_json(metadata))
+    
+    assert loaded.metric_definitions == metadata.metric_definitions
+    assert loaded.metric_sheets == metadata.metric_sheets
+    assert loaded.metric_usages == metadata.metric_usages
+    assert loaded.get_metric_rows() == metadata.get_metric_rows()
+
+
+def test_legacy_metric_rows_from_dict():
+    loaded = WorkbookMetadata.model_validate({
+        "name": "Legacy",
+        "metric_rows": [
+            {"metric_name": "Sales", "metric_type": "measure", "datasource_name": "Orders",
+             "worksheet_name": "Sheet 1", "shelf_position": "rows", "aggregation_used": "SUM"},
+            {"metric_name": "Sales", "metric_type": "measure", "datasource_name": "Orders",
+             "worksheet_name": "Sheet 2", "shelf_position": "columns", "filters_applied": ["Region"]},
+        ],
+    })
+    
+    assert list(loaded.metric_definitions) == ["[Orders].[Sales]"]
+    assert list(loaded.metric_sheets) == ["Sheet 1", "Sheet 2"]
+    assert loaded.metric_sheets["Sheet 2"].filters_applied == ["Region"]
+    assert [(u.worksheet_name, u.shelf_position) for u in loaded.metric_usages] == [
+        ("Sheet 1", "rows"), ("Sheet 2", "columns"),
+    ]
+
+
+def test_invalid_legacy_metric_rows_raise():
+    with pytest.raises(ValueError, match="metric_rows"):
+        WorkbookMetadata.model_validate({"name": "Legacy", "metric_rows": ["not a row"]})
@@ -0,0 +1,279 @@
+"""
+Tests for the adaptive rate limiter and how the Metadata API client drives it.
+"""
+
+import asyncio
+import functools
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import mock
+
+import pytest
+
+from extractors import rate_limiter as rate_limiter_module
+from extractors.metadata_api import MetadataAPIThrottledError, TableauMetadataAPIClient
+from extractors.rate_limiter import RateLimiter, parse_retry_after
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock)
+    return clock
+
+
+def _acquire(limiter: RateLimiter, count: int = 1) -> None:
+    for _ in range(count):
+        assert limiter._reserve(lambda: None) == 0
+
+
+def test_throttle_halves_window(clock):
+    limiter = RateLimiter(initial_concurrency=8, max_concurrency=32)
+    _acquire(limiter)
+    limiter.release(throttled=True)
+    
+    assert limiter.concurrency == 4
+    assert limiter.throttled == 1
+    # The first throttle without Retry-After only narrows the window
+    assert limiter._reserve(lambda: None) == 0
+
+
+def test_throttles_of_requests_in_flight_halve_once(clock):
+    limiter = RateLimiter(initial_concurrency=8)
+    _acquire(limiter, 4)
+    
+    for _ in range(4):
+        limiter.release(throttled=True)
+    
+    assert limiter.concurrency == 4
+    assert limiter.in_flight == 0
+
+
+def test_window_grows_by_one_per_window_after_first_throttle(clock):
+    limiter = RateLimiter(initial_concurrency=8)
+    _acquire(limiter)
+    limiter.release(throttled=True)
+    
+    for _ in range(4):
+        _acquire(limiter)
+        limiter.release()
+    
+    assert limiter.concurrency == pytest.approx(5, abs=0.1)
+
+
+def test_slow_start_grows_by_one_per_success(clock):
+    limiter = RateLimiter(initial_concurrency=4, max_concurrency=6)
+    for _ in range(5):
+        _acquire(limiter)
+        limiter.release()
+    
+    assert limiter.concurrency == 6
+
+
+def test_retry_after_pauses_every_request(clock):
+    limiter = RateLimiter()
+    _acquire(limiter)
+    limiter.release(throttled=True, retry_after=5)
+    
+    assert limiter._reserve(lambda: None) == pytest.approx(5)
+    clock.now += 3
+    assert limiter._reserve(lambda: None) == pytest.approx(2)
+    clock.now += 2
+    assert limiter._reserve(lambda: None) == 0
+
+
+def test_retry_after_is_capped(clock):
+    limiter = RateLimiter(max_backoff=10)
+    _acquire(limiter)
+    limiter.release(throttled=True, retry_after=3600)
+    
+    assert limiter._reserve(lambda: None) == pytest.approx(10)
+
+
+def test_consecutive_throttles_back_off_exponentially(clock):
+    limiter = RateLimiter(initial_concurrency=16, backoff=1.0)
+    pauses = []
+    for _ in range(4):
+        _acquire(limiter)
+        limiter.release(throttled=True)
+        pauses.append(max(0.0, limiter._paused_until - clock.now))
+        clock.now = max(clock.now, limiter._paused_until)
+    
+    assert pauses == [0, 1, 2, 4]
+    
+    _acquire(limiter)
+    limiter.release()
+    _acquire(limiter)
+    limiter.release(throttled=True)
+    assert limiter._paused_until <= clock.now
+
+
+def test_failed_request_leaves_window_unchanged(clock):
+    limiter = RateLimiter(initial_concurrency=4)
+    _acquire(limiter, 2)
+    limiter.release(failed=True)
+    
+    assert limiter.concurrency == 4
+    assert limiter.in_flight == 1
+    
+    limiter.release()
+    assert limiter.concurrency == 5
+
+
+def test_full_window_wakes_waiter_on_release(clock):
+    limiter = RateLimiter(initial_concurrency=1)
+    _acquire(limiter)
+    woken = threading.Event()
+    
+    assert limiter._reserve(woken.set) is None
+    limiter.release()
+    assert woken.is_set()
+
+
+def test_token_bucket_limits_rate(clock):
+    limiter = RateLimiter(rate=2, burst=2, initial_concurrency=8)
+    _acquire(limiter, 2)
+    
+    assert limiter._reserve(lambda: None) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert limiter._reserve(lambda: None) == 0
+
+
+def test_async_and_sync_acquire():
+    limiter = RateLimiter(initial_concurrency=1)
+    
+    async def hold_and_release():
+        await limiter.acquire()
+        await asyncio.sleep(0.05)
+        limiter.release()
+    
+    async def main():
+        await asyncio.gather(hold_and_release(), hold_and_release(), hold_and_release())
+    
+    asyncio.run(main())
+    limiter.acquire_sync()
+    limiter.release()
+    
+    assert limiter.requests == 4
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("", None),
+    ("7", 7.0),
+    ("1.5", 1.5),
+    ("-3", 0.0),
+    ("soon", None),
+])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(30, abs=2)
+
+
+def _response(status_code=200, json_data=None, headers=None):
+    response = mock.Mock(status_code=status_code, headers=headers or {}, text="")
+    response.json.return_value = json_data if json_data is not None else {"data": {}}
+    return response
+
+
+@pytest.fixture
+def client():
+    client = TableauMetadataAPIClient(
+        "https://tableau.example.com", token_name="name", token_secret="secret",
+        rate_limiter=RateLimiter(initial_concurrency=4, backoff=0),
+    )
+    client.auth_token = "token"
+    client.site_luid = "site"
+    client.session = mock.Mock()
+    return client
+
+
+def test_client_retries_throttled_query(client):
+    client.session.post.side_effect = [
+        _response(429, headers={"Retry-After": "0"}),
+        _response(200, {"errors": [{"message": "Too many requests, try again later"}]}),
+        _response(200, {"data": {"ok": True}}),
+    ]
+    
+    assert client._graphql_query("query") == {"ok": True}
+    assert client.rate_limiter.throttled == 2
+    assert client.rate_limiter.in_flight == 0
+
+
+def test_client_gives_up_after_max_retries(client):
+    client.session.post.return_value = _response(503)
+    
+    with pytest.raises(MetadataAPIThrottledError):
+        client._graphql_query("query")
+    assert client.session.post.call_count == client.MAX_THROTTLE_RETRIES + 1
+    assert client.rate_limiter.in_flight == 0
+
+
+def test_client_errors_do_not_widen_window(client):
+    client.session.post.side_effect = ConnectionError("connection reset")
+    
+    for _ in range(5):
+        with pytest.raises(ConnectionError):
+            client._graphql_query("query")
+    
+    assert client.rate_limiter.concurrency == 4
+    assert client.rate_limiter.in_flight == 0
+
+
+def test_cancelled_waiter_is_forgotten():
+    limiter = RateLimiter(initial_concurrency=1)
+    limiter.acquire_sync()
+    
+    async def main():
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert len(limiter._waiters) == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+    
+    asyncio.run(main())
+    
+    assert limiter._waiters == []
+    limiter.release()
+
+
+def test_waiter_abandoned_by_closed_loop_does_not_break_release():
+    limiter = RateLimiter(initial_concurrency=1)
+    limiter.acquire_sync()
+    
+    # asyncio.run cancels the waiting acquire() when main() fails
+    async def main():
+        asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        raise RuntimeError("request failed")
+    
+    with pytest.raises(RuntimeError, match="request failed"):
+        asyncio.run(main())
+    
+    # A waiter on a loop that closed without cleaning up after it
+    loop = asyncio.new_event_loop()
+    assert limiter._reserve(functools.partial(rate_limiter_module._wake, loop, loop.create_future())) is None
+    loop.close()
+    woken = threading.Event()
+    assert limiter._reserve(woken.set) is None
+    
+    limiter.release()
+    
+    assert woken.is_set()
+    assert limiter.in_flight == 0
@@ -0,0 +1,64 @@
+"""
+Tests for binary snapshots.
+"""
+
+import pytest
+
+from extractors.xml_extractor import XMLMetadataExtractor
+from utils import snapshot
+from utils.snapshot import (
+    SNAPSHOT_MAGIC,
+    SnapshotError,
+    dump_snapshot,
+    is_snapshot,
+    load_snapshot,
+    read_snapshot,
+    write_snapshot,
+)
+
+
+@pytest.fixture
+def metadata(workbook_path):
+    return XMLMetadataExtractor(str(workbook_path)).extract()
+
+
+def test_round_trip(metadata):
+    assert load_snapshot(dump_snapshot(metadata)) == metadata
+
+
+def test_file_round_trip(tmp_path, metadata):
+    path = tmp_path / "metadata.snapshot"
+    write_snapshot(metadata, path)
+    
+    assert is_snapshot(path)
+    assert read_snapshot(path) == metadata
+
+
+def test_json_file_is_not_a_snapshot(tmp_path, metadata):
+    path = tmp_path / "metadata.json"
+    path.write_text(metadata.to_json(), encoding="utf-8")
+    
+    assert not is_snapshot(path)
+    with pytest.raises(SnapshotError, match="Not a metadata snapshot"):
+        read_snapshot(path)
+
+
+def test_truncated_data_is_rejected():
+    with pytest.raises(SnapshotError, match="Not a metadata snapshot"):
+        load_snapshot(SNAPSHOT_MAGIC[:4])
+
+
+def test_other_extractor_version_is_rejected(metadata, monkeypatch):
+    data = dump_snapshot(metadata)
+    monkeypatch.setattr(XMLMetadataExtractor, "EXTRACTOR_VERSION", XMLMetadataExtractor.EXTRACTOR_VERSION + "-next")
+    
+    with pytest.raises(SnapshotError, match="Stale snapshot"):
+        load_snapshot(data)
+
+
+def test_other_format_version_is_rejected(metadata, monkeypatch):
+    data = dump_snapshot(metadata)
+    monkeypatch.setattr(snapshot, "SNAPSHOT_FORMAT_VERSION", snapshot.SNAPSHOT_FORMAT_VERSION + 1)
+    
+    with pytest.raises(SnapshotError, match="Unsupported snapshot format"):
+        load_snapshot(data)
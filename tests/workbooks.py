@@ -0,0 +1,98 @@
+"""
+Synthetic workbooks in the layout Tableau writes, for the tests to extract.
+"""
+
+
+DATASOURCE = "federated.06isunw1k489iz17cvbbm1vjpw0t"
+
+CALCULATIONS = [
+    ("Calculation_1", "Profit Ratio", "SUM([Field 0]) / SUM([Field 3])"),
+    ("Calculation_2", "Fixed Sales", "{FIXED [Field 1], [Field 2] : SUM([Field 0])}"),
+    ("Calculation_3", "Running", "RUNNING_SUM(SUM([Field 6]))"),
+    ("Calculation_4", "Param Calc", "[Field 0] * [Parameters].[Growth Rate]"),
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("'", "&apos;").replace("<", "&lt;")
+
+
+def _worksheet(s: int) -> str:
+    a, b = s % 10, (s * 7 + 1) % 10
+    ds = DATASOURCE
+    return (
+        f"<worksheet name='Sheet {s}'><layout-options><title><formatted-text><run>Sheet {s}</run></formatted-text></title></layout-options>"
+        f"<table><view>"
+        f"<datasources><datasource caption='Superstore Sales' name='{ds}' /><datasource name='Parameters' /></datasources>"
+        f"<datasource-dependencies datasource='{ds}'>"
+        f"<column caption='Field {a}' datatype='string' name='[Field {a}]' role='dimension' type='nominal' />"
+        f"<column-instance column='[Field {a}]' derivation='None' name='[none:Field {a}:nk]' pivot='key' type='nominal' />"
+        f"</datasource-dependencies>"
+        f"<filter class='categorical' column='[{ds}].[none:Field {a}:nk]'><groupfilter function='union'>"
+        f"<groupfilter function='member' level='[none:Field {a}:nk]' member='&quot;East&quot;' />"
+        f"<groupfilter function='member' level='[none:Field {a}:nk]' member='&quot;West&quot;' /></groupfilter></filter>"
+        f"<filter class='quantitative' column='[{ds}].[sum:Field 0:qk]' included-values='in-range'><range min='10' max='500' /></filter>"
+        f"<aggregation value='true' /></view>"
+        f"<panes><pane><view><breakdown value='auto' /></view><mark class='{['Bar', 'Line', 'Circle', 'Text'][s % 4]}' />"
+        f"<encodings><color column='[{ds}].[none:Field {b}:nk]' /><text column='[{ds}].[usr:Calculation_1:qk]' />"
+        f"<tooltip column='[{ds}].[sum:Field 6:qk]' /></encodings></pane></panes>"
+        f"<rows>[{ds}].[none:Field {a}:nk]</rows>"
+        f"<cols>[{ds}].[sum:Field 0:qk] / [{ds}].[usr:Calculation_{s % len(CALCULATIONS) + 1}:qk]</cols>"
+        f"</table></worksheet>"
+    )
+
+
+def _dashboard(d: int, n_sheets: int) -> str:
+    zones = "".join(
+        f"<zone h='50000' id='{d * 10 + k + 3}' name='Sheet {d * 3 + k}' w='33000' x='{k * 33000}' y='0' />"
+        for k in range(3) if d * 3 + k < n_sheets
+    )
+    return (
+        f"<dashboard name='Dashboard {d}'><size maxheight='800' maxwidth='1200' minheight='800' minwidth='1200' />"
+        f"<zones><zone h='100000' id='1' type='layout-basic' w='100000' x='0' y='0'>{zones}"
+        f"<zone h='10000' id='99' name='[{DATASOURCE}].[none:Field 1:nk]' type='filter' w='10000' x='0' y='90000' />"
+        f"<zone h='10000' id='98' name='[Parameters].[Growth Rate]' type='paramctrl' w='10000' x='0' y='80000' />"
+        f"</zone></zones></dashboard>"
+    )
+
+
+def make_workbook_xml(n_sheets: int = 6) -> str:
+    """Workbook XML with one datasource, a Parameters datasource, n_sheets worksheets and their dashboards."""
+    columns = []
+    for i in range(10):
+        role = "measure" if i % 3 == 0 else "dimension"
+        datatype = "real" if role == "measure" else "string"
+        columns.append(
+            f"<column caption='Field {i}' datatype='{datatype}' name='[Field {i}]' role='{role}' type='quantitative' />"
+        )
+    for name, caption, formula in CALCULATIONS:
+        columns.append(
+            f"<column caption='{caption}' datatype='real' name='[{name}]' role='measure' type='quantitative'>"
+            f"<calculation class='tableau' formula='{_escape(formula)}' /></column>"
+        )
+    
+    parts = [
+        "<?xml version='1.0' encoding='utf-8' ?>",
+        "<workbook source-build='2020.2.1 (20202.20.0525.1210)' version='18.1' xmlns:user='http://www.tableausoftware.com/xml/user'>",
+        "<datasources>",
+        "<datasource hasconnection='false' inline='true' name='Parameters' version='18.1'>",
+        "<column caption='Growth Rate' datatype='real' name='[Growth Rate]' param-domain-type='range' role='measure' type='quantitative' value='0.1'>"
+        "<calculation class='tableau' formula='0.1' /><range granularity='0.01' max='1' min='0' /></column>",
+        "</datasource>",
+        f"<datasource caption='Superstore Sales' inline='true' name='{DATASOURCE}' version='18.1'>",
+        "<connection class='federated'><named-connections><named-connection caption='Superstore' name='excel-direct.1'>"
+        "<connection class='excel-direct' filename='Superstore.xls' /></named-connection></named-connections>"
+        "<relation connection='excel-direct.1' name='Orders' table='[Orders$]' type='table' /></connection>",
+        *columns,
+        "</datasource>",
+        "</datasources>",
+        "<worksheets>",
+        *(_worksheet(s) for s in range(n_sheets)),
+        "</worksheets>",
+        "<dashboards>",
+        *(_dashboard(d, n_sheets) for d in range(max(1, n_sheets // 3))),
+        "</dashboards>",
+        "<windows><window class='worksheet' name='Sheet 0' /></windows>",
+        "</workbook>",
+    ]
+    return "\n".join(parts)
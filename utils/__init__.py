@@ -3,5 +3,7 @@
 from .comparison import MetadataComparator
 from .validation import MetadataValidator
 from .output import OutputGenerator
+from .batch import BatchExtractor
+from .cache import ExtractionCache
 
-__all__ = ["MetadataComparator", "MetadataValidator", "OutputGenerator"]
+__all__ = ["MetadataComparator", "MetadataValidator", "OutputGenerator", "BatchExtractor", "ExtractionCache"]
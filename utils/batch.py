@@ -0,0 +1,386 @@
+"""
+Batch extraction of many Tableau workbooks.
+
+Runs the XML extractor over a directory or glob of workbooks in a process pool,
+writes one output file per workbook and an aggregate manifest with per-file
+timing and status. A failure in one workbook never stops the batch.
+"""
+
+import glob
+import json
+import time
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Deque, Tuple
+
+from extractors.xml_extractor import XMLMetadataExtractor
+from models.metadata_models import WorkbookMetadata
+from utils.cache import ExtractionCache
+from utils.output import OutputGenerator
+from utils.snapshot import SNAPSHOT_SUFFIX
+
+
+class BatchStatus(str, Enum):
+    """Status recorded per workbook."""
+    OK = "ok"
+    ERROR = "error"
+
+
+@dataclass
+class BatchItemResult:
+    """Outcome of extracting a single workbook."""
+    source_file: str
+    output_file: Optional[str] = None
+    status: BatchStatus = BatchStatus.OK
+    duration_seconds: float = 0.0
+    error: Optional[str] = None
+    datasources: int = 0
+    sheets: int = 0
+    dashboards: int = 0
+    calculated_fields: int = 0
+
+
+@dataclass
+class BatchResult:
+    """Result of a batch run, written out as the manifest."""
+    source: str
+    output_dir: str
+    format: str
+    jobs: int
+    started_at: str
+    total_seconds: float = 0.0
+    items: List[BatchItemResult] = field(default_factory=list)
+    
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for item in self.items if item.status == BatchStatus.OK)
+    
+    @property
+    def failed(self) -> int:
+        return sum(1 for item in self.items if item.status != BatchStatus.OK)
+    
+    def to_manifest(self) -> Dict[str, Any]:
+        """Manifest contents: run settings, totals and one entry per workbook."""
+        return {
+            "source": self.source,
+            "output_dir": self.output_dir,
+            "format": self.format,
+            "jobs": self.jobs,
+            "started_at": self.started_at,
+            "total_seconds": round(self.total_seconds, 3),
+            "total_workbooks": len(self.items),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "items": [asdict(item) for item in self.items],
+        }
+
+
+def find_workbooks(source: str) -> List[Path]:
+    """
+    Resolve a directory or glob pattern to a sorted list of .twb/.twbx files.
+    
+    Directories are searched recursively.
+    """
+    source_path = Path(source)
+    
+    if source_path.is_dir():
+        candidates = [p for p in source_path.rglob("*") if p.is_file()]
+    elif source_path.is_file():
+        candidates = [source_path]
+    else:
+        candidates = [Path(p) for p in glob.glob(source, recursive=True)]
+    
+    return sorted({p for p in candidates if p.suffix.lower() in BatchExtractor.WORKBOOK_SUFFIXES})
+
+
+def write_output(metadata: WorkbookMetadata, output_format: str, output_path: str) -> None:
+    """Write one workbook's metadata in a BatchExtractor.FORMAT_SUFFIXES format."""
+    output_generator = OutputGenerator(metadata)
+    if output_format == "json":
+        output_generator.write_json(output_path)
+    elif output_format == "ndjson":
+        output_generator.write_ndjson(output_path)
+    elif output_format == "excel":
+        output_generator.to_excel(output_path)
+    elif output_format == "html":
+        output_generator.to_html(output_path)
+    elif output_format == "summary":
+        with open(output_path, 'w') as f:
+            f.write(output_generator.to_summary())
+    elif output_format == "csv":
+        output_generator.to_metrics_csv(output_path)
+    elif output_format == "snapshot":
+        output_generator.to_snapshot(output_path)
+
+
+def _extract_workbook(
+    file_path: str,
+    output_path: str,
+    output_format: str,
+    extractor_options: Dict[str, Any],
+    cache_path: Optional[str] = None,
+    refresh_cache: bool = False
+) -> BatchItemResult:
+    """Extract one workbook and write its output. Runs in a worker process."""
+    result = BatchItemResult(source_file=file_path)
+    start = time.perf_counter()
+    
+    try:
+        extractor = XMLMetadataExtractor(file_path, **extractor_options)
+        if cache_path:
+            with ExtractionCache(cache_path) as cache:
+                metadata = cache.extract(extractor, refresh=refresh_cache)
+        else:
+            metadata = extractor.extract()
+        
+        write_output(metadata, output_format, output_path)
+        
+        result.output_file = output_path
+        result.datasources = len(metadata.datasources)
+        result.sheets = metadata.total_sheets
+        result.dashboards = metadata.total_dashboards
+        result.calculated_fields = metadata.total_calculated_fields
+    except Exception as e:
+        result.status = BatchStatus.ERROR
+        result.error = f"{type(e).__name__}: {e}"
+    
+    result.duration_seconds = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _error_result(workbook: Path, error: BaseException) -> BatchItemResult:
+    """Result of a workbook whose worker raised or died instead of returning."""
+    return BatchItemResult(
+        source_file=str(workbook),
+        status=BatchStatus.ERROR,
+        error="".join(traceback.format_exception_only(type(error), error)).strip(),
+    )
+
+
+class BatchExtractor:
+    """
+    Extracts metadata from many workbooks with a pool of worker processes.
+    
+    Each workbook is extracted independently, so one bad file is recorded in the
+    manifest as an error and the rest of the batch carries on.
+    """
+    
+    WORKBOOK_SUFFIXES = frozenset({".twb", ".twbx"})
+    
+    # Output file extension per format
+    FORMAT_SUFFIXES = {
+        "json": ".json",
+        "ndjson": ".ndjson",
+        "excel": ".xlsx",
+        "html": ".html",
+        "summary": ".txt",
+        "csv": ".csv",
+        "snapshot": SNAPSHOT_SUFFIX,
+    }
+    
+    MANIFEST_NAME = "manifest.json"
+    
+    def __init__(
+        self,
+        output_dir: str,
+        format: str = "json",
+        jobs: int = 1,
+        cache_path: Optional[str] = None,
+        refresh_cache: bool = False,
+        **extractor_options: Any
+    ):
+        """
+        Initialize the batch extractor.
+        
+        Args:
+            output_dir: Directory receiving one output per workbook and the manifest
+            format: Output format (json/ndjson/excel/html/summary/csv/snapshot)
+            jobs: Number of worker processes; 1 runs in the calling process
+            cache_path: ExtractionCache file to read and fill; None disables caching
+            refresh_cache: Re-extract every workbook and overwrite its cache entry
+            **extractor_options: Passed to XMLMetadataExtractor (streaming, selective)
+        """
+        if format not in self.FORMAT_SUFFIXES:
+            raise ValueError(f"Unsupported format: {format}")
+        
+        self.output_dir = Path(output_dir)
+        self.format = format
+        self.jobs = max(1, jobs)
+        self.cache_path = str(cache_path) if cache_path else None
+        self.refresh_cache = refresh_cache
+        self.extractor_options = extractor_options
+    
+    def run(
+        self,
+        source: str,
+        on_result: Optional[Callable[[BatchItemResult], None]] = None
+    ) -> BatchResult:
+        """
+        Extract every workbook matched by source and write the manifest.
+        
+        Args:
+            source: Directory or glob pattern of .twb/.twbx files
+            on_result: Called with each result as it completes (for progress)
+        
+        Returns:
+            BatchResult: Per-workbook results in input order
+        """
+        workbooks = find_workbooks(source)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        batch = BatchResult(
+            source=source,
+            output_dir=str(self.output_dir),
+            format=self.format,
+            jobs=self.jobs,
+            started_at=datetime.now().isoformat(),
+        )
+        start = time.perf_counter()
+        
+        tasks = list(zip(workbooks, self._output_paths(workbooks)))
+        results: List[Optional[BatchItemResult]] = [None] * len(tasks)
+        
+        if self.jobs == 1:
+            for i, (workbook, output_path) in enumerate(tasks):
+                results[i] = _extract_workbook(
+                    str(workbook), str(output_path), self.format, self.extractor_options,
+                    self.cache_path, self.refresh_cache
+                )
+                if on_result:
+                    on_result(results[i])
+        else:
+            def record(i: int, result: BatchItemResult) -> None:
+                results[i] = result
+                if on_result:
+                    on_result(result)
+            
+            pending = deque(range(len(tasks)))
+            while pending:
+                remaining = len(pending)
+                # A worker process died (out of memory, a crash in lxml), which
+                # breaks the whole pool. One of the workbooks in flight killed
+                # it: retry each of them alone, so only that one fails, then
+                # carry on with the rest in a new pool
+                broken = self._run_pool(tasks, pending, record)
+                for i in broken:
+                    record(i, self._run_isolated(tasks[i]))
+                
+                if not broken and len(pending) == remaining:
+                    # The pool broke before taking any work; run the next
+                    # workbook alone so a pool that keeps breaking still ends
+                    i = pending.popleft()
+                    record(i, self._run_isolated(tasks[i]))
+        
+        batch.items = results
+        batch.total_seconds = time.perf_counter() - start
+        
+        with open(self.output_dir / self.MANIFEST_NAME, 'w', encoding='utf-8') as f:
+            json.dump(batch.to_manifest(), f, indent=2)
+        
+        return batch
+    
+    def _submit(self, pool: ProcessPoolExecutor, task: Tuple[Path, Path]) -> Future:
+        """Submit one workbook's extraction to a pool."""
+        workbook, output_path = task
+        return pool.submit(
+            _extract_workbook, str(workbook), str(output_path), self.format,
+            self.extractor_options, self.cache_path, self.refresh_cache
+        )
+    
+    def _run_pool(
+        self,
+        tasks: List[Tuple[Path, Path]],
+        pending: Deque[int],
+        record: Callable[[int, BatchItemResult], None]
+    ) -> List[int]:
+        """
+        Extract pending workbooks in a process pool until done or the pool breaks.
+        
+        At most `jobs` workbooks are submitted at a time, so when a worker
+        dies the suspects are only the ones in flight, not the whole queue.
+        
+        Returns:
+            Indices of the workbooks in flight when the pool broke (empty if
+            it did not, or broke with none in flight); the rest are left in
+            pending
+        """
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            in_flight: Dict[Future, int] = {}
+            broken: List[int] = []
+            
+            while (pending or in_flight) and not broken:
+                while pending and len(in_flight) < self.jobs:
+                    i = pending.popleft()
+                    try:
+                        in_flight[self._submit(pool, tasks[i])] = i
+                    except BrokenProcessPool:
+                        # Broke since the last wait; the futures in flight say which
+                        pending.appendleft(i)
+                        break
+                
+                if not in_flight:
+                    # Broke while idle (a worker killed between tasks): no
+                    # workbook is to blame, run() starts a new pool
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = in_flight.pop(future)
+                    if self._collect(i, future, tasks, record):
+                        broken.append(i)
+            
+            # Futures still in flight fail with BrokenProcessPool too, unless
+            # they finished just before the worker died
+            for future, i in in_flight.items():
+                if self._collect(i, future, tasks, record):
+                    broken.append(i)
+        
+        return broken
+    
+    def _collect(
+        self,
+        i: int,
+        future: Future,
+        tasks: List[Tuple[Path, Path]],
+        record: Callable[[int, BatchItemResult], None]
+    ) -> bool:
+        """Record a finished future's result; True if it failed because the pool broke."""
+        try:
+            record(i, future.result())
+        except BrokenProcessPool:
+            return True
+        except Exception as e:
+            record(i, _error_result(tasks[i][0], e))
+        return False
+    
+    def _run_isolated(self, task: Tuple[Path, Path]) -> BatchItemResult:
+        """Extract one workbook in a pool of its own, so a crash only affects it."""
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            try:
+                return self._submit(pool, task).result()
+            except Exception as e:
+                # The worker process itself died again (e.g. out of memory)
+                return _error_result(task[0], e)
+    
+    def _output_paths(self, workbooks: List[Path]) -> List[Path]:
+        """One output path per workbook, suffixed -2, -3, ... when file names collide."""
+        suffix = self.FORMAT_SUFFIXES[self.format]
+        used = {self.MANIFEST_NAME}
+        paths = []
+        
+        for workbook in workbooks:
+            name = f"{workbook.stem}{suffix}"
+            counter = 2
+            while name in used:
+                name = f"{workbook.stem}-{counter}{suffix}"
+                counter += 1
+            used.add(name)
+            paths.append(self.output_dir / name)
+        
+        return paths
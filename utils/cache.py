@@ -0,0 +1,218 @@
+"""
+Persistent cache of extraction results.
+
+Extracted WorkbookMetadata is stored in a local SQLite file keyed by the SHA-256
+of the workbook XML plus the extractor version, so unchanged workbooks are
+returned from disk without unzipping, parsing or building models. The store has a size cap
+and evicts the least recently used entries once it is exceeded.
+
+Entries hold the extractor's IncrementalState, so when a workbook has changed
+since its last extraction only its changed subtrees are reparsed.
+"""
+
+import pickle
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from extractors.xml_extractor import IncrementalState, XMLMetadataExtractor
+from models.metadata_models import WorkbookMetadata
+from utils.snapshot import gc_paused
+
+
+class ExtractionCache:
+    """
+    Content-addressed on-disk cache in front of XMLMetadataExtractor.extract().
+    
+    Entries are pickled, so the cache file should only be shared between users
+    who trust each other, like any other local pickle.
+    """
+    
+    DEFAULT_PATH = Path.home() / ".cache" / "tableau_metadata_extractor" / "extractions.sqlite3"
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+    
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        """
+        Open (or create) the cache.
+        
+        Args:
+            path: SQLite file holding the cache (defaults to DEFAULT_PATH)
+            max_bytes: Total size of stored payloads before LRU eviction kicks in
+        """
+        self.path = Path(path) if path else self.DEFAULT_PATH
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Batch workers share the file, so wait on locks rather than failing
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            " key TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS extractions_last_access ON extractions (last_access)"
+        )
+        # Content hash per file path, reused while size and mtime are unchanged
+        # so a hit on a .twbx does not have to decompress the workbook XML
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " digest TEXT NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def key_for(self, extractor: XMLMetadataExtractor) -> str:
+        """Cache key: extractor version plus a hash of the workbook XML."""
+        return f"{extractor.EXTRACTOR_VERSION}:{self._content_hash(extractor)}"
+    
+    def _last_key(self, extractor: XMLMetadataExtractor) -> Optional[str]:
+        """Key of the last extraction cached for the extractor's file path, if any."""
+        row = self._conn.execute(
+            "SELECT digest FROM fingerprints WHERE path = ?", (str(extractor.file_path.resolve()),)
+        ).fetchone()
+        return f"{extractor.EXTRACTOR_VERSION}:{row[0]}" if row else None
+    
+    def _content_hash(self, extractor: XMLMetadataExtractor) -> str:
+        """The workbook's content hash, from the fingerprint table when the file is unchanged."""
+        path = str(extractor.file_path.resolve())
+        stat = extractor.file_path.stat()
+        
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, digest FROM fingerprints WHERE path = ?", (path,)
+        ).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+        
+        digest = extractor.content_hash()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, digest)
+        )
+        self._conn.commit()
+        return digest
+    
+    def extract(self, extractor: XMLMetadataExtractor, refresh: bool = False) -> WorkbookMetadata:
+        """
+        Return cached metadata for the extractor's workbook, extracting on a miss.
+        
+        On a miss for a workbook extracted before from the same path, the
+        previous entry drives an incremental extraction.
+        
+        Args:
+            extractor: Extractor for the workbook
+            refresh: Ignore any cached entry and store a full fresh extraction
+        
+        Returns:
+            WorkbookMetadata: Cached or freshly extracted metadata
+        """
+        previous_key = self._last_key(extractor)
+        key = self.key_for(extractor)
+        
+        metadata = None if refresh else self.get(key)
+        if metadata is not None:
+            # The same XML may live under another name or path
+            metadata.name = extractor.workbook_name
+            metadata.source_file = str(extractor.file_path)
+            self.hits += 1
+            return metadata
+        
+        self.misses += 1
+        previous = None
+        if not refresh and previous_key is not None and previous_key != key:
+            previous = self._load(previous_key)
+        
+        state = extractor.extract_incremental(previous)
+        self.put(key, state)
+        return state.metadata
+    
+    def get(self, key: str) -> Optional[WorkbookMetadata]:
+        """Load an entry's metadata and mark it as recently used, or None if absent."""
+        state = self._load(key)
+        return state.metadata if state is not None else None
+    
+    def _load(self, key: str) -> Optional[IncrementalState]:
+        """Load an entry and mark it as recently used, or None if absent."""
+        row = self._conn.execute(
+            "SELECT payload FROM extractions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        try:
+            with gc_paused():
+                state = pickle.loads(row[0])
+            if not isinstance(state, IncrementalState):
+                raise TypeError(f"Unexpected cache entry: {type(state).__name__}")
+        except Exception:
+            # Written by an incompatible version of the models; drop it
+            self._conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        
+        self._conn.execute(
+            "UPDATE extractions SET last_access = ? WHERE key = ?", (time.time(), key)
+        )
+        self._conn.commit()
+        return state
+    
+    def put(self, key: str, state: IncrementalState) -> None:
+        """Store an extraction, then evict least recently used entries over the size cap."""
+        payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        
+        self._conn.execute(
+            "INSERT OR REPLACE INTO extractions (key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, payload, len(payload), time.time())
+        )
+        self._evict()
+        self._conn.commit()
+    
+    def _evict(self) -> None:
+        """Delete the oldest entries until the total size fits under max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        stale = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM extractions ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        
+        self._conn.executemany("DELETE FROM extractions WHERE key = ?", stale)
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._conn.execute("DELETE FROM extractions")
+        self._conn.execute("DELETE FROM fingerprints")
+        self._conn.commit()
+    
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+    
+    def __enter__(self) -> "ExtractionCache":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
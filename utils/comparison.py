@@ -8,8 +8,9 @@ from typing import List, Dict, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
+from extractors.formula_parser import normalize_formula
+from models.compact import AnyWorkbookMetadata
 from models.metadata_models import (
-    WorkbookMetadata,
     DataSourceMetadata,
     SheetMetadata,
     DashboardMetadata,
@@ -137,15 +138,15 @@ class MetadataComparator:
     
     def compare(
         self,
-        xml_metadata: WorkbookMetadata,
-        api_metadata: WorkbookMetadata
+        xml_metadata: AnyWorkbookMetadata,
+        api_metadata: AnyWorkbookMetadata
     ) -> ComparisonResult:
         """
         Compare metadata from XML extraction vs API extraction.
         
         Args:
-            xml_metadata: Metadata extracted via XML parsing
-            api_metadata: Metadata extracted via Metadata API
+            xml_metadata: Metadata extracted via XML parsing (either form)
+            api_metadata: Metadata extracted via Metadata API (either form)
             
         Returns:
             ComparisonResult: Detailed comparison result
@@ -409,18 +410,8 @@ class MetadataComparator:
         return differences, len(xml_names | api_names)
     
     def _normalize_formula(self, formula: str) -> str:
-        """Normalize a formula for comparison."""
-        if not formula:
-            return ""
-        
-        # Remove extra whitespace
-        normalized = " ".join(formula.split())
-        
-        # Remove datasource prefixes
-        import re
-        normalized = re.sub(r'\[federated\.[^\]]+\]\.', '', normalized)
-        
-        return normalized.lower()
+        """Normalize a formula for comparison (token-based, shares the extractor's parse cache)."""
+        return normalize_formula(formula)
     
     def _compare_sheets(
         self,
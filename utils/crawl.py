@@ -0,0 +1,281 @@
+"""
+Site-wide metadata crawl over the Tableau Metadata API.
+
+Lists every workbook on a site and fetches full metadata for each, with a
+bounded number of workbooks in flight at once. Fetching starts with the first
+page of the listing rather than after all of it. One output file is written per
+workbook, named by its LUID, plus a manifest like extract-batch's.
+
+Every finished workbook is appended to a state file in the output directory as
+soon as its output is written. When a crawl stops part way (crash, Ctrl-C,
+credentials revoked), running it again skips the workbooks already written and
+retries the ones that failed. An expired session token does not stop a crawl:
+the client signs in again and retries the request. Neither does throttling: the
+client's RateLimiter backs off and narrows the number of requests in flight
+until the server stops pushing back, then widens it again.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+from extractors.metadata_api import AsyncTableauMetadataAPIClient, NodeLimitExceededError
+from utils.batch import BatchExtractor, BatchStatus, write_output
+
+
+@dataclass
+class CrawlItemResult:
+    """Outcome of fetching a single workbook."""
+    luid: str
+    name: str
+    project: Optional[str] = None
+    output_file: Optional[str] = None
+    status: BatchStatus = BatchStatus.OK
+    duration_seconds: float = 0.0
+    error: Optional[str] = None
+    datasources: int = 0
+    sheets: int = 0
+    dashboards: int = 0
+    calculated_fields: int = 0
+
+
+@dataclass
+class CrawlResult:
+    """Result of a crawl, written out as the manifest."""
+    server: str
+    output_dir: str
+    format: str
+    concurrency: int
+    started_at: str
+    total_seconds: float = 0.0
+    # Workbooks skipped because a previous run had already written them
+    resumed: int = 0
+    items: List[CrawlItemResult] = field(default_factory=list)
+    
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for item in self.items if item.status == BatchStatus.OK)
+    
+    @property
+    def failed(self) -> int:
+        return sum(1 for item in self.items if item.status != BatchStatus.OK)
+    
+    def to_manifest(self) -> Dict[str, Any]:
+        """Manifest contents: run settings, totals and one entry per workbook."""
+        return {
+            "server": self.server,
+            "output_dir": self.output_dir,
+            "format": self.format,
+            "concurrency": self.concurrency,
+            "started_at": self.started_at,
+            "total_seconds": round(self.total_seconds, 3),
+            "total_workbooks": len(self.items),
+            "resumed": self.resumed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "items": [asdict(item) for item in self.items],
+        }
+
+
+class SiteCrawler:
+    """
+    Fetches metadata for every workbook on a site, resumably.
+    
+    Workbooks are fetched by LUID, so equally named workbooks in different
+    projects are kept apart. A failing workbook is recorded as an error and
+    the crawl carries on.
+    """
+    
+    STATE_NAME = "crawl_state.jsonl"
+    MANIFEST_NAME = "manifest.json"
+    
+    def __init__(
+        self,
+        client: AsyncTableauMetadataAPIClient,
+        output_dir: str,
+        format: str = "json",
+        concurrency: int = 8,
+        project_name: Optional[str] = None,
+        consolidated: bool = True,
+        resume: bool = True
+    ):
+        """
+        Initialize the crawler.
+        
+        Args:
+            client: Client for the site; signs in on first use if needed
+            output_dir: Directory receiving one output per workbook, the state file and the manifest
+            format: Output format (json/ndjson/excel/html/summary/csv/snapshot)
+            concurrency: Number of workbooks fetched at the same time
+            project_name: Only crawl workbooks in this project
+            consolidated: Fetch each workbook with one GraphQL query rather than four
+            resume: Skip workbooks written by a previous run into output_dir
+        """
+        if format not in BatchExtractor.FORMAT_SUFFIXES:
+            raise ValueError(f"Unsupported format: {format}")
+        
+        self.client = client
+        self.output_dir = Path(output_dir)
+        self.format = format
+        self.concurrency = max(1, concurrency)
+        self.project_name = project_name
+        self.consolidated = consolidated
+        self.resume = resume
+    
+    async def crawl(self, on_result: Optional[Callable[[CrawlItemResult], None]] = None) -> CrawlResult:
+        """
+        Fetch every workbook not already done and write the manifest.
+        
+        Args:
+            on_result: Called with each result as it completes (for progress)
+        
+        Returns:
+            CrawlResult: Per-workbook results in listing order, including
+                those carried over from previous runs
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        crawl = CrawlResult(
+            server=self.client.server_url,
+            output_dir=str(self.output_dir),
+            format=self.format,
+            concurrency=self.concurrency,
+            started_at=datetime.now().isoformat(),
+        )
+        start = time.perf_counter()
+        
+        done = self._load_state() if self.resume else {}
+        results: Dict[str, CrawlItemResult] = {}
+        # LUIDs in listing order, for the manifest
+        listed: List[str] = []
+        
+        # Workbooks are fetched as soon as their listing page arrives. The
+        # queue is bounded, so listing stays only a little ahead of the workers
+        # and on large sites neither the listing nor the backlog is held whole
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        
+        async def list_workbooks() -> None:
+            async for workbook in self.client.iter_workbooks(self.project_name):
+                luid = workbook["luid"]
+                listed.append(luid)
+                previous = done.get(luid)
+                if previous is not None:
+                    results[luid] = previous
+                    crawl.resumed += 1
+                else:
+                    await queue.put(workbook)
+            
+            # One stop marker per worker
+            for _ in range(self.concurrency):
+                await queue.put(None)
+        
+        with open(self.output_dir / self.STATE_NAME, 'a' if self.resume else 'w', encoding='utf-8') as state:
+            async def worker() -> None:
+                while True:
+                    workbook = await queue.get()
+                    if workbook is None:
+                        return
+                    
+                    item = await self._fetch(workbook)
+                    results[item.luid] = item
+                    state.write(json.dumps(asdict(item)) + "\n")
+                    state.flush()
+                    if on_result:
+                        on_result(item)
+            
+            tasks = [asyncio.create_task(list_workbooks())]
+            tasks += [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # If listing failed, the workers would otherwise wait forever
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        
+        crawl.items = [results[luid] for luid in listed]
+        crawl.total_seconds = time.perf_counter() - start
+        
+        with open(self.output_dir / self.MANIFEST_NAME, 'w', encoding='utf-8') as f:
+            json.dump(crawl.to_manifest(), f, indent=2)
+        
+        return crawl
+    
+    async def _fetch(self, workbook: Dict[str, Any]) -> CrawlItemResult:
+        """Fetch one workbook and write its output."""
+        result = CrawlItemResult(
+            luid=workbook["luid"],
+            name=workbook.get("name", ""),
+            project=workbook.get("projectName"),
+        )
+        start = time.perf_counter()
+        
+        try:
+            try:
+                metadata = await self.client.get_workbook_metadata_by_luid(result.luid, self.consolidated)
+            except NodeLimitExceededError:
+                if not self.consolidated:
+                    raise
+                # The largest workbooks can exceed the server's node limit
+                # for a single query; their parts usually fit. Any other
+                # error would not go away by splitting the query
+                metadata = await self.client.get_workbook_metadata_by_luid(result.luid, consolidated=False)
+            
+            # Writing is blocking file I/O; keep it off the event loop so the
+            # other requests in flight are not held up
+            output_path = str(self._output_path(result.luid))
+            await asyncio.get_running_loop().run_in_executor(
+                None, write_output, metadata, self.format, output_path
+            )
+            
+            result.output_file = output_path
+            result.datasources = len(metadata.datasources)
+            result.sheets = metadata.total_sheets
+            result.dashboards = metadata.total_dashboards
+            result.calculated_fields = metadata.total_calculated_fields
+        except Exception as e:
+            result.status = BatchStatus.ERROR
+            result.error = f"{type(e).__name__}: {e}"
+        
+        result.duration_seconds = round(time.perf_counter() - start, 3)
+        return result
+    
+    def _output_path(self, luid: str) -> Path:
+        """Output file of a workbook."""
+        return self.output_dir / f"{luid}{BatchExtractor.FORMAT_SUFFIXES[self.format]}"
+    
+    def _load_state(self) -> Dict[str, CrawlItemResult]:
+        """
+        Workbooks completed by previous runs, by LUID.
+        
+        Only successes whose output (in the current format) still exists
+        count; failures are fetched again. A line cut short by a crash is
+        ignored.
+        """
+        state_path = self.output_dir / self.STATE_NAME
+        if not state_path.exists():
+            return {}
+        
+        done = {}
+        with open(state_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    item = CrawlItemResult(**json.loads(line))
+                    item.status = BatchStatus(item.status)
+                except (ValueError, TypeError):
+                    continue
+                
+                if (
+                    item.status == BatchStatus.OK
+                    and item.output_file == str(self._output_path(item.luid))
+                    and Path(item.output_file).exists()
+                ):
+                    done[item.luid] = item
+                else:
+                    done.pop(item.luid, None)
+        
+        return done
@@ -1,15 +1,21 @@
 """
 Output generation utilities for Tableau metadata.
 
-Supports JSON, Excel, and HTML output formats.
+Supports JSON, NDJSON, CSV, Excel, HTML and binary snapshot output formats.
 """
 
+import csv
 import json
-from typing import Optional, Dict, Any, List
+import sys
+from typing import Optional, Dict, Any, List, Iterable, Iterator, TextIO, Tuple
 from pathlib import Path
 from datetime import datetime
 
-from models.metadata_models import WorkbookMetadata
+from pydantic_core import to_json as _to_json
+
+from models import json_backend
+from models.metadata_models import WorkbookMetadata, MetricDetailRow
+from utils.snapshot import write_snapshot
 
 
 class OutputGenerator:
@@ -17,12 +23,22 @@ class OutputGenerator:
     Generates various output formats for extracted metadata.
     
     Supported formats:
-    - JSON (detailed, machine-readable)
+    - JSON (detailed, machine-readable; streamed with write_json)
+    - NDJSON (one record per line, streamed)
+    - CSV (flattened metric rows, streamed)
     - Excel (summary workbook with multiple sheets)
     - HTML (interactive report)
     - Text (console summary)
+    - Snapshot (binary, reloaded much faster than JSON; see utils.snapshot)
     """
     
+    # WorkbookMetadata fields written as separate NDJSON records (or, for the
+    # normalized metric fields, as metric_row records) rather than on the workbook record
+    NDJSON_WORKBOOK_SECTIONS = {
+        "datasources", "sheets", "dashboards", "parameters", "relationships",
+        "metric_definitions", "metric_sheets", "metric_usages",
+    }
+    
     def __init__(self, metadata: WorkbookMetadata):
         """
         Initialize the output generator.
@@ -32,18 +48,30 @@ class OutputGenerator:
         """
         self.metadata = metadata
     
-    def to_json(self, output_path: Optional[str] = None, indent: int = 2) -> str:
+    def to_json(
+        self,
+        output_path: Optional[str] = None,
+        indent: int = 2,
+        include_metric_rows: bool = False
+    ) -> str:
         """
         Export metadata to JSON format.
         
         Args:
             output_path: Optional path to save the file
             indent: JSON indentation level
+            include_metric_rows: Also write the flattened metric_rows view
+                (one full row per metric-worksheet combination)
             
         Returns:
             str: JSON string
         """
-        json_str = self.metadata.model_dump_json(indent=indent)
+        if include_metric_rows:
+            data = self.metadata.model_dump(mode="json")
+            data["metric_rows"] = [row.model_dump(mode="json") for row in self.metadata.iter_metric_rows()]
+            json_str = json_backend.dumps(data, indent)
+        else:
+            json_str = self.metadata.to_json(indent)
         
         if output_path:
             with open(output_path, 'w', encoding='utf-8') as f:
@@ -51,10 +79,166 @@ class OutputGenerator:
         
         return json_str
     
+    def write_json(
+        self,
+        output_path: Optional[str] = None,
+        indent: Optional[int] = 2,
+        include_metric_rows: bool = False
+    ) -> None:
+        """
+        Write the JSON document section by section instead of building it in memory.
+        
+        Produces the same document as to_json(), but each datasource, sheet,
+        dashboard, relationship and metric usage is serialized and written on
+        its own, so peak memory does not grow with the size of the output.
+        
+        Args:
+            output_path: Path to save the file; written to stdout if omitted
+            indent: JSON indentation level (None for compact output)
+            include_metric_rows: Also write the flattened metric_rows view,
+                streamed from iter_metric_rows()
+        """
+        sections: List[Tuple[str, Any]] = [
+            (name, getattr(self.metadata, name)) for name in type(self.metadata).model_fields
+        ]
+        if include_metric_rows:
+            sections.append(("metric_rows", self.metadata.iter_metric_rows()))
+        
+        f = open(output_path, 'w', encoding='utf-8') if output_path else sys.stdout
+        try:
+            _write_json_container(f, sections, indent, 0, is_object=True)
+            if not output_path:
+                f.write("\n")
+        finally:
+            if output_path:
+                f.close()
+    
+    def write_ndjson(self, output_path: Optional[str] = None) -> int:
+        """
+        Write newline-delimited JSON: one self-contained record per line.
+        
+        Every record has a "record_type" (workbook, datasource, field,
+        calculated_field, parameter, sheet, filter, dashboard, relationship or
+        metric_row) and the workbook name, plus the name of its datasource or
+        worksheet where it belongs to one, so the lines can be split and loaded
+        in parallel. Nested collections that have their own records (a
+        datasource's fields, a sheet's filters) are left out of the parent.
+        
+        Args:
+            output_path: Path to save the file; written to stdout if omitted
+            
+        Returns:
+            int: Number of records written
+        """
+        count = 0
+        
+        f = open(output_path, 'w', encoding='utf-8') if output_path else sys.stdout
+        try:
+            for record in self.iter_ndjson_records():
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+        finally:
+            if output_path:
+                f.close()
+        
+        return count
+    
+    def iter_ndjson_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield the NDJSON records in document order (see write_ndjson)."""
+        metadata = self.metadata
+        workbook = metadata.name
+        
+        yield {
+            "record_type": "workbook",
+            **metadata.model_dump(mode="json", exclude=self.NDJSON_WORKBOOK_SECTIONS),
+        }
+        
+        for ds in metadata.datasources:
+            yield {
+                "record_type": "datasource",
+                "workbook": workbook,
+                **ds.model_dump(mode="json", exclude={"fields", "calculated_fields", "extract_filters"}),
+            }
+            for field in ds.fields:
+                yield {"record_type": "field", "workbook": workbook, "datasource": ds.name,
+                       **field.model_dump(mode="json")}
+            for calc in ds.calculated_fields:
+                yield {"record_type": "calculated_field", "workbook": workbook, "datasource": ds.name,
+                       **calc.model_dump(mode="json")}
+            for flt in ds.extract_filters:
+                yield {"record_type": "filter", "workbook": workbook, "datasource": ds.name,
+                       **flt.model_dump(mode="json")}
+        
+        for param in metadata.parameters:
+            yield {"record_type": "parameter", "workbook": workbook, **param.model_dump(mode="json")}
+        
+        for sheet in metadata.sheets:
+            yield {
+                "record_type": "sheet",
+                "workbook": workbook,
+                **sheet.model_dump(mode="json", exclude={"filters"}),
+            }
+            for flt in sheet.filters:
+                yield {"record_type": "filter", "workbook": workbook, "worksheet": sheet.name,
+                       **flt.model_dump(mode="json")}
+        
+        for dashboard in metadata.dashboards:
+            yield {"record_type": "dashboard", "workbook": workbook, **dashboard.model_dump(mode="json")}
+        
+        for rel in metadata.relationships:
+            yield {"record_type": "relationship", "workbook": workbook, **rel.model_dump(mode="json")}
+        
+        for row in metadata.iter_metric_rows():
+            yield {"record_type": "metric_row", "workbook": workbook, **row.model_dump(mode="json")}
+    
     def to_dict(self) -> Dict[str, Any]:
         """Export metadata to dictionary."""
         return self.metadata.model_dump()
     
+    def to_snapshot(self, output_path: str) -> None:
+        """
+        Save the metadata as a binary snapshot for fast reloading.
+        
+        Args:
+            output_path: Path to save the file
+        """
+        write_snapshot(self.metadata, output_path)
+    
+    def to_metrics_csv(self, output_path: Optional[str] = None) -> int:
+        """
+        Export the flattened metric rows as CSV, one row at a time.
+        
+        Rows are produced by iter_metric_rows() and written as they are built,
+        so memory stays flat however many metric/worksheet combinations the
+        workbook has. List and dict columns are written as JSON.
+        
+        Args:
+            output_path: Path to save the file; written to stdout if omitted
+            
+        Returns:
+            int: Number of metric rows written
+        """
+        columns = list(MetricDetailRow.model_fields)
+        count = 0
+        
+        f = open(output_path, 'w', encoding='utf-8', newline='') if output_path else sys.stdout
+        try:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for metric in self.metadata.iter_metric_rows():
+                values = metric.model_dump(mode="json")
+                writer.writerow([
+                    json.dumps(values[column]) if isinstance(values[column], (list, dict)) else values[column]
+                    for column in columns
+                ])
+                count += 1
+        finally:
+            if output_path:
+                f.close()
+        
+        return count
+    
     def to_excel(self, output_path: str):
         """
         Export metadata to Excel workbook with multiple sheets.
@@ -349,7 +533,7 @@ class OutputGenerator:
             cell.fill = header_fill
         
         row_idx = 2
-        for metric in self.metadata.metric_rows:
+        for metric in self.metadata.iter_metric_rows():
             ws.cell(row=row_idx, column=1, value=metric.metric_name)
             ws.cell(row=row_idx, column=2, value=metric.metric_caption or "")
             ws.cell(row=row_idx, column=3, value=metric.metric_type)
@@ -495,14 +679,15 @@ class OutputGenerator:
                             "datasource": ds.caption or ds.name,
                         }
         
-        # Enrich with worksheet and dashboard usage from metric_rows
-        for metric in self.metadata.metric_rows:
-            key = metric.metric_name
+        # Enrich with worksheet and dashboard usage from the metric usages
+        for usage in self.metadata.metric_usages:
+            key = self.metadata.metric_definitions[usage.metric_id].metric_name
             if key in kpi_data:
-                kpi_data[key]["worksheets"].add(metric.worksheet_name)
-                for dash in metric.dashboards_containing_worksheet:
+                context = self.metadata.metric_sheets[usage.worksheet_name]
+                kpi_data[key]["worksheets"].add(context.worksheet_name)
+                for dash in context.dashboards_containing_worksheet:
                     kpi_data[key]["dashboards"].add(dash)
-                for f in metric.filters_applied:
+                for f in context.filters_applied:
                     kpi_data[key]["filters"].add(f)
         
         # Also check sheets directly for usage
@@ -1011,3 +1196,51 @@ class OutputGenerator:
         lines.append("=" * 60)
         
         return "\n".join(lines)
+
+
+def _json_text(value: Any, indent: Optional[int], level: int) -> str:
+    """Serialize one value with the JSON backend, indented to sit at the given nesting level."""
+    text = json_backend.dumps(value, indent)
+    if indent:
+        text = text.replace("\n", "\n" + " " * (indent * level))
+    return text
+
+
+def _write_json_container(
+    f: TextIO,
+    items: Iterable[Any],
+    indent: Optional[int],
+    level: int,
+    is_object: bool
+) -> None:
+    """
+    Write a JSON object (items are key/value pairs) or array one member at a time.
+    
+    Lists, iterators and dicts nested directly inside are streamed the same
+    way; any other member, including a model, is serialized whole.
+    """
+    open_char, close_char = ("{", "}") if is_object else ("[", "]")
+    member_pad = "\n" + " " * (indent * (level + 1)) if indent else ""
+    close_pad = "\n" + " " * (indent * level) if indent else ""
+    colon = ": " if indent is not None else ":"
+    
+    f.write(open_char)
+    empty = True
+    for item in items:
+        f.write(member_pad if empty else "," + member_pad)
+        empty = False
+        
+        if is_object:
+            key, value = item
+            f.write(_to_json(key).decode("utf-8") + colon)
+        else:
+            value = item
+        
+        if isinstance(value, dict):
+            _write_json_container(f, value.items(), indent, level + 1, is_object=True)
+        elif isinstance(value, (list, Iterator)):
+            _write_json_container(f, value, indent, level + 1, is_object=False)
+        else:
+            f.write(_json_text(value, indent, level + 1))
+    
+    f.write(close_char if empty else close_pad + close_char)
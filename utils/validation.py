@@ -8,8 +8,8 @@ from typing import List, Dict, Any, Optional, Set
 from dataclasses import dataclass, field
 from enum import Enum
 
+from models.compact import AnyWorkbookMetadata
 from models.metadata_models import (
-    WorkbookMetadata,
     DataSourceMetadata,
     SheetMetadata,
     DashboardMetadata,
@@ -124,12 +124,12 @@ class MetadataValidator:
         """
         self.strict_mode = strict_mode
     
-    def validate(self, metadata: WorkbookMetadata) -> ValidationResult:
+    def validate(self, metadata: AnyWorkbookMetadata) -> ValidationResult:
         """
         Validate the extracted metadata.
         
         Args:
-            metadata: WorkbookMetadata to validate
+            metadata: WorkbookMetadata to validate, or its compact form
             
         Returns:
             ValidationResult: Validation results
@@ -159,7 +159,7 @@ class MetadataValidator:
         
         return result
     
-    def _validate_structure(self, metadata: WorkbookMetadata, result: ValidationResult):
+    def _validate_structure(self, metadata: AnyWorkbookMetadata, result: ValidationResult):
         """Validate basic structure."""
         result.checked_items += 1
         
@@ -274,7 +274,7 @@ class MetadataValidator:
     def _validate_sheet(
         self,
         sheet: SheetMetadata,
-        metadata: WorkbookMetadata,
+        metadata: AnyWorkbookMetadata,
         result: ValidationResult
     ):
         """Validate a worksheet."""
@@ -402,7 +402,7 @@ class MetadataValidator:
     def _validate_dashboard(
         self,
         dashboard: DashboardMetadata,
-        metadata: WorkbookMetadata,
+        metadata: AnyWorkbookMetadata,
         result: ValidationResult
     ):
         """Validate a dashboard."""
@@ -452,7 +452,7 @@ class MetadataValidator:
                         message=f"Action source worksheet '{source}' not found",
                     ))
     
-    def _validate_relationships(self, metadata: WorkbookMetadata, result: ValidationResult):
+    def _validate_relationships(self, metadata: AnyWorkbookMetadata, result: ValidationResult):
         """Validate relationship consistency."""
         result.checked_items += 1
         